@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""Compares FileStorage save, reload and file size in JSON and binary.
+
+Usage: ./benchmarks/binary_format.py [number_of_objects]
+
+Runs in a temporary directory on the given number of objects (100,000
+by default), half Users and half Places with their attributes set. Each
+save is the first one of a new storage, so no encoded object is cached.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def populate(count):
+    """Create count objects in storage."""
+    from models.place import Place
+    from models.user import User
+
+    for i in range(count // 2):
+        user = User()
+        user.email = "user{}@example.com".format(i)
+        user.first_name = "Betty"
+        user.last_name = "Holberton"
+        place = Place()
+        place.user_id = user.id
+        place.name = "Place {}".format(i)
+        place.number_rooms = i % 5
+        place.price_by_night = 100 + i % 50
+        place.latitude = 37.77
+        place.longitude = -122.43
+        place.amenity_ids = ["a", "b"]
+
+
+def timed(function):
+    """Return the number of seconds it takes to call function."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from models.engine.file_storage import FileStorage
+
+    print("{} objects".format(count))
+    print("{:<8}{:>10}{:>10}{:>10}".format("format", "save s", "reload s",
+                                           "MiB"))
+    for name, path in (("json", "file.json"), ("binary", "file.bin")):
+        models.storage = FileStorage(binary=(name == "binary"))
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__encoded = {}
+        populate(count)
+        save = timed(models.storage.save)
+        FileStorage._FileStorage__objects = {}
+        reload = timed(models.storage.reload)
+        assert len(models.storage.all()) == count // 2 * 2
+        print("{:<8}{:>10.2f}{:>10.2f}{:>10.1f}".format(
+            name, save, reload, os.path.getsize(path) / (1 << 20)))
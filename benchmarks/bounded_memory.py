@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Compares FileStorage memory use with and without a bound on objects.
+
+Usage: ./benchmarks/bounded_memory.py [number_of_objects] [max_objects]
+
+Runs in a temporary directory on a file of the given number of Users
+(200,000 by default). Each storage reloads the file, reads every object
+once through all() and then reads a hot set of 1,000 objects 10 times.
+Reports the time, the memory still allocated afterwards, measured in a
+second run under tracemalloc, and the cache counters. Bounded storage
+keeps max_objects objects (10,000 by default).
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    bound = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    models.storage = FileStorage()
+    for i in range(count):
+        user = User()
+        user.email = "user{}@example.com".format(i)
+        user.first_name = "Betty"
+    models.storage.save()
+    keys = list(models.storage.all())[:1000]
+
+    print("{} objects".format(count))
+    print("{:<12}{:>9}{:>9}{:>10}{:>10}{:>11}".format(
+        "storage", "seconds", "MiB", "hits", "misses", "evictions"))
+    for name, options in (("lazy", {"lazy": True}),
+                          ("bounded", {"max_objects": bound})):
+        for traced in (False, True):
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__encoded = {}
+            gc.collect()
+            models.storage = FileStorage(cache=False, **options)
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            models.storage.reload()
+            for obj in models.storage.all().values():
+                pass
+            objs = models.storage.all()
+            for i in range(10):
+                for key in keys:
+                    objs[key]
+            if not traced:
+                seconds = time.perf_counter() - start
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] / (1 << 20)
+        tracemalloc.stop()
+        stats = models.storage.cache_stats()
+        print("{:<12}{:>9.2f}{:>9.1f}{:>10}{:>10}{:>11}".format(
+            name, seconds, size, stats["hits"], stats["misses"],
+            stats["evictions"]))
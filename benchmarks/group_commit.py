@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""Compares console command throughput with and without group commit.
+
+Usage: ./benchmarks/group_commit.py [number_of_objects] [commands]
+
+Runs in a temporary directory holding the given number of Users (10,000
+by default), then times a scripted burst of create and update commands
+(1,000 by default) through the console, each of which saves storage.
+The time includes the last delayed write.
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    os.chdir(tempfile.mkdtemp())
+    import console
+    import models
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    print("{} objects, {} commands".format(count, commands))
+    print("{:<24}{:>10}{:>10}".format("storage", "seconds", "cmds/s"))
+    for name, options in (("default", {}),
+                          ("fsync", {"fsync": True}),
+                          ("group_commit=50", {"group_commit": 50}),
+                          ("fsync, group_commit=50",
+                           {"fsync": True, "group_commit": 50})):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__encoded = {}
+        models.storage = console.storage = FileStorage(**options)
+        for i in range(count):
+            User()
+        models.storage.flush()
+        models.storage.save()
+        models.storage.flush()
+        cmd = console.HBNBCommand()
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()) as out:
+            for i in range(commands // 2):
+                cmd.onecmd("create User")
+                obj_id = out.getvalue().split()[-1]
+                cmd.onecmd('update User {} first_name "Betty"'.format(obj_id))
+        models.storage.flush()
+        seconds = time.perf_counter() - start
+        print("{:<24}{:>10.2f}{:>10.0f}".format(name, seconds,
+                                                commands / seconds))
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""Compares FileStorage startup time with and without lazy reload.
+
+Usage: ./benchmarks/lazy_startup.py [number_of_objects]
+
+Runs in a temporary directory on a file of the given number of Users and
+Places (200,000 by default). Times an eager reload, which decodes every
+object, and a lazy reload, which only finds where each object is in the
+file: by walking the file, and then from the offsets a save of a lazy
+storage writes next to it. Also times a lazy reload followed by reading
+one object, as a command run right after startup would. Reports the best
+of three runs of each.
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+    from models.user import User
+
+    models.storage = FileStorage()
+    for i in range(count):
+        if i % 2:
+            obj = User()
+            obj.email = "user{}@example.com".format(i)
+            obj.first_name = "Betty"
+        else:
+            obj = Place()
+            obj.name = "Place {}".format(i)
+            obj.amenity_ids = ["wifi", "pool"]
+            obj.latitude = 37.7
+    models.storage.save()
+    key = next(iter(models.storage.all()))
+    size = os.path.getsize("file.json") / (1 << 20)
+
+    def startup(options, read):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__encoded = {}
+        gc.collect()
+        models.storage = FileStorage(cache=False, **options)
+        start = time.perf_counter()
+        models.storage.reload()
+        if read:
+            models.storage.all()[key]
+        return time.perf_counter() - start
+
+    print("{} objects, {:.1f} MiB".format(count, size))
+    print("{:<24}{:>9}".format("reload", "seconds"))
+    for name, options, read in (("eager", {}, False),
+                                ("lazy, walking the file", {"lazy": True},
+                                 False)):
+        seconds = min(startup(options, read) for i in range(3))
+        print("{:<24}{:>9.2f}".format(name, seconds))
+    startup({"lazy": True}, False)
+    models.storage.save()
+    for name, read in (("lazy, saved offsets", False),
+                       ("lazy + one object", True)):
+        seconds = min(startup({"lazy": True}, read) for i in range(3))
+        print("{:<24}{:>9.2f}".format(name, seconds))
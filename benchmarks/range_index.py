@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Compares range queries on Place prices with and without a range index.
+
+Usage: ./benchmarks/range_index.py [number_of_places]
+
+Stores the given number of Places (1,000,000 by default) with random
+prices, then times queries for the places in narrow price ranges and for
+the 10 cheapest places, through storage.query(), which reads them from
+the RangeIndex on price_by_night, and by testing every place. Reports the
+time to build the index and the mean time of a query.
+"""
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from models.engine.file_storage import FileStorage
+
+    rng = random.Random(0)
+    models.storage = storage = FileStorage()
+    for i in range(count):
+        storage.restore("Place", {"id": str(i),
+                                  "price_by_night": rng.randrange(10, 1000)})
+    lows = [rng.randrange(10, 990) for i in range(100)]
+    places = list(storage.all("Place").values())
+
+    def scan_range(low):
+        return [pl for pl in places
+                if low <= pl.price_by_night < low + 2]
+
+    def scan_cheapest(low):
+        return heapq.nsmallest(10, places,
+                               key=lambda pl: pl.price_by_night)
+
+    def index_range(low):
+        return list(storage.query("Place").where(
+            price_by_night__gte=low, price_by_night__lt=low + 2))
+
+    def index_cheapest(low):
+        return list(storage.query("Place").order_by(
+            "price_by_night").limit(10))
+
+    start = time.perf_counter()
+    storage.between("Place", "price_by_night", limit=0)
+    print("{} places, index built in {:.2f} s".format(
+        count, time.perf_counter() - start))
+    print("{:<10}{:>14}{:>14}{:>10}".format(
+        "query", "scan ms", "index ms", "speedup"))
+    for name, indexed, scan in (("range", index_range, scan_range),
+                                ("cheapest", index_cheapest, scan_cheapest)):
+        start = time.perf_counter()
+        for low in lows:
+            indexed(low)
+        index_ms = (time.perf_counter() - start) * 1000 / len(lows)
+        start = time.perf_counter()
+        expected = [scan(low) for low in lows[:3]]
+        scan_ms = (time.perf_counter() - start) * 1000 / 3
+        for low, result in zip(lows, expected):
+            assert (sorted(pl.price_by_night for pl in result) ==
+                    sorted(pl.price_by_night for pl in indexed(low)))
+        print("{:<10}{:>14.2f}{:>14.3f}{:>9.0f}x".format(
+            name, scan_ms, index_ms, scan_ms / index_ms))
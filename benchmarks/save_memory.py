@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""Compares the peak memory used by FileStorage.save() before and after
+streaming objects to the file.
+
+Usage: ./benchmarks/save_memory.py [number_of_objects]
+
+Each way of saving runs in its own process, in a temporary directory,
+on the same number of User objects (1,000,000 by default):
+
+    dump      the former save(): a dict of every to_dict() and json.dump()
+    stream    save() of FileStorage(cache=False)
+    cached    save() of FileStorage(), which keeps the encoded objects
+    resave    a second save() of FileStorage() after changing one object
+
+The peak RSS reported is the increase of the process peak resident set
+size caused by saving, on top of the memory held by the objects.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def save_dump(storage):
+    """Save storage the way FileStorage did before streaming."""
+    odict = storage.all()
+    objdict = {obj: odict[obj].to_dict() for obj in odict.keys()}
+    with open("file.json", "w") as f:
+        json.dump(objdict, f)
+
+
+def save_stream(storage):
+    """Save storage with the streaming FileStorage.save()."""
+    storage.save()
+
+
+def run(name, count):
+    """Create count objects, save them with name and print the results."""
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+    import models
+
+    models.storage = storage = FileStorage(cache=(name != "stream"))
+    for i in range(count):
+        user = User()
+        user.first_name = "Betty"
+    if name == "resave":
+        storage.save()
+        user.first_name = "Holberton"
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if name == "dump":
+        save_dump(storage)
+    else:
+        save_stream(storage)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("{:<8}{:>12.1f}{:>16.1f}{:>12.2f}".format(
+        name, before / 1024, (after - before) / 1024, elapsed))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(sys.argv[1], int(sys.argv[2]))
+        sys.exit(0)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print("{} objects".format(count))
+    print("{:<8}{:>12}{:>16}{:>12}".format(
+        "save", "objects MiB", "save peak MiB", "seconds"))
+    for name in ("dump", "stream", "cached", "resave"):
+        with tempfile.TemporaryDirectory() as tmp:
+            subprocess.run([sys.executable, os.path.abspath(__file__),
+                            name, str(count)], cwd=tmp, check=True)
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""Compares FileStorage with a single JSON file and sharded by class.
+
+Usage: ./benchmarks/sharded_storage.py [number_of_objects]
+
+Runs in a temporary directory on the given number of objects (100,000
+by default), spread over every class. Reports the time of a first save,
+of a save after changing a single Amenity, and of a reload. Sharded
+reload decodes the class files in one process per CPU, so its speedup
+depends on the number of CPUs available.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+def populate(count):
+    """Create count objects in storage and return an Amenity."""
+    from models.amenity import Amenity
+    from models.city import City
+    from models.place import Place
+    from models.review import Review
+    from models.state import State
+    from models.user import User
+
+    for i in range(count // 6):
+        state = State()
+        state.name = "State {}".format(i)
+        city = City()
+        city.state_id = state.id
+        city.name = "City {}".format(i)
+        user = User()
+        user.email = "user{}@example.com".format(i)
+        user.first_name = "Betty"
+        amenity = Amenity()
+        amenity.name = "Amenity {}".format(i)
+        place = Place()
+        place.city_id = city.id
+        place.user_id = user.id
+        place.name = "Place {}".format(i)
+        place.price_by_night = 100 + i % 50
+        place.amenity_ids = [amenity.id]
+        review = Review()
+        review.place_id = place.id
+        review.user_id = user.id
+        review.text = "Great stay"
+    return amenity
+
+
+def timed(function):
+    """Return the number of seconds it takes to call function."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from models.engine.file_storage import FileStorage
+
+    print("{} objects, {} CPUs".format(count, os.cpu_count()))
+    print("{:<8}{:>10}{:>12}{:>10}".format("layout", "save s", "resave s",
+                                           "reload s"))
+    for name in ("single", "sharded"):
+        models.storage = FileStorage(sharded=(name == "sharded"))
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__encoded = {}
+        amenity = populate(count)
+        save = timed(models.storage.save)
+        amenity.name = "Wifi"
+        resave = timed(models.storage.save)
+        FileStorage._FileStorage__objects = {}
+        reload = timed(models.storage.reload)
+        assert len(models.storage.all()) == count // 6 * 6
+        print("{:<8}{:>10.2f}{:>12.2f}{:>10.2f}".format(
+            name, save, resave, reload))
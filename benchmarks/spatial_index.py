@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""Compares radius and nearest searches with and without a spatial index.
+
+Usage: ./benchmarks/spatial_index.py [number_of_places]
+
+Stores the given number of Places (1,000,000 by default) at random
+points of the continental United States, then times searches for the
+places within 10 km of random points and for the 10 places nearest them,
+through storage.near() and storage.nearest(), and by measuring the
+distance to every place. Reports the time to build the index and the
+mean time of a search.
+"""
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    os.chdir(tempfile.mkdtemp())
+    import models
+    from models.engine.file_storage import FileStorage
+    from models.engine.index import distance
+
+    rng = random.Random(0)
+    models.storage = storage = FileStorage()
+    for i in range(count):
+        storage.restore("Place", {"id": str(i),
+                                  "latitude": rng.uniform(25.0, 49.0),
+                                  "longitude": rng.uniform(-125.0, -67.0)})
+    points = [(rng.uniform(25.0, 49.0), rng.uniform(-125.0, -67.0))
+              for i in range(100)]
+    places = list(storage.all("Place").values())
+
+    def scan_near(lat, lon):
+        found = []
+        for pl in places:
+            km = distance(lat, lon, pl.latitude, pl.longitude)
+            if km <= 10:
+                found.append((pl, km))
+        return sorted(found, key=lambda item: item[1])
+
+    def scan_nearest(lat, lon):
+        return heapq.nsmallest(10, ((pl, distance(
+            lat, lon, pl.latitude, pl.longitude)) for pl in places),
+            key=lambda item: item[1])
+
+    start = time.perf_counter()
+    storage.near("Place", 0, 0, 0)
+    print("{} places, index built in {:.2f} s".format(
+        count, time.perf_counter() - start))
+    print("{:<10}{:>14}{:>14}{:>10}".format(
+        "search", "scan ms", "index ms", "speedup"))
+    for name, indexed, scan, arg in (
+            ("near", storage.near, scan_near, 10),
+            ("nearest", storage.nearest, scan_nearest, 10)):
+        start = time.perf_counter()
+        for lat, lon in points:
+            result = indexed("Place", lat, lon, arg)
+        index_ms = (time.perf_counter() - start) * 1000 / len(points)
+        start = time.perf_counter()
+        expected = [scan(lat, lon) for lat, lon in points[:3]]
+        scan_ms = (time.perf_counter() - start) * 1000 / 3
+        for (lat, lon), result in zip(points, expected):
+            assert ([km for pl, km in result] ==
+                    [km for pl, km in indexed("Place", lat, lon, arg)])
+        print("{:<10}{:>14.2f}{:>14.3f}{:>9.0f}x".format(
+            name, scan_ms, index_ms, scan_ms / index_ms))
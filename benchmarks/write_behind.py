@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""Compares console command latency with and without write-behind.
+
+Usage: ./benchmarks/write_behind.py [commands]
+
+Runs in a temporary directory. For stores of 1,000, 10,000 and 100,000
+Users, times create and update commands (200 by default) through the
+console, each of which saves storage, and reports the mean and worst
+latency of a command. Write-behind flushes every 0.1 second and the
+commands are issued 5 ms apart, so they run across several flushes. The
+time of the final flush is reported apart.
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+if __name__ == "__main__":
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    os.chdir(tempfile.mkdtemp())
+    import console
+    import models
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    print("{:<14}{:>9}{:>10}{:>10}{:>10}".format(
+        "storage", "objects", "mean ms", "max ms", "flush ms"))
+    for name, options in (("sync", {}),
+                          ("write_behind", {"write_behind": 0.1})):
+        for count in (1000, 10000, 100000):
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__encoded = {}
+            models.storage = console.storage = FileStorage(**options)
+            for i in range(count):
+                User()
+            FileStorage().save()
+            cmd = console.HBNBCommand()
+            latencies = []
+            with redirect_stdout(io.StringIO()) as out:
+                for i in range(commands // 2):
+                    time.sleep(0.005)
+                    start = time.perf_counter()
+                    cmd.onecmd("create User")
+                    latencies.append(time.perf_counter() - start)
+                    obj_id = out.getvalue().split()[-1]
+                    start = time.perf_counter()
+                    cmd.onecmd('update User {} first_name "Betty"'.format(
+                        obj_id))
+                    latencies.append(time.perf_counter() - start)
+                    time.sleep(0.005)
+            start = time.perf_counter()
+            models.storage.flush()
+            flush = time.perf_counter() - start
+            print("{:<14}{:>9}{:>10.2f}{:>10.2f}{:>10.2f}".format(
+                name, count, sum(latencies) / len(latencies) * 1000,
+                max(latencies) * 1000, flush * 1000))
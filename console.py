@@ -5,13 +5,8 @@ import re
 from shlex import split
 from models import storage
 from models.engine.file_storage import FileStorage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+from models.base_model import classes
+from models.relationship import Relationship, dependents
 
 
 def parse(arg):
@@ -32,23 +27,28 @@ def parse(arg):
         return retl
 
 
+def convert(cls, attr, value):
+    """Convert the text value to the type of the class attribute attr of
+    cls, or keep it as text if cls has no such attribute, as update stores
+    it."""
+    if type(cls.__dict__.get(attr)) in {str, int, float}:
+        return type(cls.__dict__[attr])(value)
+    return value
+
+
 class HBNBCommand(cmd.Cmd):
     """Defines the HolbertonBnB command interpreter.
 
     Attributes:
         prompt (str): The command prompt.
+        page_size (int): The number of instances all displays per page
+            when given --after without --limit.
+        __classes (dict): The model registry, looked up by class name.
     """
 
     prompt = "(hbnb) "
-    __classes = {
-        "BaseModel",
-        "User",
-        "State",
-        "City",
-        "Place",
-        "Amenity",
-        "Review"
-    }
+    page_size = 100
+    __classes = classes
 
     def emptyline(self):
         """Do nothing upon receiving an empty line."""
@@ -61,6 +61,11 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
+            "near": self.do_near,
+            "nearest": self.do_nearest,
+            "query": self.do_query,
+            "search": self.do_search,
+            "stats": self.do_stats,
             "update": self.do_update
         }
         match = re.search(r"\.", arg)
@@ -77,11 +82,13 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, arg):
         """Quit command to exit the program."""
+        storage.flush()
         return True
 
     def do_EOF(self, arg):
         """EOF signal to exit the program."""
         print("")
+        storage.flush()
         return True
 
     def do_create(self, arg):
@@ -94,7 +101,7 @@ class HBNBCommand(cmd.Cmd):
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            print(eval(argl[0])().id)
+            print(classes[argl[0]]().id)
             storage.save()
 
     def do_show(self, arg):
@@ -115,9 +122,16 @@ class HBNBCommand(cmd.Cmd):
             print(objdict["{}.{}".format(argl[0], argl[1])])
 
     def do_destroy(self, arg):
-        """Usage: destroy <class> <id> or <class>.destroy(<id>)
-        Delete a class instance of a given id."""
+        """Usage: destroy <class> <id> [--cascade] [--dry-run] or
+       <class>.destroy(<id>[, --cascade][, --dry-run])
+        Delete a class instance of a given id. With --cascade, also
+        delete the instances depending on it, such as the cities of a
+        state and their places and reviews. With --dry-run, display the
+        instances that would be deleted, one per line, instead."""
         argl = parse(arg)
+        flags = argl[2:]
+        unknown = [f for f in flags if f.startswith("--") and
+                   f not in ("--cascade", "--dry-run")]
         objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
@@ -127,35 +141,220 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
         elif "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
             print("** no instance found **")
+        elif len(unknown) > 0:
+            print("** invalid argument: {} **".format(unknown[0]))
         else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
+            obj = objdict["{}.{}".format(argl[0], argl[1])]
+            if "--dry-run" in flags:
+                objects = [obj]
+                if "--cascade" in flags:
+                    objects.extend(dependents(objects))
+                for obj in objects:
+                    print(obj)
+                return False
+            storage.delete(obj, cascade="--cascade" in flags)
             storage.save()
 
     def do_all(self, arg):
-        """Usage: all or all <class> or <class>.all()
+        """Usage: all or all <class> or <class>.all() or
+       all [<class>] --limit <number> [--after <cursor>]
         Display string representations of all instances of a given class.
-        If no class is specified, displays all instantiated objects."""
+        If no class is specified, displays all instantiated objects.
+        With --limit, displays one page of instances, one per line, in
+        the order of their ids, followed by the cursor to pass to --after
+        for the next page if there is one."""
         argl = parse(arg)
-        if len(argl) > 0 and argl[0] not in HBNBCommand.__classes:
+        options = {}
+        while len(argl) > 1 and argl[-2] in ("--limit", "--after"):
+            value = argl.pop()
+            options[argl.pop()] = value
+        extra = [a for a in argl[:1] if a.startswith("--")] + argl[1:]
+        if len(extra) > 0:
+            print("** invalid argument: {} **".format(extra[0]))
+        elif len(argl) > 0 and argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
+        elif len(options) > 0:
+            try:
+                objdict, cursor = storage.page(
+                    argl[0] if len(argl) > 0 else None,
+                    int(options.get("--limit", HBNBCommand.page_size)),
+                    options.get("--after"))
+            except ValueError:
+                print("** invalid page: {} **".format(" ".join(
+                    "{} {}".format(*item)
+                    for item in reversed(options.items()))))
+                return False
+            for obj in objdict.values():
+                print(obj)
+            if cursor is not None:
+                print("** next page: --after {} **".format(cursor))
         else:
-            objl = []
-            for obj in storage.all().values():
-                if len(argl) > 0 and argl[0] == obj.__class__.__name__:
-                    objl.append(obj.__str__())
-                elif len(argl) == 0:
-                    objl.append(obj.__str__())
-            print(objl)
+            if len(argl) > 0:
+                objdict = storage.all(argl[0])
+            else:
+                objdict = storage.all()
+            print([obj.__str__() for obj in objdict.values()])
 
     def do_count(self, arg):
-        """Usage: count <class> or <class>.count()
-        Retrieve the number of instances of a given class."""
+        """Usage: count <class> [<attribute>=<value> ...] or
+       <class>.count(<arguments>)
+        Retrieve the number of instances of a given class, optionally
+        with the given attribute values."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print(storage.count(argl[0]))
+            return False
+        cls = HBNBCommand.__classes[argl[0]]
+        equals = {}
+        try:
+            for argument in argl[1:]:
+                name, sep, value = argument.partition("=")
+                if not sep:
+                    raise ValueError
+                equals[name] = convert(cls, name, value)
+        except ValueError:
+            print("** invalid argument: {} **".format(argument))
+            return False
+        print(storage.count(cls, **equals))
+
+    def do_stats(self, arg):
+        """Usage: stats [<class> <attribute>]
+        Display the number of instances of every class, or of a given
+        class with each value of an attribute, one per line, most
+        common value first."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            for name, count in storage.counts().items():
+                print("{}: {}".format(name, count))
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        if len(argl) == 1:
+            print("** attribute name missing **")
+            return False
+        counts = storage.counts(HBNBCommand.__classes[argl[0]], argl[1])
+        for value, count in sorted(counts.items(),
+                                   key=lambda item: (-item[1], str(item[0]))):
+            print("{}: {}".format(value, count))
+
+    def do_query(self, arg):
+        """Usage: query <class> [<attribute>[__<operator>]=<value> ...]
+       [order_by=[-]<attribute>[,...]] [limit=<number>]
+       [only=<attribute>[,...]] or <class>.query(<arguments>)
+        Display the instances of a class matching every condition, one
+        per line. Operators are exact, ne, lt, lte, gt, gte, in (with
+        comma-separated values) and contains."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return False
+        cls = HBNBCommand.__classes[argl[0]]
+        query = storage.query(cls)
+        try:
+            for argument in argl[1:]:
+                name, sep, value = argument.partition("=")
+                if not sep:
+                    raise ValueError
+                if name == "order_by":
+                    query = query.order_by(*value.split(","))
+                elif name == "limit":
+                    query = query.limit(int(value))
+                elif name == "only":
+                    query = query.only(*value.split(","))
+                elif name.endswith("__in"):
+                    query = query.where(**{name: [
+                        convert(cls, name[:-4], v) for v in value.split(",")]})
+                else:
+                    attr = name.rpartition("__")[0] or name
+                    query = query.where(**{name: convert(cls, attr, value)})
+        except ValueError:
+            print("** invalid argument: {} **".format(argument))
+            return False
+        try:
+            results = list(query)
+        except TypeError:
+            print("** values can't be ordered **")
+            return False
+        for result in results:
+            print(result)
+
+    def do_near(self, arg):
+        """Usage: near <class> <latitude> <longitude> <radius_km>
+        Display the instances of a class within a radius of a point,
+        nearest first, each preceded by its distance."""
+        self.__locate(parse(arg), storage.near, "radius", float)
+
+    def do_nearest(self, arg):
+        """Usage: nearest <class> <latitude> <longitude> <count>
+        Display the given number of instances of a class nearest a point,
+        each preceded by its distance."""
+        self.__locate(parse(arg), storage.nearest, "count", int)
+
+    def __locate(self, argl, search, last, number):
+        """Display the results of a near or nearest search.
+
+        Args:
+            argl (list): The class name, latitude, longitude and last.
+            search (method): The storage method searching.
+            last (str): The name of the last argument.
+            number (type): The type of the last argument.
+        """
+        names = ("class name", "latitude", "longitude", last)
+        if len(argl) < len(names):
+            print("** {} missing **".format(names[len(argl)]))
+            return
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return
+        if not HBNBCommand.__classes[argl[0]].__spatial__:
+            print("** class has no location **")
+            return
+        args = []
+        for value, vtype in zip(argl[1:4], (float, float, number)):
+            try:
+                args.append(vtype(value))
+            except ValueError:
+                print("** invalid argument: {} **".format(value))
+                return
+        try:
+            results = search(argl[0], *args)
+        except ValueError:
+            print("** invalid location: {} {} **".format(*argl[1:3]))
+            return
+        for obj, km in results:
+            print("[{:.3f} km] {}".format(km, obj))
+
+    def do_search(self, arg):
+        """Usage: search <class> "<terms>"
+        Display the instances of a class containing any of the terms,
+        best match first, each preceded by its score. Terms quoted with
+        double quotes inside the terms must appear as a phrase."""
         argl = parse(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        if len(argl) == 0:
+            print("** class name missing **")
+        elif argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        elif not HBNBCommand.__classes[argl[0]].__text__:
+            print("** class has no text **")
+        elif len(argl) == 1:
+            print("** terms missing **")
+        else:
+            for obj, score in storage.search(argl[0], " ".join(argl[1:])):
+                print("[{:.3f}] {}".format(score, obj))
+
+    def do_compact(self, arg):
+        """Usage: compact
+        Write a fresh snapshot of storage and drop its journal."""
+        seconds, reclaimed = storage.compact()
+        print("Compacted in {:.3f}s, {} bytes reclaimed".format(
+            seconds, reclaimed))
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value> or
@@ -188,6 +387,18 @@ class HBNBCommand(cmd.Cmd):
                 print("** value missing **")
                 return False
 
+        cls = HBNBCommand.__classes[argl[0]]
+        if len(argl) == 4:
+            names = [argl[2]]
+        elif type(eval(argl[2])) == dict:
+            names = list(eval(argl[2]))
+        else:
+            names = []
+        for name in names:
+            if isinstance(getattr(cls, name, None), Relationship):
+                print("** attribute is read-only: {} **".format(name))
+                return False
+
         if len(argl) == 4:
             obj = objdict["{}.{}".format(argl[0], argl[1])]
             if argl[2] in obj.__class__.__dict__.keys():
@@ -195,6 +406,7 @@ class HBNBCommand(cmd.Cmd):
                 obj.__dict__[argl[2]] = valtype(argl[3])
             else:
                 obj.__dict__[argl[2]] = argl[3]
+            storage.touch(obj)
         elif type(eval(argl[2])) == dict:
             obj = objdict["{}.{}".format(argl[0], argl[1])]
             for k, v in eval(argl[2]).items():
@@ -204,6 +416,7 @@ class HBNBCommand(cmd.Cmd):
                     obj.__dict__[k] = valtype(v)
                 else:
                     obj.__dict__[k] = v
+            storage.touch(obj)
         storage.save()
 
 
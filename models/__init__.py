@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""Creates the storage engine of the models package.
+
+The engine is looked up by name in BACKENDS. The name is the environment
+variable HBNB_TYPE_STORAGE if it is set, else the type option of the
+[storage] section of the configuration file named by HBNB_CONFIG
+(hbnb.cfg by default), else "file". The other options of that section
+are passed to the engine as keyword arguments.
+
+The engine is created and reloaded the first time models.storage is read.
+
+The model modules are imported here so that every model class is in the
+registry of models.base_model.classes, which storage engines and the
+console look classes up in by name.
+"""
+import configparser
+from importlib import import_module
+from os import getenv
+from models import base_model, user, state, city, place, amenity, review
+
+BACKENDS = {
+    "file": "models.engine.file_storage.FileStorage",
+    "memory": "models.engine.memory_storage.MemoryStorage",
+    "db": "models.engine.db_storage.DBStorage",
+}
+
+
+def register(name, backend):
+    """Add a storage engine to BACKENDS.
+
+    Args:
+        name (str): The name selecting the engine.
+        backend (callable or str): The engine class or factory, or its
+            dotted path so that it is only imported when selected.
+    """
+    BACKENDS[name] = backend
+
+
+def read_config(path=None):
+    """Return the options of the [storage] section of a configuration file.
+
+    Numbers are converted to int or float, and other boolean values such
+    as "yes" or "false" to bool.
+
+    Args:
+        path (str): The file to read, HBNB_CONFIG or hbnb.cfg if None.
+            A missing file has no options.
+    """
+    parser = configparser.ConfigParser()
+    parser.read(path or getenv("HBNB_CONFIG", "hbnb.cfg"))
+    if not parser.has_section("storage"):
+        return {}
+    options = {}
+    for option, value in parser.items("storage"):
+        for number in (int, float):
+            try:
+                value = number(value)
+                break
+            except ValueError:
+                pass
+        else:
+            if value.lower() in parser.BOOLEAN_STATES:
+                value = parser.BOOLEAN_STATES[value.lower()]
+        options[option] = value
+    return options
+
+
+def create_storage(name=None, **options):
+    """Create a storage engine, without reloading it.
+
+    Args:
+        name (str): The name of the engine in BACKENDS. If None, the name
+            and options are read from HBNB_TYPE_STORAGE and the
+            configuration file.
+        **options: Keyword arguments of the engine.
+
+    Raises:
+        ValueError: If name is not in BACKENDS.
+    """
+    if name is None:
+        config = read_config()
+        name = config.pop("type", "file")
+        if getenv("HBNB_TYPE_STORAGE", name) != name:
+            name = getenv("HBNB_TYPE_STORAGE")
+            config = {}
+        options = dict(config, **options)
+    if name not in BACKENDS:
+        raise ValueError("Unknown storage backend {!r}".format(name))
+    backend = BACKENDS[name]
+    if isinstance(backend, str):
+        module, _, attr = backend.rpartition(".")
+        backend = getattr(import_module(module), attr)
+    return backend(**options)
+
+
+def __getattr__(name):
+    """Create the storage engine the first time models.storage is read.
+
+    The engine is bound to models.storage before it is reloaded, since
+    the objects it reloads refer to it.
+    """
+    if name == "storage":
+        global storage
+        storage = create_storage()
+        storage.reload()
+        return storage
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
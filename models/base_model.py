@@ -1,12 +1,43 @@
 #!/usr/bin/python3
-"""Defines the BaseModel class."""
+"""Defines the BaseModel class and the registry of model classes.
+
+Attributes:
+    classes (dict): The name of BaseModel and of each of its subclasses
+        mapped to the class, filled in as the classes are defined.
+"""
 import models
 from uuid import uuid4
 from datetime import datetime
 
+classes = {}
+
 
 class BaseModel:
-    """Represents the BaseModel of the HBnB project."""
+    """Represents the BaseModel of the HBnB project.
+
+    Attributes:
+        __indexes__ (tuple): The names of the attributes storage keeps a
+            hash index on, to search the instances of the class by value.
+        __ranges__ (tuple): The names of the number attributes storage
+            keeps a sorted index on, to search the instances of the class
+            by range of values and to read them in order.
+        __spatial__ (tuple): The names of the latitude and longitude
+            attributes storage keeps a spatial index on, to search the
+            instances of the class by distance, or empty.
+        __text__ (tuple): The names of the text attributes storage keeps a
+            full-text index on, to search the instances of the class by
+            words.
+    """
+
+    __indexes__ = ()
+    __ranges__ = ()
+    __spatial__ = ()
+    __text__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """Add a new model class to the registry of model classes."""
+        super().__init_subclass__(**kwargs)
+        classes[cls.__name__] = cls
 
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel.
@@ -15,19 +46,23 @@ class BaseModel:
             *args (any): Unused.
             **kwargs (dict): Key/value pairs of attributes.
         """
-        time_format = "%Y-%m-%dT%H:%M:%S.%f"
-        self.id = str(uuid4())
-        self.created_at = datetime.today()
-        self.updated_at = datetime.today()
+        self.__dict__["id"] = str(uuid4())
+        self.__dict__["created_at"] = datetime.today()
+        self.__dict__["updated_at"] = datetime.today()
         if len(kwargs) != 0:
             for k, v in kwargs.items():
                 if k == "created_at" or k == "updated_at":
-                    self.__dict__[k] = datetime.strptime(v, time_format)
+                    self.__dict__[k] = datetime.fromisoformat(v)
                 else:
                     self.__dict__[k] = v
         else:
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Set an attribute and mark the instance as changed in storage."""
+        super().__setattr__(name, value)
+        models.storage.touch(self)
+
     def save(self):
         """Update updated_at with the current datetime."""
         self.updated_at = datetime.today()
@@ -50,3 +85,5 @@ class BaseModel:
         class_name = self.__class__.__name__
         return "[{}] ({}) {}".format(class_name, self.id, self.__dict__)
 
+
+classes[BaseModel.__name__] = BaseModel
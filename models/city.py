@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Defines the City class."""
 from models.base_model import BaseModel
+from models.relationship import BelongsTo, HasMany
 
 
 class City(BaseModel):
@@ -9,7 +10,14 @@ class City(BaseModel):
     Attributes:
         state_id (str): The state id.
         name (str): The name of the city.
+        state (State): The state of the city.
+        places (list): The places of the city.
     """
 
+    __indexes__ = ("state_id",)
+
     state_id = ""
     name = ""
+
+    state = BelongsTo("State", "state_id")
+    places = HasMany("Place", "city_id", cascade=True)
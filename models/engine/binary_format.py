@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+"""Defines the binary storage format of FileStorage.
+
+A file starts with MAGIC and is followed by records, each made of a
+little-endian uint32 body length and the body. The first byte of a body
+is the record kind:
+
+    C  class:      uint16 class tag, class name
+    A  attribute:  uint16 class tag, uint16 attribute index, name
+    O  object:     uint16 class tag, then for each attribute a uint16
+                   attribute index and a value
+
+Class and attribute names are written once, the first time an object
+uses them, and objects refer to them by number. A value is a type byte
+followed by its data: nothing for None, False and True, a signed int64,
+a float64, a uint32 length and UTF-8 bytes for str, the int64 number of
+microseconds since 1970-01-01 for a naive datetime, or a uint32 length
+and JSON text for anything else.
+
+Usage: python3 -m models.engine.binary_format to-binary|to-json SRC DST
+"""
+import json
+import struct
+import sys
+from datetime import datetime, timedelta
+from models.engine.json_stream import iter_values
+
+MAGIC = b"HBNB\x01"
+EPOCH = datetime(1970, 1, 1)
+_CLASS, _ATTRIBUTE, _OBJECT = b"CAO"
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _DATETIME, _JSON = range(8)
+_LENGTH = struct.Struct("<I")
+_TAG = struct.Struct("<H")
+_TAG_INDEX = struct.Struct("<HH")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode(value, out):
+    """Append the encoded value to the bytearray out."""
+    vtype = type(value)
+    if vtype is str:
+        data = value.encode()
+        out.append(_STR)
+        out += _LENGTH.pack(len(data))
+        out += data
+    elif vtype is datetime and value.tzinfo is None:
+        out.append(_DATETIME)
+        out += _INT64.pack((value - EPOCH) // _MICROSECOND)
+    elif value is None:
+        out.append(_NONE)
+    elif value is False:
+        out.append(_FALSE)
+    elif value is True:
+        out.append(_TRUE)
+    elif vtype is int and -1 << 63 <= value < 1 << 63:
+        out.append(_INT)
+        out += _INT64.pack(value)
+    elif vtype is float:
+        out.append(_FLOAT)
+        out += _FLOAT64.pack(value)
+    else:
+        data = json.dumps(value, default=str).encode()
+        out.append(_JSON)
+        out += _LENGTH.pack(len(data))
+        out += data
+
+
+def _decode(body, pos):
+    """Return the value encoded in body at pos and the offset after it."""
+    vtype = body[pos]
+    pos += 1
+    if vtype == _STR or vtype == _JSON:
+        end = pos + 4 + _LENGTH.unpack_from(body, pos)[0]
+        text = body[pos + 4:end].decode()
+        if vtype == _STR:
+            return text, end
+        return json.loads(text), end
+    if vtype == _DATETIME:
+        micros = _INT64.unpack_from(body, pos)[0]
+        return EPOCH + timedelta(microseconds=micros), pos + 8
+    if vtype == _INT:
+        return _INT64.unpack_from(body, pos)[0], pos + 8
+    if vtype == _FLOAT:
+        return _FLOAT64.unpack_from(body, pos)[0], pos + 8
+    if vtype <= _TRUE:
+        return (None, False, True)[vtype], pos
+    raise ValueError("Unknown value type {}".format(vtype))
+
+
+class BinaryWriter:
+    """Represent a writer of objects to a binary storage file.
+
+    Attributes:
+        f (file): The file written to, opened in binary mode.
+        classes (dict): Class names mapped to their tag and to the
+            dictionary of the index of each of their attribute names.
+    """
+
+    def __init__(self, f):
+        """Initialize a new BinaryWriter and write MAGIC to f.
+
+        Args:
+            f (file): A file opened for writing in binary mode.
+        """
+        self.f = f
+        self.classes = {}
+        f.write(MAGIC)
+
+    def __record(self, body):
+        """Write the length-prefixed record body."""
+        self.f.write(_LENGTH.pack(len(body)))
+        self.f.write(body)
+
+    def write(self, cls_name, attrs):
+        """Write an object record.
+
+        Args:
+            cls_name (str): The name of the class of the object.
+            attrs (dict): The attributes of the object, such as its
+                __dict__, with datetime values for the timestamps.
+        """
+        if cls_name not in self.classes:
+            self.classes[cls_name] = (len(self.classes), {})
+            self.__record(bytes((_CLASS,)) +
+                          _TAG.pack(len(self.classes) - 1) +
+                          cls_name.encode())
+        tag, names = self.classes[cls_name]
+        body = bytearray((_OBJECT,))
+        body += _TAG.pack(tag)
+        for name, value in attrs.items():
+            if name not in names:
+                names[name] = len(names)
+                self.__record(bytes((_ATTRIBUTE,)) +
+                              _TAG_INDEX.pack(tag, names[name]) +
+                              name.encode())
+            body += _TAG.pack(names[name])
+            _encode(value, body)
+        self.__record(body)
+
+
+def iter_records(f):
+    """Read the objects of a binary storage file.
+
+    Args:
+        f (file): A file opened for reading in binary mode.
+
+    Yields:
+        A (class name, attributes dictionary) tuple for each object.
+
+    Raises:
+        ValueError: If f is not a binary storage file.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a binary storage file")
+    classes = []
+    while True:
+        head = f.read(4)
+        if len(head) == 0:
+            return
+        size = _LENGTH.unpack(head)[0]
+        body = f.read(size)
+        if len(body) != size:
+            raise ValueError("Truncated record")
+        kind = body[0]
+        if kind == _OBJECT:
+            cls_name, names = classes[_TAG.unpack_from(body, 1)[0]]
+            attrs = {}
+            pos = 3
+            while pos < size:
+                name = names[_TAG.unpack_from(body, pos)[0]]
+                attrs[name], pos = _decode(body, pos + 2)
+            yield cls_name, attrs
+        elif kind == _ATTRIBUTE:
+            tag, index = _TAG_INDEX.unpack_from(body, 1)
+            classes[tag][1].insert(index, body[5:].decode())
+        elif kind == _CLASS:
+            classes.insert(_TAG.unpack_from(body, 1)[0],
+                           (body[3:].decode(), []))
+        else:
+            raise ValueError("Unknown record kind {!r}".format(body[:1]))
+
+
+def json_to_binary(src, dst):
+    """Convert a JSON storage file to the binary storage format.
+
+    Args:
+        src (str): The path of the JSON file to read.
+        dst (str): The path of the binary file to write.
+    """
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        writer = BinaryWriter(fout)
+        for key, o in iter_values(fin):
+            cls_name = o.pop("__class__")
+            for name in ("created_at", "updated_at"):
+                if name in o:
+                    o[name] = datetime.fromisoformat(o[name])
+            writer.write(cls_name, o)
+
+
+def binary_to_json(src, dst):
+    """Convert a binary storage file to the JSON storage format.
+
+    The JSON file is the same as FileStorage would save.
+
+    Args:
+        src (str): The path of the binary file to read.
+        dst (str): The path of the JSON file to write.
+    """
+    with open(src, "rb") as fin, open(dst, "w") as fout:
+        fout.write("{")
+        sep = ""
+        for cls_name, attrs in iter_records(fin):
+            for name, value in attrs.items():
+                if type(value) is datetime:
+                    attrs[name] = value.isoformat()
+            attrs["__class__"] = cls_name
+            key = "{}.{}".format(cls_name, attrs["id"])
+            fout.write(sep + json.dumps(key) + ": " + json.dumps(attrs))
+            sep = ", "
+        fout.write("}")
+
+
+if __name__ == "__main__":
+    commands = {"to-binary": json_to_binary, "to-json": binary_to_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        print(__doc__.splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+    commands[sys.argv[1]](sys.argv[2], sys.argv[3])
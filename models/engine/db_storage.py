@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+"""Defines the DBStorage class."""
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from models.engine.file_storage import FileStorage
+from models.base_model import classes
+
+
+class DBStorage(FileStorage):
+    """Represent a storage engine persisting objects in a SQLite database.
+
+    Objects are kept in memory exactly as FileStorage does, so querying
+    them works the same; save() writes the objects changed since the last
+    save in a single transaction, and reload() reads every table.
+
+    Each class of the model registry has a table named after it, with the
+    id, created_at and updated_at columns, a column for each str, int,
+    float or list class attribute, and an extra column holding the JSON of
+    any other instance attribute. A NULL column means the instance uses
+    the class attribute.
+
+    Attributes:
+        __db_path (str): The name of the database file.
+        __types (dict): Python types mapped to their SQLite column type.
+    """
+    __db_path = "file.db"
+    __types = {str: "TEXT", int: "INTEGER", float: "REAL", list: "TEXT"}
+
+    def __init__(self, *, path=None):
+        """Initialize a new DBStorage and create the missing tables.
+
+        Args:
+            path (str): The name of the database file, __db_path if None.
+        """
+        super().__init__()
+        self.__path = path or DBStorage.__db_path
+        self.__connection = sqlite3.connect(self.__path)
+        self.__columns = {}
+        for cls in classes.values():
+            self.__create_table(cls)
+
+    def __create_table(self, cls):
+        """Create the table of cls, its missing columns and indexes."""
+        name = cls.__name__
+        columns = {attr: type(value) for attr, value in vars(cls).items()
+                   if not attr.startswith("_") and
+                   type(value) in DBStorage.__types}
+        with self.__connection as db:
+            db.execute('CREATE TABLE IF NOT EXISTS "{}" (id TEXT PRIMARY KEY,'
+                       ' created_at TEXT, updated_at TEXT, extra TEXT)'
+                       .format(name))
+            existing = {row[1] for row in
+                        db.execute('PRAGMA table_info("{}")'.format(name))}
+            for attr, vtype in columns.items():
+                if attr not in existing:
+                    db.execute('ALTER TABLE "{}" ADD COLUMN "{}" {}'.format(
+                        name, attr, DBStorage.__types[vtype]))
+                if attr.endswith("_id"):
+                    db.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON '
+                               '"{0}" ("{1}")'.format(name, attr))
+        self.__columns[name] = columns
+
+    def __columns_of(self, cls):
+        """Return the class attribute columns of the table of cls, creating
+        the table of a class defined after the storage."""
+        if cls.__name__ not in self.__columns:
+            self.__create_table(cls)
+        return self.__columns[cls.__name__]
+
+    def __row(self, obj):
+        """Return the id, created_at, updated_at, extra and class attribute
+        column values of obj."""
+        columns = self.__columns_of(type(obj))
+        values = [obj.id, obj.created_at.isoformat(),
+                  obj.updated_at.isoformat()]
+        extra = {}
+        for attr, value in obj.__dict__.items():
+            if attr in ("id", "created_at", "updated_at"):
+                continue
+            if attr not in columns or type(value) is not columns[attr]:
+                extra[attr] = value
+        values.append(json.dumps(extra) if extra else None)
+        for attr, vtype in columns.items():
+            value = obj.__dict__.get(attr)
+            if type(value) is not vtype:
+                value = None
+            elif vtype is list:
+                value = json.dumps(value)
+            values.append(value)
+        return values
+
+    def save(self):
+        """Write the objects changed since the last save to the database.
+
+        The changes are kept for the next save if they cannot be written.
+        """
+        changes = self.pop_changes()
+        try:
+            rows = {}
+            deleted = {}
+            for key, obj in changes.items():
+                cls_name, _, obj_id = key.partition(".")
+                if obj is None:
+                    self.__columns_of(classes[cls_name])
+                    deleted.setdefault(cls_name, []).append((obj_id,))
+                else:
+                    rows.setdefault(cls_name, []).append(self.__row(obj))
+            with self.__connection as db:
+                for cls_name, ids in deleted.items():
+                    db.executemany('DELETE FROM "{}" WHERE id = ?'.format(
+                        cls_name), ids)
+                for cls_name, values in rows.items():
+                    names = ["id", "created_at", "updated_at", "extra"]
+                    names += self.__columns[cls_name]
+                    db.executemany('INSERT OR REPLACE INTO "{}" ("{}") '
+                                   'VALUES ({})'.format(
+                                       cls_name, '", "'.join(names),
+                                       ", ".join("?" * len(names))),
+                                   values)
+        except BaseException:
+            self.restore_changes(changes)
+            raise
+
+    def reload(self):
+        """Add every object of the database to the stored objects."""
+        for cls_name, cls in list(classes.items()):
+            columns = self.__columns_of(cls)
+            query = 'SELECT id, created_at, updated_at, extra{} FROM "{}"'
+            cursor = self.__connection.execute(query.format(
+                "".join(', "{}"'.format(attr) for attr in columns), cls_name))
+            for row in cursor:
+                attrs = {
+                    "id": row[0],
+                    "created_at": datetime.fromisoformat(row[1]),
+                    "updated_at": datetime.fromisoformat(row[2]),
+                }
+                for (attr, vtype), value in zip(columns.items(), row[4:]):
+                    if value is not None:
+                        if vtype is list:
+                            value = json.loads(value)
+                        attrs[attr] = value
+                if row[3] is not None:
+                    attrs.update(json.loads(row[3]))
+                self.restore(cls_name, attrs)
+
+    def compact(self):
+        """Rebuild the database file without its free pages.
+
+        Returns:
+            A (seconds, bytes) tuple of the time compaction took and the
+            number of bytes it freed on disk.
+        """
+        start = time.perf_counter()
+        before = os.path.getsize(self.__path)
+        self.__connection.execute("VACUUM")
+        return (time.perf_counter() - start,
+                before - os.path.getsize(self.__path))
+
+    def close(self):
+        """Close the connection to the database."""
+        self.__connection.close()
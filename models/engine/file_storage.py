@@ -1,13 +1,85 @@
 #!/usr/bin/python3
 """Defines the FileStorage class."""
+import atexit
+import base64
+import binascii
+import dbm
+import gc
+import glob
+import heapq
 import json
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from models.engine.binary_format import BinaryWriter, iter_records
+from models.engine.fulltext import TextIndex
+from models.engine.index import GridIndex, HashIndex, RangeIndex
+from models.engine.json_stream import iter_members, iter_values
+from models.engine.lazy import BoundedLazyDict, LazyDict, Unloaded
+from models.engine.query import Query
+from models.base_model import classes
+from models.relationship import dependents
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _attributes(o):
+    """Return the class name and attributes of a decoded object.
+
+    Args:
+        o (dict): The to_dict() of an object, consumed.
+
+    Returns:
+        A (class name, attributes dictionary) tuple, with datetime values
+        for the timestamps.
+    """
+    cls_name = o.pop("__class__")
+    for name in ("created_at", "updated_at"):
+        if name in o:
+            o[name] = datetime.fromisoformat(o[name])
+    return cls_name, o
+
+
+def _cursor(key):
+    """Return the opaque pagination cursor of the storage key key."""
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def _cursor_key(cursor):
+    """Return the storage key encoded in a pagination cursor.
+
+    Raises:
+        ValueError: If cursor is not a cursor.
+    """
+    try:
+        key = base64.b64decode(cursor.encode(), altchars=b"-_",
+                               validate=True).decode()
+    except (binascii.Error, UnicodeError):
+        key = None
+    if key is None or _cursor(key) != cursor:
+        raise ValueError("Invalid cursor {!r}".format(cursor))
+    return key
+
+
+def _read_shard(path):
+    """Decode the objects of a shard file, for a reload worker process.
+
+    Args:
+        path (str): The path of the shard file.
+
+    Returns:
+        A list of (class name, attributes dictionary) tuples, with
+        datetime values for the timestamps.
+    """
+    with open(path, "rb") as f:
+        return [_attributes(o) for key, o in iter_values(f)]
 
 
 class FileStorage:
@@ -15,35 +87,1386 @@ class FileStorage:
 
     Attributes:
         __file_path (str): The name of the file to save objects to.
+        __binary_path (str): The name of the file to save objects to in
+            the binary format.
+        __journal_path (str): The name of the append-only journal file.
+        __offsets_path (str): The name of the file listing where each
+            object is in __file_path, written by the saves of a lazy
+            storage and read by its reload.
+        __shard_dir (str): The name of the directory holding one JSON
+            file per class in sharded mode.
+        __lock_path (str): The name of the file locked by the processes
+            sharing __file_path in shared mode.
+        __compact_min_size (int): The size in bytes the journal must reach
+            before it is compacted automatically.
+        __spill_path (str): The name of the dbm database holding the
+            objects evicted from memory in bounded mode.
+        __evicted (WeakValueDictionary): Keys mapped to the evicted
+            objects still referenced elsewhere, so that loading them
+            again returns the same object.
+        __origins (dict): In bounded mode, keys of instantiated objects
+            mapped to an Unloaded placeholder of their JSON text as last
+            saved, which they are evicted to unless changed since.
         __objects (dict): A dictionary of instantiated objects.
+        __changes (dict): Keys changed since the last save, mapped to the
+            object to persist or None if the object was deleted.
+        __encoded (dict): Keys mapped to an (object, JSON bytes) pair caching
+            the serialized form of every object as of the last save.
+        __buffer_size (int): The size of the write buffer used by save().
+        __partitions (dict): Class names mapped to the dictionary of the
+            objects of that class, kept alongside __objects.
+        __partitioned (dict): The __objects dictionary __partitions was
+            built from.
+        __indexes (dict): Class names mapped to a dictionary of the
+            indexes of the class built so far, see __index(). Each index
+            is built the first time a search uses it.
+        __text_path (str): The name of the file each TextIndex is saved
+            to by compact() and at interpreter exit, formatted with the
+            class name.
+        __text_at_exit (bool): True once the text indexes are set to be
+            saved at interpreter exit.
+        __lock (RLock): Held while objects are added, changed, deleted or
+            written, so that a delayed group commit runs between them.
+        __write_lock (RLock): Held by a write to disk from before it takes
+            __lock until it is done, so that a flush can write outside
+            __lock without another write running meanwhile.
+        __read_lock (RLock): Held while the objects in memory and their
+            indexes change, and by the reads of an index, which so never
+            wait for a write to disk holding __lock.
     """
     __file_path = "file.json"
+    __binary_path = "file.bin"
+    __journal_path = "file.json.journal"
+    __offsets_path = "file.json.offsets"
+    __shard_dir = "file.json.d"
+    __lock_path = "file.json.lock"
+    __compact_min_size = 1 << 20
+    __spill_path = "file.json.spill"
+    __text_path = "file.json.{}.text"
+    __text_at_exit = False
+    __evicted = weakref.WeakValueDictionary()
+    __origins = {}
     __objects = {}
+    __changes = {}
+    __encoded = {}
+    __buffer_size = 1 << 16
+    __partitions = {}
+    __partitioned = None
+    __indexes = {}
+    __lock = threading.RLock()
+    __read_lock = threading.RLock()
+    __write_lock = threading.RLock()
+
+    def __init__(self, *, journal=False, lazy=False, cache=True,
+                 binary=False, sharded=False, fsync=False, group_commit=0,
+                 write_behind=0, flush_threshold=1000, shared=False,
+                 compact_ratio=0, max_objects=0):
+        """Initialize a new FileStorage.
+
+        Args:
+            journal (bool): If True, save() appends the objects changed
+                since the last save to the journal instead of rewriting
+                the whole JSON file.
+            lazy (bool): If True, reload() only records where each object
+                is in the JSON file, and objects are instantiated the
+                first time they are read from __objects.
+            cache (bool): If False, save() encodes every object again
+                instead of keeping its JSON text in __encoded between
+                saves, trading CPU time for memory.
+            binary (bool): If True, objects are saved to and reloaded from
+                __binary_path in the format of models.engine.binary_format
+                instead of JSON.
+            sharded (bool): If True, the objects of each class are saved
+                to their own JSON file in __shard_dir, only the files of
+                the classes changed since the last save are rewritten,
+                and reload() decodes the files in parallel processes.
+            fsync (bool): If True, save() waits for the written files and
+                their renaming to reach the disk.
+            group_commit (float): If positive, the number of milliseconds
+                a save() following a write is delayed by, so that the
+                saves issued during that time are written at once.
+            write_behind (float): If positive, save() returns at once and
+                a background thread writes the changes every write_behind
+                seconds.
+            flush_threshold (int): In write-behind mode, the number of
+                changed objects that wakes the background thread before
+                the interval is over.
+            shared (bool): If True, several processes can use __file_path
+                at once: reload() and save() lock __lock_path, and save()
+                first merges the objects other processes saved since this
+                one last read or wrote the file.
+            compact_ratio (float): If positive, in journal mode save()
+                starts compact() in the background once the journal is
+                more than compact_ratio times larger than the snapshot.
+            max_objects (int): If positive, storage is lazy and keeps at
+                most max_objects objects instantiated. The least recently
+                used ones are encoded to the dbm database __spill_path
+                and instantiated again when read.
+
+        Raises:
+            ValueError: If lazy or sharded is True along with binary, or
+                lazy along with sharded, or if shared is True along with
+                any of them or journal, or without fcntl.
+        """
+        lazy = lazy or max_objects > 0
+        if binary and (lazy or sharded):
+            raise ValueError("lazy reload and sharding require the JSON "
+                             "format")
+        if lazy and sharded:
+            raise ValueError("lazy reload requires a single JSON file")
+        if shared and (journal or lazy or binary or sharded):
+            raise ValueError("shared storage requires the JSON file alone")
+        if shared and fcntl is None:
+            raise ValueError("shared storage requires fcntl")
+        self.__journal = journal
+        self.__lazy = lazy
+        self.__cache = cache
+        self.__binary = binary
+        self.__sharded = sharded
+        self.__fsync = fsync
+        self.__group_commit = group_commit / 1000
+        self.__last_write = float("-inf")
+        self.__timer = None
+        self.__write_behind = write_behind
+        self.__flush_threshold = flush_threshold
+        self.__pending = False
+        self.__wake = threading.Event()
+        self.__flusher = None
+        self.__shared = shared
+        self.__seen = None
+        self.__compact_ratio = compact_ratio
+        self.__compactor = None
+        self.__max_objects = max_objects
+        self.__spill = None
+
+    def all(self, cls=None):
+        """Return the dictionary __objects.
+
+        Args:
+            cls (type or str): If given, only return the objects of this
+                class, as a new dictionary.
+        """
+        if cls is None:
+            return FileStorage.__objects
+        if isinstance(FileStorage.__objects, LazyDict):
+            return LazyDict(self.__load_key, self.__partition(cls))
+        return dict(self.__partition(cls))
+
+    def page(self, cls=None, limit=100, after=None):
+        """Return a page of the stored objects, in the order of their keys.
+
+        Only the keys are scanned to find the page, keeping the limit
+        smallest keys after the cursor, so memory use is bounded by the
+        page size and objects of a lazy storage are loaded for the page
+        only. Objects added or deleted between pages do not shift the
+        pages: the next page starts after the last key returned.
 
-    def all(self):
-        """Return the dictionary __objects."""
-        return FileStorage.__objects
+        Args:
+            cls (type or str): If given, only page through the objects of
+                this class.
+            limit (int): The maximum number of objects of the page.
+            after (str): The cursor returned with the previous page, None
+                for the first page.
+
+        Returns:
+            A (objects, cursor) tuple of the dictionary of the objects of
+            the page by key and the cursor of the next page, None if this
+            is the last one.
+
+        Raises:
+            ValueError: If limit is not positive or after is not a cursor.
+        """
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        with FileStorage.__read_lock:
+            if cls is None:
+                keys = dict.keys(FileStorage.__objects)
+            else:
+                keys = self.__partition(cls).keys()
+            if after is not None:
+                start = _cursor_key(after)
+                keys = (key for key in keys if key > start)
+            keys = heapq.nsmallest(limit + 1, keys)
+            objects = {key: FileStorage.__objects[key]
+                       for key in keys[:limit]}
+        if len(keys) > limit:
+            return objects, _cursor(keys[limit - 1])
+        return objects, None
+
+    def count(self, cls=None, **equals):
+        """Return the number of objects stored, optionally of class cls
+        and with the given attribute values.
+
+        The objects of each class are kept in their own dictionary, so
+        counting a class is O(1), and so is counting the objects with one
+        value of an attribute that has a HashIndex.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            **equals (dict): Attribute names mapped to the value to match.
+        """
+        if cls is None:
+            return len(FileStorage.__objects)
+        if not equals:
+            return len(self.__partition(cls))
+        if len(equals) == 1:
+            [(attr, value)] = equals.items()
+            index = self.__index(cls, attr)
+            if isinstance(index, HashIndex):
+                try:
+                    return len(index.get(value))
+                except TypeError:
+                    pass
+        return len(self.find(cls, **equals))
+
+    def counts(self, cls=None, attr=None):
+        """Return the number of objects stored of each class, or of class
+        cls with each value of its attribute attr.
+
+        Values of an attribute with a HashIndex are counted from the
+        index; other attributes are counted by reading every object of
+        cls. Unhashable values are not counted.
+
+        Args:
+            cls (type or str): The class or the name of the class, None
+                for every class of the model registry.
+            attr (str): The name of the attribute of cls to count values
+                of.
+
+        Returns:
+            A dictionary of class names, or of values, mapped to their
+            number of objects.
+        """
+        if cls is None:
+            partitions = self.__partitions_of_objects()
+            return {name: len(partitions.get(name, ()))
+                    for name in sorted(classes)}
+        index = self.__index(cls, attr)
+        if isinstance(index, HashIndex):
+            return {value: len(bucket)
+                    for value, bucket in index.buckets.items()}
+        odict = FileStorage.__objects
+        result = {}
+        for key in self.__partition(cls):
+            value = getattr(odict[key], attr, None)
+            try:
+                result[value] = result.get(value, 0) + 1
+            except TypeError:
+                pass
+        return result
 
     def new(self, obj):
         """Set in __objects obj with key <obj_class_name>.id"""
         ocname = obj.__class__.__name__
-        FileStorage.__objects["{}.{}".format(ocname, obj.id)] = obj
+        key = "{}.{}".format(ocname, obj.id)
+        with FileStorage.__lock, FileStorage.__read_lock:
+            if (self.__max_objects and not
+                    isinstance(FileStorage.__objects, BoundedLazyDict)):
+                self.__bound()
+            partitions = self.__partitions_of_objects()
+            partitions.setdefault(ocname, {})[key] = obj
+            FileStorage.__objects[key] = obj
+            FileStorage.__changes[key] = obj
+            for index in FileStorage.__indexes.get(ocname, {}).values():
+                index.update(key, obj)
+
+    def touch(self, obj):
+        """Record that obj was modified so the next save persists it.
+
+        BaseModel calls this on every attribute assignment; code that
+        writes to obj.__dict__ directly must call it itself.
+        """
+        ocname = obj.__class__.__name__
+        key = "{}.{}".format(ocname, obj.id)
+        with FileStorage.__lock, FileStorage.__read_lock:
+            if FileStorage.__objects.get(key) is obj:
+                FileStorage.__changes[key] = obj
+                self.__partitions_of_objects()
+                for index in FileStorage.__indexes.get(ocname, {}).values():
+                    index.update(key, obj)
+
+    def delete(self, obj=None, cascade=False):
+        """Delete obj from __objects if it is present.
+
+        Args:
+            obj (BaseModel): The object to delete.
+            cascade (bool): If True, also delete the objects depending on
+                obj, as listed by models.relationship.dependents() through
+                the hash indexes of their id attributes, so the cost is
+                proportional to the number of dependents.
+
+        Returns:
+            The list of the objects deleted.
+        """
+        if obj is None:
+            return []
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        with FileStorage.__lock, FileStorage.__read_lock:
+            if FileStorage.__objects.get(key) is not obj:
+                return []
+            objects = [obj] + (dependents([obj]) if cascade else [])
+            removed = {}
+            for obj in objects:
+                ocname = obj.__class__.__name__
+                key = "{}.{}".format(ocname, obj.id)
+                del self.__partition(ocname)[key]
+                del FileStorage.__objects[key]
+                FileStorage.__changes[key] = None
+                removed.setdefault(ocname, []).append(key)
+            for ocname, keys in removed.items():
+                for index in FileStorage.__indexes.get(ocname, {}).values():
+                    if isinstance(index, RangeIndex):
+                        index.remove_all(keys)
+                        continue
+                    for key in keys:
+                        index.remove(key)
+            return objects
+
+    def find(self, cls, **equals):
+        """Return the objects of class cls with the given attribute values.
+
+        The HashIndex of an attribute listed in the __indexes__ of cls
+        narrows down the objects to compare; without one, every object
+        of cls is compared.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            **equals (dict): Attribute names mapped to the value to match.
+
+        Returns:
+            A dictionary of the matching objects by key.
+        """
+        candidates = self.__partition(cls)
+        for attr, value in equals.items():
+            index = self.__index(cls, attr)
+            if isinstance(index, HashIndex):
+                try:
+                    keys = index.get(value)
+                except TypeError:
+                    continue
+                if len(keys) < len(candidates):
+                    candidates = keys
+        odict = FileStorage.__objects
+        result = {}
+        for key in candidates:
+            obj = odict[key]
+            for attr, value in equals.items():
+                if getattr(obj, attr, None) != value:
+                    break
+            else:
+                result[key] = obj
+        return result
+
+    def get(self, cls, id):
+        """Return the object of class cls with id id, None if there is
+        none.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            id (str): The id of the object.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return FileStorage.__objects.get("{}.{}".format(cls, id))
+
+    def group(self, cls, attr, values):
+        """Return the objects of class cls whose attribute attr is one of
+        values, grouped by value.
+
+        The HashIndex of attr, if it is listed in the __indexes__ of cls,
+        finds the objects of each value in one lookup; otherwise the
+        objects of cls are read in a single pass for all the values.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            attr (str): The name of the attribute.
+            values (iterable): The attribute values to match.
+
+        Returns:
+            A dictionary of each of values mapped to the list of the
+            objects with that value.
+
+        Raises:
+            TypeError: If a value is not hashable.
+        """
+        result = {value: [] for value in values}
+        odict = FileStorage.__objects
+        with FileStorage.__read_lock:
+            index = self.__index(cls, attr)
+            if isinstance(index, HashIndex):
+                for value, objects in result.items():
+                    objects.extend(odict[key] for key in index.get(value))
+                return result
+            for key in list(self.__partition(cls)):
+                obj = odict[key]
+                try:
+                    objects = result.get(getattr(obj, attr, None))
+                except TypeError:
+                    continue
+                if objects is not None:
+                    objects.append(obj)
+        return result
+
+    def between(self, cls, attr, low=None, high=None, include_low=True,
+                include_high=True, reverse=False, limit=None):
+        """Return the objects of class cls whose attribute attr is in a
+        range, in the order of attr.
+
+        The RangeIndex on attr finds the range by bisection, so only the
+        objects returned are read. Objects whose attr is not a number are
+        left out.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            attr (str): The name of an attribute listed in the __ranges__
+                of cls.
+            low (int or float): The lowest value, None for no lower bound.
+            high (int or float): The highest value, None for no upper
+                bound.
+            include_low (bool): If False, leave out the value low.
+            include_high (bool): If False, leave out the value high.
+            reverse (bool): If True, return the highest values first.
+            limit (int): The maximum number of objects, None for all.
+
+        Returns:
+            A list of the objects.
+
+        Raises:
+            ValueError: If attr is not listed in the __ranges__ of cls.
+            TypeError: If low or high is not a number.
+        """
+        if isinstance(cls, str):
+            cls = classes[cls]
+        if attr not in cls.__ranges__:
+            raise ValueError("{} has no range index on {}".format(
+                cls.__name__, attr))
+        odict = FileStorage.__objects
+        with FileStorage.__read_lock:
+            index = self.__index(cls, ("__ranges__", attr))
+            return [odict[key] for key in index.range(
+                low, high, include_low, include_high, reverse, limit)]
+
+    def near(self, cls, latitude, longitude, radius):
+        """Return the objects of class cls within radius km of a point.
+
+        The GridIndex on the __spatial__ attributes of cls limits the
+        distances measured to the objects of the cells the circle
+        overlaps.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            latitude (float): The latitude of the point, in degrees.
+            longitude (float): The longitude of the point, in degrees.
+            radius (float): The search radius in km.
+
+        Returns:
+            A list of (object, distance in km) tuples, nearest first.
+
+        Raises:
+            ValueError: If cls has no __spatial__ attributes or the point
+                is not on the globe.
+        """
+        odict = FileStorage.__objects
+        with FileStorage.__read_lock:
+            return [(odict[key], km) for key, km in self.__index_on(
+                cls, "__spatial__").near(latitude, longitude, radius)]
+
+    def nearest(self, cls, latitude, longitude, count):
+        """Return the count objects of class cls nearest a point.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            latitude (float): The latitude of the point, in degrees.
+            longitude (float): The longitude of the point, in degrees.
+            count (int): The number of objects to return.
+
+        Returns:
+            A list of (object, distance in km) tuples, nearest first.
+
+        Raises:
+            ValueError: If cls has no __spatial__ attributes or the point
+                is not on the globe.
+        """
+        odict = FileStorage.__objects
+        with FileStorage.__read_lock:
+            return [(odict[key], km) for key, km in self.__index_on(
+                cls, "__spatial__").nearest(latitude, longitude, count)]
+
+    def search(self, cls, text, limit=None):
+        """Return the objects of class cls matching a full-text query.
+
+        The TextIndex on the __text__ attributes of cls finds the objects
+        containing any word of text, and every phrase of text quoted with
+        double quotes, and ranks them with BM25.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            text (str): The words and quoted phrases to search for.
+            limit (int): The maximum number of results, None for all.
+
+        Returns:
+            A list of (object, score) tuples, best first.
+
+        Raises:
+            ValueError: If cls has no __text__ attributes.
+        """
+        odict = FileStorage.__objects
+        with FileStorage.__read_lock:
+            return [(odict[key], score) for key, score in self.__index_on(
+                cls, "__text__").search(text, limit)]
+
+    def query(self, cls):
+        """Return a Query on the objects of class cls.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+        """
+        return Query(self, cls)
+
+    def restore(self, cls_name, attrs):
+        """Add a stored object of class cls_name with attributes attrs.
+
+        The attributes are set as is, without calling __init__, and the
+        object is not marked as changed, since it is already stored.
+
+        Args:
+            cls_name (str): The name of the class of the object.
+            attrs (dict): The attributes of the object, with datetime
+                values for the timestamps.
+
+        Returns:
+            The object.
+        """
+        cls = classes[cls_name]
+        obj = cls.__new__(cls)
+        obj.__dict__.update(attrs)
+        with FileStorage.__lock:
+            self.new(obj)
+            del FileStorage.__changes["{}.{}".format(cls_name, obj.id)]
+        return obj
+
+    def cache_stats(self):
+        """Return the counters of the objects kept in memory.
+
+        Returns:
+            A dictionary of the number of hits, misses and evictions of
+            reads of __objects and of the objects instantiated, all zero
+            unless max_objects is set.
+        """
+        odict = FileStorage.__objects
+        if not isinstance(odict, BoundedLazyDict):
+            return {"hits": 0, "misses": 0, "evictions": 0, "resident": 0}
+        return {"hits": odict.hits, "misses": odict.misses,
+                "evictions": odict.evictions, "resident": len(odict.recent)}
+
+    def pop_changes(self):
+        """Return the keys changed since the last save and forget them.
+
+        Returns:
+            A dictionary of keys mapped to the object to persist, or to
+            None if the object was deleted. Objects that are no longer
+            stored under their key are left out.
+        """
+        odict = FileStorage.__objects
+        with FileStorage.__lock:
+            changes = {key: obj for key, obj in FileStorage.__changes.items()
+                       if obj is None or odict.get(key) is obj}
+            for key in FileStorage.__changes:
+                FileStorage.__origins.pop(key, None)
+            FileStorage.__changes.clear()
+        return changes
+
+    def restore_changes(self, changes):
+        """Mark changes returned by pop_changes() as unsaved again, after
+        they failed to be written. Keys changed since are left as they are.
+
+        Args:
+            changes (dict): Keys mapped to the object to persist, or to
+                None if the object was deleted.
+        """
+        with FileStorage.__lock:
+            for key, obj in changes.items():
+                FileStorage.__changes.setdefault(key, obj)
+
+    def __partitions_of_objects(self):
+        """Return __partitions, rebuilding it if __objects was replaced."""
+        if FileStorage.__partitioned is not FileStorage.__objects:
+            partitions = {}
+            for key, obj in dict.items(FileStorage.__objects):
+                ocname = key.partition(".")[0]
+                partitions.setdefault(ocname, {})[key] = obj
+            FileStorage.__partitions = partitions
+            FileStorage.__partitioned = FileStorage.__objects
+            FileStorage.__indexes = {}
+        return FileStorage.__partitions
+
+    def __partition(self, cls):
+        """Return the dictionary of the objects of class cls.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return self.__partitions_of_objects().get(cls, {})
+
+    def __index(self, cls, name):
+        """Return the index of class cls named name, building it from the
+        objects of cls the first time it is used.
+
+        The HashIndex of an attribute listed in the __indexes__ of cls is
+        named after the attribute, the RangeIndex of one listed in its
+        __ranges__ is named ("__ranges__", attribute), and its GridIndex
+        and TextIndex are named by its __spatial__ and __text__
+        attributes. Each is built on its own, so a search only
+        builds the index it reads. Indexes are built under __read_lock.
+
+        The TextIndex is read from the file it was last saved to, if any,
+        and only the objects whose text changed since are indexed again.
+
+        Args:
+            cls (type or str): The class or the name of the class.
+            name (str or tuple): The name of the index.
+
+        Returns:
+            The index, None if cls has no index of that name.
+        """
+        if isinstance(cls, str):
+            cls = classes[cls]
+        with FileStorage.__read_lock:
+            ocname = cls.__name__
+            partition = self.__partition(ocname)
+            indexes = FileStorage.__indexes.setdefault(ocname, {})
+            if name in indexes:
+                return indexes[name]
+            if type(name) is str and name in cls.__indexes__:
+                index = HashIndex(name)
+            elif (type(name) is tuple and len(name) == 2 and
+                    name[0] == "__ranges__" and name[1] in cls.__ranges__):
+                index = RangeIndex(name[1])
+            elif cls.__spatial__ and name == cls.__spatial__:
+                index = GridIndex(*name)
+            elif cls.__text__ and name == cls.__text__:
+                index = self.__read_text_index(cls)
+                for key in [key for key in index.values
+                            if key not in partition]:
+                    index.remove(key)
+            else:
+                return None
+            odict = FileStorage.__objects
+            if isinstance(index, RangeIndex):
+                index.add_all((key, odict[key]) for key in partition)
+            else:
+                for key in partition:
+                    index.update(key, odict[key])
+            indexes[name] = index
+            return index
+
+    def __index_on(self, cls, attrs):
+        """Return the index of class cls on the attributes named by its
+        class attribute attrs, __spatial__ or __text__.
+
+        Raises:
+            ValueError: If cls has no such attributes.
+        """
+        if isinstance(cls, str):
+            cls = classes[cls]
+        if not getattr(cls, attrs):
+            raise ValueError("{} has no {} attributes".format(
+                cls.__name__, attrs))
+        return self.__index(cls, getattr(cls, attrs))
+
+    def __read_text_index(self, cls):
+        """Return the TextIndex of class cls saved in its file, or a new
+        one if there is none, and have the text indexes saved at exit."""
+        if not FileStorage.__text_at_exit:
+            FileStorage.__text_at_exit = True
+            atexit.register(self.__save_text_indexes)
+        try:
+            with open(FileStorage.__text_path.format(cls.__name__)) as f:
+                index = TextIndex.from_dict(json.load(f))
+            if index.attrs == cls.__text__:
+                return index
+        except (OSError, ValueError):
+            pass
+        return TextIndex(cls.__text__)
+
+    def __save_text_indexes(self):
+        """Write each TextIndex changed since it was last saved to its
+        file. Indexes of objects replaced since are dropped, not saved.
+
+        The indexes are listed from copies, since a read may build a new
+        index meanwhile without holding __lock.
+        """
+        self.__partitions_of_objects()
+        for ocname, indexes in list(FileStorage.__indexes.items()):
+            for index in list(indexes.values()):
+                if isinstance(index, TextIndex) and index.changed:
+                    path = FileStorage.__text_path.format(ocname)
+                    with open(path + ".tmp", "w") as f:
+                        json.dump(index.to_dict(), f)
+                        self.__sync(f)
+                    self.__replace(path + ".tmp", path)
 
     def save(self):
-        """Serialize __objects to the JSON file __file_path."""
+        """Serialize __objects to the JSON file __file_path.
+
+        In journal mode only the objects changed since the last save are
+        appended to __journal_path. Otherwise the whole JSON file is
+        rewritten and the journal it now supersedes is removed; only the
+        objects changed since the last save are encoded again, the others
+        are written from __encoded.
+
+        Each object is written to the file as soon as it is encoded,
+        through a write buffer of __buffer_size bytes, so saving needs no
+        memory beyond that buffer and the encoded object. The output is
+        the same as json.dump() of the to_dict() of every object.
+
+        Files are written under a temporary name and then renamed over
+        the old ones, so a crash mid-save leaves the last saved version
+        intact. Objects that were never instantiated since a lazy reload
+        are copied as is from the old file.
+
+        In sharded mode only the files of the classes changed since the
+        last save are rewritten, see __save_shards().
+
+        With a group commit window, a save() issued less than that many
+        milliseconds after the last write finished is delayed until the
+        window ends, and then written on a timer thread along with every
+        save() issued meanwhile. The interpreter waits for that thread to
+        finish before exiting.
+
+        In write-behind mode save() only records that a write is pending
+        and returns; a background thread writes at the configured
+        interval, or sooner once flush_threshold objects changed, and
+        flush() is called at interpreter exit.
+        """
+        if self.__write_behind:
+            with FileStorage.__lock:
+                self.__pending = True
+                if self.__flusher is None:
+                    self.__flusher = threading.Thread(
+                        target=self.__flush_behind, daemon=True)
+                    self.__flusher.start()
+                    atexit.register(self.flush)
+                if len(FileStorage.__changes) >= self.__flush_threshold:
+                    self.__wake.set()
+            return
+        with FileStorage.__write_lock, FileStorage.__lock:
+            if self.__timer is not None:
+                return
+            wait = self.__last_write + self.__group_commit - time.monotonic()
+            if wait > 0:
+                self.__timer = threading.Timer(wait, self.flush)
+                self.__timer.start()
+                return
+            self.__write()
+
+    def flush(self):
+        """Write the save() delayed by group commit or write-behind, if any.
+
+        In the default JSON mode only the changed objects are encoded
+        under __lock, and the file is written after releasing it, so
+        changing objects never waits for the whole file to be written.
+        """
+        with FileStorage.__write_lock:
+            with FileStorage.__lock:
+                if self.__timer is not None:
+                    self.__timer.cancel()
+                    self.__timer = None
+                elif self.__pending:
+                    self.__pending = False
+                else:
+                    return
+                if (self.__journal or self.__binary or self.__sharded or
+                        self.__shared or
+                        isinstance(FileStorage.__objects, LazyDict)):
+                    self.__write()
+                    return
+                items = list(dict.items(FileStorage.__objects))
+                changes = self.pop_changes()
+                texts = {key: json.dumps(obj.to_dict()).encode()
+                         for key, obj in changes.items() if obj is not None}
+            try:
+                self.__write_json(FileStorage.__file_path, items, texts)
+            except BaseException:
+                self.restore_changes(changes)
+                raise
+            finally:
+                self.__last_write = time.monotonic()
+            with FileStorage.__lock:
+                self.__forget(changes)
+
+    def __forget(self, changes):
+        """Drop the cached text of the keys deleted in changes, and remove
+        the journal a full write of the objects superseded."""
+        cache = FileStorage.__encoded
+        for key, obj in changes.items():
+            if obj is None:
+                cache.pop(key, None)
+        if len(cache) > len(FileStorage.__objects):
+            FileStorage.__encoded = {key: cache[key]
+                                     for key in FileStorage.__objects
+                                     if key in cache}
+        try:
+            os.remove(FileStorage.__journal_path)
+        except FileNotFoundError:
+            pass
+
+    def __flush_behind(self):
+        """Run the write-behind thread, flushing storage periodically."""
+        while True:
+            self.__wake.wait(self.__write_behind)
+            self.__wake.clear()
+            self.flush()
+
+    def __write(self):
+        """Write the objects to disk in the format of the storage mode."""
+        try:
+            self.__write_mode()
+        finally:
+            self.__last_write = time.monotonic()
+
+    def __write_mode(self, snapshot=False):
+        """Write the objects with the writer of the storage mode.
+
+        Args:
+            snapshot (bool): If True, write every object even in journal
+                or sharded mode.
+        """
+        if self.__journal and not snapshot:
+            self.__append_journal()
+            return
+        if self.__binary:
+            self.__save_binary()
+            return
+        odict = FileStorage.__objects
+        changes = FileStorage.__changes
+        if self.__sharded:
+            self.__save_shards(snapshot)
+        elif isinstance(odict, LazyDict):
+            unloaded = self.__write_json(FileStorage.__file_path,
+                                         dict.items(odict))
+            source = open(FileStorage.__file_path, "rb")
+            origins = {}
+            for key, placeholder, start, size in unloaded:
+                placeholder.location = (source, start, start + size)
+                if dict.get(odict, key) is not placeholder:
+                    origins[key] = placeholder
+            FileStorage.__origins = origins
+        elif self.__shared:
+            with self.__file_lock(fcntl.LOCK_EX):
+                self.__merge()
+                self.__write_json(FileStorage.__file_path, dict.items(odict))
+                self.__seen = self.__stat()
+        else:
+            self.__write_json(FileStorage.__file_path, dict.items(odict))
+        self.__forget(changes)
+        changes.clear()
+
+    @contextmanager
+    def __file_lock(self, operation):
+        """Hold the fcntl lock of __lock_path for the processes sharing it.
+
+        Args:
+            operation (int): fcntl.LOCK_SH or fcntl.LOCK_EX.
+        """
+        fd = os.open(FileStorage.__lock_path, os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, operation)
+            yield
+        finally:
+            os.close(fd)
+
+    def __stat(self):
+        """Return what identifies the current version of __file_path.
+
+        Returns:
+            A (inode, modification time, size) tuple, which changes every
+            time the file is replaced, or None if it does not exist.
+        """
+        try:
+            st = os.stat(FileStorage.__file_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __merge(self):
+        """Apply what other processes saved since this one last synced.
+
+        Objects changed or deleted here since the last save are kept as
+        they are here. Other objects are replaced by their saved version
+        if it differs, objects saved by other processes are added, and
+        objects missing from the file are deleted, since another process
+        deleted them.
+        """
+        if self.__stat() in (None, self.__seen):
+            return
         odict = FileStorage.__objects
-        objdict = {obj: odict[obj].to_dict() for obj in odict.keys()}
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objdict, f)
+        changes = FileStorage.__changes
+        saved = set()
+        with open(FileStorage.__file_path, "rb") as f:
+            for key, o in iter_values(f):
+                saved.add(key)
+                if key in changes:
+                    continue
+                obj = odict.get(key)
+                if obj is None or obj.to_dict() != o:
+                    self.restore(*_attributes(o))
+        for key in [key for key in odict
+                    if key not in saved and key not in changes]:
+            self.delete(odict[key])
+
+    def __write_json(self, path, items, texts=None):
+        """Replace the file path with a JSON object of encoded objects.
+
+        Each object is written as soon as it is encoded, reusing its JSON
+        text from __encoded if it did not change since the last save.
+        The file is written under a temporary name and renamed to path.
+
+        Args:
+            path (str): The path of the file to write.
+            items (iterable): The (key, object) pairs to write, where the
+                object may be an Unloaded placeholder.
+            texts (dict): Keys mapped to their JSON text encoded
+                beforehand, for a write outside __lock. The text of the
+                other objects is then taken from __encoded even if they
+                changed since, as they are still marked as changed.
+
+        Returns:
+            A list of (key, placeholder, offset, size) tuples giving where
+            in the new file the raw text of each Unloaded placeholder was
+            copied. In bounded mode the list also has a new placeholder
+            for each instantiated object.
+        """
+        changes = FileStorage.__changes
+        cache = FileStorage.__encoded
+        unloaded = []
+        keys = []
+        offsets = []
+        tmp = path + ".tmp"
+        with open(tmp, "wb", buffering=FileStorage.__buffer_size) as f:
+            f.write(b"{")
+            pos = 1
+            for key, obj in items:
+                head = json.dumps(key).encode() + b": "
+                if pos > 1:
+                    head = b", " + head
+                if isinstance(obj, Unloaded):
+                    text = self.__read(obj.location)
+                    unloaded.append((key, obj, pos + len(head), len(text)))
+                else:
+                    cached = cache.get(key)
+                    if texts is not None and key in texts:
+                        cached = (obj, texts[key])
+                        if self.__cache:
+                            cache[key] = cached
+                    elif (cached is None or cached[0] is not obj or
+                            texts is None and key in changes):
+                        cached = (obj, json.dumps(obj.to_dict()).encode())
+                        if self.__cache:
+                            cache[key] = cached
+                    text = cached[1]
+                    if self.__max_objects:
+                        unloaded.append((key, Unloaded(None),
+                                         pos + len(head), len(text)))
+                f.write(head)
+                f.write(text)
+                pos += len(head)
+                keys.append(key)
+                offsets.append(pos)
+                pos += len(text)
+                offsets.append(pos)
+            f.write(b"}")
+            self.__sync(f)
+        self.__replace(tmp, path)
+        if self.__lazy and path == FileStorage.__file_path:
+            self.__save_offsets(keys, offsets)
+        return unloaded
+
+    def __save_offsets(self, keys, offsets):
+        """Write to __offsets_path the keys of __file_path and the start
+        and end offsets of each of their objects, along with the size,
+        modification time and inode of __file_path they are valid for.
+
+        The file is not synced to disk, since a reload walks __file_path
+        instead of reading offsets written for another version of it.
+        """
+        stat = os.stat(FileStorage.__file_path)
+        tmp = FileStorage.__offsets_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"file": [stat.st_size, stat.st_mtime_ns,
+                                stat.st_ino],
+                       "keys": keys, "offsets": offsets}, f)
+        os.replace(tmp, FileStorage.__offsets_path)
+
+    def __read_offsets(self, source):
+        """Return the (key, start, end) tuples __offsets_path lists for
+        the open file source, None if it is missing or was written for
+        another version of the file."""
+        stat = os.fstat(source.fileno())
+        try:
+            with open(FileStorage.__offsets_path) as f:
+                table = json.load(f)
+            if table["file"] != [stat.st_size, stat.st_mtime_ns,
+                                 stat.st_ino]:
+                return None
+            offsets = table["offsets"]
+            return zip(table["keys"], offsets[::2], offsets[1::2])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def __sync(self, f):
+        """Flush the file f to the disk if fsync is enabled."""
+        if self.__fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __replace(self, tmp, path):
+        """Rename tmp to path, waiting for the disk if fsync is enabled."""
+        os.replace(tmp, path)
+        if self.__fsync:
+            fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def __save_shards(self, everything=False):
+        """Rewrite the shard file of each class changed since the last save.
+
+        The shard file of a class is also written if it is missing, and
+        removed once the class has no objects left. A __file_path left
+        from before sharded mode is removed once the shards hold its
+        objects, so it is neither counted as in use nor reloaded later.
+
+        Args:
+            everything (bool): If True, rewrite the files of all classes.
+        """
+        os.makedirs(FileStorage.__shard_dir, exist_ok=True)
+        partitions = self.__partitions_of_objects()
+        changed = {key.partition(".")[0] for key in FileStorage.__changes}
+        for ocname in changed | partitions.keys():
+            path = os.path.join(FileStorage.__shard_dir, ocname + ".json")
+            partition = partitions.get(ocname)
+            if not partition:
+                if ocname in changed and os.path.exists(path):
+                    os.remove(path)
+            elif (everything or ocname in changed or
+                  not os.path.exists(path)):
+                self.__write_json(path, partition.items())
+        try:
+            os.remove(FileStorage.__file_path)
+        except FileNotFoundError:
+            pass
+
+    def compact(self):
+        """Write a snapshot of every object and remove the journal, then
+        the text indexes that changed.
+
+        Once compacted, reload() reads the live objects only instead of
+        replaying their history, and the records of deleted objects are
+        gone. Changes to objects wait for the snapshot to be written, but
+        reading them does not.
+
+        Returns:
+            A (seconds, bytes) tuple of the time compaction took and the
+            number of bytes it freed on disk.
+        """
+        with FileStorage.__write_lock, FileStorage.__lock:
+            start = time.perf_counter()
+            before = self.__disk_usage()
+            self.__write_mode(snapshot=True)
+            self.__save_text_indexes()
+            self.__last_write = time.monotonic()
+            return time.perf_counter() - start, before - self.__disk_usage()
+
+    def __disk_usage(self):
+        """Return the number of bytes of the files of the storage."""
+        paths = [FileStorage.__file_path, FileStorage.__binary_path,
+                 FileStorage.__journal_path]
+        if os.path.isdir(FileStorage.__shard_dir):
+            paths += [os.path.join(FileStorage.__shard_dir, name)
+                      for name in os.listdir(FileStorage.__shard_dir)]
+        size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        return size
 
     def reload(self):
-        """Deserialize the JSON file __file_path to __objects, if it exists."""
-        try:
-            with open(FileStorage.__file_path) as f:
-                objdict = json.load(f)
-                for o in objdict.values():
-                    cls_name = o["__class__"]
-                    del o["__class__"]
-                    self.new(eval(cls_name)(**o))
+        """Deserialize the JSON file __file_path to __objects, if it exists.
+
+        The file is decoded one object at a time and each object is added
+        to __objects before the next one is read, so the whole JSON text
+        and its decoded form are never held in memory at once. Records
+        appended to the journal since the file was written are replayed
+        on top of it.
+
+        In lazy mode __objects becomes a LazyDict holding an Unloaded
+        placeholder with the file offsets of each object in the file.
+        In binary mode the objects are read from __binary_path instead.
+        In sharded mode they are read from the files of __shard_dir, or
+        from __file_path if that directory does not exist yet. In shared
+        mode the file is read under a shared lock of __lock_path.
+
+        If __objects is empty, the dbm database objects were evicted to is
+        no longer needed and is removed.
+        """
+        if not FileStorage.__objects:
+            self.__close_spill()
+        try:
+            if self.__sharded and os.path.isdir(FileStorage.__shard_dir):
+                self.__reload_shards()
+            elif self.__lazy:
+                self.__reload_lazy()
+            elif self.__binary:
+                with open(FileStorage.__binary_path, "rb") as f:
+                    for cls_name, attrs in iter_records(f):
+                        self.restore(cls_name, attrs)
+            elif self.__shared:
+                with self.__file_lock(fcntl.LOCK_SH):
+                    self.__seen = self.__stat()
+                    with open(FileStorage.__file_path, "rb") as f:
+                        for key, o in iter_values(f):
+                            self.restore(*_attributes(o))
+            else:
+                with open(FileStorage.__file_path, "rb") as f:
+                    for key, o in iter_values(f):
+                        self.restore(*_attributes(o))
+        except FileNotFoundError:
+            pass
+        self.__replay_journal()
+
+    def __save_binary(self):
+        """Replace __binary_path with every object in the binary format."""
+        tmp = FileStorage.__binary_path + ".tmp"
+        with open(tmp, "wb", buffering=FileStorage.__buffer_size) as f:
+            writer = BinaryWriter(f)
+            for obj in FileStorage.__objects.values():
+                writer.write(obj.__class__.__name__, obj.__dict__)
+            self.__sync(f)
+        self.__replace(tmp, FileStorage.__binary_path)
+        FileStorage.__changes.clear()
+        try:
+            os.remove(FileStorage.__journal_path)
+        except FileNotFoundError:
+            pass
+
+    def __reload_shards(self):
+        """Add the objects of every shard file to __objects.
+
+        The shard files are decoded in parallel by a pool of worker
+        processes, and their objects added to __objects as each file is
+        done.
+        """
+        paths = [os.path.join(FileStorage.__shard_dir, name)
+                 for name in sorted(os.listdir(FileStorage.__shard_dir))
+                 if name.endswith(".json")]
+        pool = None
+        shards = map(_read_shard, paths)
+        if len(paths) > 1 and (os.cpu_count() or 1) > 1:
+            pool = ProcessPoolExecutor(min(len(paths), os.cpu_count()))
+            shards = pool.map(_read_shard, paths)
+        try:
+            for objects in shards:
+                for cls_name, attrs in objects:
+                    self.restore(cls_name, attrs)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def __reload_lazy(self):
+        """Add an Unloaded placeholder to __objects for each stored object.
+
+        Where the objects are is read from __offsets_path if it was
+        written along with __file_path, and found by walking __file_path
+        otherwise. The garbage collector is paused meanwhile, since none
+        of the placeholders can be garbage.
+
+        Raises:
+            FileNotFoundError: If the JSON file does not exist.
+        """
+        source = open(FileStorage.__file_path, "rb")
+        if self.__max_objects:
+            self.__bound()
+        odict = FileStorage.__objects
+        if not isinstance(odict, LazyDict):
+            odict = LazyDict(self.__hydrate, odict)
+        changes = FileStorage.__changes
+        members = self.__read_offsets(source) or iter_members(source)
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for key, start, end in members:
+                odict[key] = Unloaded((source, start, end))
+                if changes:
+                    changes.pop(key, None)
+        finally:
+            if collecting:
+                gc.enable()
+        FileStorage.__objects = odict
+
+    def __bound(self):
+        """Replace __objects by a BoundedLazyDict of max_objects objects."""
+        FileStorage.__objects = BoundedLazyDict(
+            self.__hydrate, self.__evict, self.__max_objects,
+            dict.items(FileStorage.__objects))
+
+    def __evict(self, key, obj):
+        """Return the placeholder to evict obj to.
+
+        The placeholder obj was loaded from or last saved to is reused if
+        obj did not change since; otherwise obj is encoded to the dbm
+        database __spill_path.
+
+        Args:
+            key (str): The key of the object in __objects.
+            obj (BaseModel): The object to evict from memory.
+
+        Returns:
+            An Unloaded placeholder to store in place of obj.
+        """
+        cached = FileStorage.__encoded.pop(key, None)
+        unloaded = FileStorage.__origins.pop(key, None)
+        if unloaded is None or key in FileStorage.__changes:
+            if (cached is None or cached[0] is not obj or
+                    key in FileStorage.__changes):
+                cached = (obj, json.dumps(obj.to_dict()).encode())
+            if self.__spill is None:
+                self.__spill = dbm.open(FileStorage.__spill_path, "n")
+                atexit.register(self.__close_spill)
+            self.__spill[key] = cached[1]
+            unloaded = Unloaded((self.__spill, key))
+        partition = self.__partition(obj.__class__)
+        if partition.get(key) is obj:
+            partition[key] = unloaded
+        FileStorage.__evicted[key] = obj
+        return unloaded
+
+    def __close_spill(self):
+        """Close the dbm database __spill_path, if open, and remove its
+        files."""
+        if self.__spill is None:
+            return
+        atexit.unregister(self.__close_spill)
+        self.__spill.close()
+        self.__spill = None
+        for path in glob.glob(glob.escape(FileStorage.__spill_path) + "*"):
+            os.remove(path)
+
+    def __read(self, location):
+        """Return the JSON text of an object from where it is stored.
+
+        Args:
+            location (tuple): The location of an Unloaded placeholder,
+                a (file, start, end) tuple of file offsets or a
+                (database, key) pair.
+        """
+        if len(location) == 2:
+            spill, key = location
+            return spill[key]
+        source, start, end = location
+        source.seek(start)
+        return source.read(end - start)
+
+    def __load_key(self, key, unloaded):
+        """Return the object stored under key, instantiating it if needed.
+
+        Loads through __objects, so that a bounded __objects counts the
+        access, or instantiates the placeholder if key was deleted.
+        """
+        try:
+            return FileStorage.__objects[key]
+        except KeyError:
+            return self.__hydrate(key, unloaded)
+
+    def __hydrate(self, key, unloaded):
+        """Instantiate the object an Unloaded placeholder stands for.
+
+        Args:
+            key (str): The key of the object in __objects.
+            unloaded (Unloaded): The placeholder of the object.
+
+        Returns:
+            The object, also stored in place of the placeholder.
+        """
+        current = dict.get(FileStorage.__objects, key)
+        if current is not None and not isinstance(current, Unloaded):
+            return current
+        obj = FileStorage.__evicted.pop(key, None)
+        text = None
+        if obj is None:
+            text = self.__read(unloaded.location)
+            cls_name, attrs = _attributes(json.loads(text))
+            cls = classes[cls_name]
+            obj = cls.__new__(cls)
+            obj.__dict__.update(attrs)
+        if current is unloaded:
+            FileStorage.__objects[key] = obj
+            self.__partition(obj.__class__)[key] = obj
+            if self.__max_objects:
+                FileStorage.__origins[key] = unloaded
+            if self.__cache and text is not None:
+                FileStorage.__encoded[key] = (obj, text)
+        return obj
+
+    def __append_journal(self):
+        """Append a record for every key changed since the last save.
+
+        The changes are kept for the next save if they cannot be written.
+        """
+        changes = self.pop_changes()
+        if not changes:
+            return
+        try:
+            lines = []
+            for key, obj in changes.items():
+                FileStorage.__encoded.pop(key, None)
+                value = None if obj is None else obj.to_dict()
+                lines.append(json.dumps({"key": key, "value": value}))
+            with open(FileStorage.__journal_path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+                self.__sync(f)
+                journal = f.tell()
+        except BaseException:
+            self.restore_changes(changes)
+            raise
+        if (self.__compact_ratio and
+                journal >= FileStorage.__compact_min_size and
+                (self.__compactor is None or
+                 not self.__compactor.is_alive()) and
+                journal > self.__compact_ratio *
+                (self.__disk_usage() - journal)):
+            self.__compactor = threading.Thread(target=self.compact)
+            self.__compactor.start()
+
+    def __replay_journal(self):
+        """Apply the records of the journal file to __objects, in order.
+
+        A trailing record cut short by a crash mid-append is ignored, and
+        cut from the journal so the records appended next are read back.
+        """
+        try:
+            with open(FileStorage.__journal_path, "rb") as f:
+                end = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    end += len(line)
+                    if record["value"] is not None:
+                        self.restore(*_attributes(record["value"]))
+                    elif record["key"] in FileStorage.__objects:
+                        self.delete(FileStorage.__objects[record["key"]])
+                        del FileStorage.__changes[record["key"]]
+                size = f.seek(0, os.SEEK_END)
         except FileNotFoundError:
             return
+        if end < size:
+            os.truncate(FileStorage.__journal_path, end)
@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+"""Defines the TextIndex class, a full-text index of stored objects."""
+import json
+import math
+import re
+
+_WORD = re.compile(r"\w+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def tokenize(text):
+    """Return the lowercase words of text, in order."""
+    return _WORD.findall(text.lower())
+
+
+class TextIndex:
+    """Represent an inverted index of stored objects on text attributes.
+
+    The words of the attributes of an object are numbered in order, one
+    attribute after the other with a gap between them, and each word maps
+    to the positions it has in each object. search() ranks objects with
+    BM25 and uses the positions to match quoted phrases.
+
+    Attributes that are not strings are not indexed.
+
+    to_dict() encodes the postings of each word as JSON text, and an
+    index made by from_dict() only decodes the postings of a word when it
+    is first used, so reading a saved index costs little more than
+    reading the file.
+
+    Attributes:
+        attrs (tuple): The names of the indexed attributes.
+        postings (dict): Words mapped to a dictionary of the storage keys
+            of the objects containing them, mapped to the list of their
+            positions in the object, or to the JSON text of it.
+        lengths (dict): Storage keys mapped to their number of words.
+        values (dict): Storage keys mapped to the list of their indexed
+            attribute values.
+        total (int): The number of words of all indexed objects.
+        changed (bool): True if the index changed since it was last
+            converted with to_dict().
+        k1 (float): The BM25 term frequency saturation.
+        b (float): The BM25 document length normalization.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, attrs):
+        """Initialize a new TextIndex.
+
+        Args:
+            attrs (tuple): The names of the attributes to index.
+        """
+        self.attrs = tuple(attrs)
+        self.postings = {}
+        self.lengths = {}
+        self.values = {}
+        self.total = 0
+        self.changed = False
+
+    def __texts(self, obj):
+        """Return the list of the indexed attribute values of obj."""
+        texts = []
+        for attr in self.attrs:
+            value = getattr(obj, attr, None)
+            texts.append(value if type(value) is str else "")
+        return texts
+
+    def __docs(self, word):
+        """Return the postings of word, None if no object contains it."""
+        docs = self.postings.get(word)
+        if type(docs) is str:
+            docs = self.postings[word] = json.loads(docs)
+        return docs
+
+    def add(self, key, obj):
+        """Index obj under the storage key key."""
+        self.__add(key, self.__texts(obj))
+
+    def __add(self, key, texts):
+        """Index the texts of the storage key key."""
+        positions = {}
+        position = 0
+        for text in texts:
+            for word in tokenize(text):
+                if word in positions:
+                    positions[word].append(position)
+                else:
+                    positions[word] = [position]
+                position += 1
+            position += 1
+        for word, where in positions.items():
+            docs = self.__docs(word)
+            if docs is not None:
+                docs[key] = where
+            else:
+                self.postings[word] = {key: where}
+        self.lengths[key] = position - len(texts)
+        self.values[key] = texts
+        self.total += self.lengths[key]
+        self.changed = True
+
+    def remove(self, key):
+        """Remove the storage key key from the index, if it is indexed."""
+        if key not in self.values:
+            return
+        for text in self.values.pop(key):
+            for word in tokenize(text):
+                docs = self.__docs(word)
+                if docs is not None and docs.pop(key, None) is not None:
+                    if len(docs) == 0:
+                        del self.postings[word]
+        self.total -= self.lengths.pop(key)
+        self.changed = True
+
+    def update(self, key, obj):
+        """Reindex obj if its indexed attributes changed."""
+        texts = self.__texts(obj)
+        if self.values.get(key) == texts:
+            return
+        self.remove(key)
+        self.__add(key, texts)
+
+    def search(self, query, limit=None):
+        """Return the storage keys of the objects matching a query, best
+        first.
+
+        An object matches if it contains any word of the query and every
+        phrase of the query quoted with double quotes.
+
+        Args:
+            query (str): The words and quoted phrases to search for.
+            limit (int): The maximum number of results, None for all.
+
+        Returns:
+            A list of (key, BM25 score) tuples.
+        """
+        phrases = [tokenize(phrase) for phrase in _PHRASE.findall(query)]
+        phrases = [phrase for phrase in phrases if phrase]
+        words = list(dict.fromkeys(tokenize(query)))
+        if phrases:
+            candidates = None
+            for phrase in phrases:
+                keys = {key for key in self.__docs(phrase[0]) or ()
+                        if self.__contains(key, phrase)}
+                candidates = keys if candidates is None else \
+                    candidates & keys
+        else:
+            candidates = set()
+            for word in words:
+                candidates.update(self.__docs(word) or ())
+        if not candidates:
+            return []
+        count = len(self.lengths)
+        average = self.total / count or 1
+        scores = dict.fromkeys(candidates, 0.0)
+        for word in words:
+            docs = self.__docs(word) or {}
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for key in candidates.intersection(docs):
+                tf = len(docs[key])
+                norm = 1 - self.b + self.b * self.lengths[key] / average
+                scores[key] += idf * tf * (self.k1 + 1) / (
+                    tf + self.k1 * norm)
+        found = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return found if limit is None else found[:limit]
+
+    def __contains(self, key, phrase):
+        """Return True if the object of key key contains the words of
+        phrase in a row."""
+        positions = []
+        for word in phrase:
+            docs = self.__docs(word)
+            if docs is None or key not in docs:
+                return False
+            positions.append(docs[key])
+        following = [set(p) for p in positions[1:]]
+        for start in positions[0]:
+            if all(start + i + 1 in p for i, p in enumerate(following)):
+                return True
+        return False
+
+    def to_dict(self):
+        """Return the index as a dictionary of JSON types, and mark it as
+        unchanged."""
+        self.changed = False
+        postings = {word: docs if type(docs) is str else json.dumps(docs)
+                    for word, docs in self.postings.items()}
+        return {"attrs": list(self.attrs), "postings": postings,
+                "lengths": self.lengths, "values": self.values}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Return the TextIndex a dictionary made by to_dict() describes.
+
+        Raises:
+            ValueError: If state does not describe a TextIndex.
+        """
+        try:
+            index = cls(state["attrs"])
+            index.postings = state["postings"]
+            index.lengths = state["lengths"]
+            index.values = state["values"]
+        except (KeyError, TypeError):
+            raise ValueError("Not a text index")
+        index.total = sum(index.lengths.values())
+        return index
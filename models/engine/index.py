@@ -0,0 +1,385 @@
+#!/usr/bin/python3
+"""Defines the HashIndex, RangeIndex and GridIndex classes."""
+import math
+from bisect import bisect_left, bisect_right
+
+EARTH_RADIUS = 6371.0088
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """Return the great-circle distance in km between two points.
+
+    Args:
+        lat1, lon1 (float): The latitude and longitude of the first point,
+            in degrees.
+        lat2, lon2 (float): The latitude and longitude of the second
+            point, in degrees.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) *
+         math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def is_number(value):
+    """Return True if value is an int or a float other than NaN."""
+    return type(value) in (int, float) and value == value
+
+
+class HashIndex:
+    """Represent a hash index of stored objects on one attribute.
+
+    Objects whose attribute value is not hashable are not indexed.
+
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        buckets (dict): Attribute values mapped to a dictionary whose keys
+            are the storage keys of the objects with that value.
+        values (dict): Storage keys mapped to their indexed value.
+    """
+
+    def __init__(self, attr):
+        """Initialize a new HashIndex.
+
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.buckets = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """Index obj under the storage key key."""
+        value = getattr(obj, self.attr, None)
+        try:
+            self.buckets.setdefault(value, {})[key] = None
+        except TypeError:
+            return
+        self.values[key] = value
+
+    def remove(self, key):
+        """Remove the storage key key from the index, if it is indexed."""
+        if key not in self.values:
+            return
+        value = self.values.pop(key)
+        bucket = self.buckets[value]
+        del bucket[key]
+        if len(bucket) == 0:
+            del self.buckets[value]
+
+    def update(self, key, obj):
+        """Move key to the bucket of the current attribute value of obj."""
+        value = getattr(obj, self.attr, None)
+        if key in self.values and self.values[key] == value:
+            return
+        self.remove(key)
+        self.add(key, obj)
+
+    def get(self, value):
+        """Return the storage keys of the objects whose attribute is value.
+
+        Raises:
+            TypeError: If value is not hashable.
+        """
+        return self.buckets.get(value, {}).keys()
+
+
+class RangeIndex:
+    """Represent an ordered index of stored objects on one number
+    attribute.
+
+    The indexed values are kept in ascending order in a list, along with
+    a list of the storage keys of the objects having them, so a range of
+    values is found by bisection and read in O(log n + k). Objects with
+    the same value are ordered by key. Objects whose attribute is not an
+    int or float, or is NaN, are not indexed.
+
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        sorted_values (list): The indexed values, in ascending order.
+        sorted_keys (list): The storage key of each value of
+            sorted_values.
+        values (dict): Storage keys mapped to their indexed value.
+    """
+
+    def __init__(self, attr):
+        """Initialize a new RangeIndex.
+
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.sorted_values = []
+        self.sorted_keys = []
+        self.values = {}
+
+    def __value(self, obj):
+        """Return the value of obj to index, None if not indexed."""
+        value = getattr(obj, self.attr, None)
+        return value if is_number(value) else None
+
+    def __position(self, key, value):
+        """Return the position of key with value in the sorted lists."""
+        start = bisect_left(self.sorted_values, value)
+        end = bisect_right(self.sorted_values, value, start)
+        return bisect_left(self.sorted_keys, key, start, end)
+
+    def add(self, key, obj):
+        """Index obj under the storage key key."""
+        value = self.__value(obj)
+        if value is None:
+            return
+        i = self.__position(key, value)
+        self.sorted_values.insert(i, value)
+        self.sorted_keys.insert(i, key)
+        self.values[key] = value
+
+    def add_all(self, items):
+        """Index many objects at once, sorting them together.
+
+        Args:
+            items (iterable): (storage key, object) pairs of objects that
+                are not indexed yet.
+        """
+        attr, values = self.attr, self.values
+        for key, obj in items:
+            value = getattr(obj, attr, None)
+            if is_number(value):
+                values[key] = value
+        self.sorted_keys = sorted(values)
+        self.sorted_keys.sort(key=values.__getitem__)
+        self.sorted_values = [values[key] for key in self.sorted_keys]
+
+    def remove(self, key):
+        """Remove the storage key key from the index, if it is indexed."""
+        if key not in self.values:
+            return
+        i = self.__position(key, self.values.pop(key))
+        del self.sorted_values[i]
+        del self.sorted_keys[i]
+
+    def remove_all(self, keys):
+        """Remove many storage keys from the index at once.
+
+        The position of each key is found by bisection, then the sorted
+        lists are copied once without them, instead of moving the rest
+        of the lists for every key removed.
+        """
+        positions = sorted(self.__position(key, self.values.pop(key))
+                           for key in set(keys) if key in self.values)
+        for name in ("sorted_values", "sorted_keys"):
+            old, new, start = getattr(self, name), [], 0
+            for i in positions:
+                new += old[start:i]
+                start = i + 1
+            new += old[start:]
+            setattr(self, name, new)
+
+    def update(self, key, obj):
+        """Move key to the position of the current attribute value of obj."""
+        value = self.__value(obj)
+        if key in self.values and self.values[key] == value and \
+                type(self.values[key]) is type(value):
+            return
+        self.remove(key)
+        self.add(key, obj)
+
+    def range(self, low=None, high=None, include_low=True,
+              include_high=True, reverse=False, limit=None):
+        """Return the storage keys of the objects with a value in a range,
+        in the order of their values, and of their keys for equal values.
+
+        Args:
+            low (int or float): The lowest value, None for no lower bound.
+            high (int or float): The highest value, None for no upper
+                bound.
+            include_low (bool): If False, leave out the value low.
+            include_high (bool): If False, leave out the value high.
+            reverse (bool): If True, return the highest values first.
+            limit (int): The maximum number of keys, None for all.
+
+        Raises:
+            TypeError: If low or high is not a number.
+        """
+        values = self.sorted_values
+        start, end = 0, len(values)
+        if low is not None:
+            find = bisect_left if include_low else bisect_right
+            start = find(values, low)
+        if high is not None:
+            find = bisect_right if include_high else bisect_left
+            end = max(find(values, high), start)
+        if limit is not None:
+            limit = max(limit, 0)
+        if not reverse:
+            if limit is not None:
+                end = min(end, start + limit)
+            return self.sorted_keys[start:end]
+        keys = []
+        while end > start and (limit is None or len(keys) < limit):
+            first = bisect_left(values, values[end - 1], start, end)
+            keys.extend(self.sorted_keys[first:end])
+            end = first
+        return keys if limit is None else keys[:limit]
+
+
+class GridIndex:
+    """Represent a spatial index of stored objects on two attributes, a
+    latitude and a longitude in degrees.
+
+    The globe is divided into cells of cell_size degrees on each side,
+    and each cell holds the objects located in it, so a radius search
+    only measures the distance to the objects of the cells the circle
+    overlaps, or the occupied cells in the circle when there are fewer of
+    them. Objects whose latitude is not a number in [-90, 90] or
+    whose longitude is not a number in [-180, 180] are not indexed, nor
+    are objects that only have the class default of either attribute.
+
+    Attributes:
+        lat_attr (str): The name of the latitude attribute.
+        lon_attr (str): The name of the longitude attribute.
+        cell_size (float): The size of a cell in degrees.
+        cells (dict): (row, column) cells mapped to a dictionary whose
+            keys are the storage keys of the objects in the cell.
+        values (dict): Storage keys mapped to their (latitude,
+            longitude) point.
+    """
+
+    def __init__(self, lat_attr, lon_attr, cell_size=0.1):
+        """Initialize a new GridIndex.
+
+        Args:
+            lat_attr (str): The name of the latitude attribute.
+            lon_attr (str): The name of the longitude attribute.
+            cell_size (float): The size of a cell in degrees.
+        """
+        self.lat_attr = lat_attr
+        self.lon_attr = lon_attr
+        self.cell_size = cell_size
+        self.cells = {}
+        self.values = {}
+
+    def __cell(self, lat, lon):
+        """Return the (row, column) cell of a point."""
+        return (math.floor((lat + 90) / self.cell_size),
+                math.floor((lon + 180) / self.cell_size))
+
+    def __columns(self, west, east):
+        """Return the columns of cells between two longitudes, going east
+        from west, which may be past -180 or east past 180."""
+        if east - west >= 360:
+            west, east = -180, 180
+        if west < -180:
+            spans = ((west + 360, 180), (-180, east))
+        elif east > 180:
+            spans = ((west, 180), (-180, east - 360))
+        else:
+            spans = ((west, east),)
+        columns = []
+        for west, east in spans:
+            columns.extend(range(math.floor((west + 180) / self.cell_size),
+                                 math.floor((east + 180) / self.cell_size)
+                                 + 1))
+        return columns
+
+    def __point(self, obj):
+        """Return the (latitude, longitude) of obj, None if not indexed."""
+        lat = obj.__dict__.get(self.lat_attr)
+        lon = obj.__dict__.get(self.lon_attr)
+        for value, bound in ((lat, 90), (lon, 180)):
+            if type(value) not in (int, float) or not -bound <= value <= bound:
+                return None
+        return lat, lon
+
+    def add(self, key, obj):
+        """Index obj under the storage key key."""
+        point = self.__point(obj)
+        if point is None:
+            return
+        self.cells.setdefault(self.__cell(*point), {})[key] = None
+        self.values[key] = point
+
+    def remove(self, key):
+        """Remove the storage key key from the index, if it is indexed."""
+        if key not in self.values:
+            return
+        cell = self.__cell(*self.values.pop(key))
+        bucket = self.cells[cell]
+        del bucket[key]
+        if len(bucket) == 0:
+            del self.cells[cell]
+
+    def update(self, key, obj):
+        """Move key to the cell of the current location of obj."""
+        if key in self.values and self.values[key] == self.__point(obj):
+            return
+        self.remove(key)
+        self.add(key, obj)
+
+    def near(self, lat, lon, radius):
+        """Return the storage keys of the objects within radius km of a
+        point, nearest first.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lon (float): The longitude of the point, in degrees.
+            radius (float): The search radius in km.
+
+        Returns:
+            A list of (key, distance in km) tuples.
+
+        Raises:
+            ValueError: If the point is not on the globe.
+        """
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError("Invalid point ({}, {})".format(lat, lon))
+        angle = radius / EARTH_RADIUS
+        low = math.degrees(math.radians(lat) - angle)
+        high = math.degrees(math.radians(lat) + angle)
+        rows = range(math.floor((max(low, -90.0) + 90) / self.cell_size),
+                     math.floor((min(high, 90.0) + 90) / self.cell_size) + 1)
+        span = 180
+        if low > -90 and high < 90:
+            span = math.degrees(math.asin(min(
+                math.sin(angle) / math.cos(math.radians(lat)), 1.0)))
+        columns = self.__columns(lon - span, lon + span)
+        if len(rows) * len(columns) <= len(self.cells):
+            cells = [self.cells.get((row, column), ())
+                     for row in rows for column in columns]
+        else:
+            columns = set(columns)
+            cells = [bucket for (row, column), bucket in self.cells.items()
+                     if row in rows and column in columns]
+        found = []
+        values = self.values
+        for bucket in cells:
+            for key in bucket:
+                km = distance(lat, lon, *values[key])
+                if km <= radius:
+                    found.append((key, km))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(self, lat, lon, count):
+        """Return the storage keys of the count objects nearest a point.
+
+        The search radius starts at the size of a cell and doubles until
+        it holds count objects or covers the globe.
+
+        Args:
+            lat (float): The latitude of the point, in degrees.
+            lon (float): The longitude of the point, in degrees.
+            count (int): The number of objects to return.
+
+        Returns:
+            A list of (key, distance in km) tuples, nearest first.
+
+        Raises:
+            ValueError: If the point is not on the globe.
+        """
+        radius = math.radians(self.cell_size) * EARTH_RADIUS
+        while True:
+            found = self.near(lat, lon, radius)
+            if len(found) >= count or radius >= math.pi * EARTH_RADIUS:
+                return found[:max(count, 0)]
+            radius *= 2
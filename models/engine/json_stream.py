@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+"""Defines functions to walk a JSON object member by member."""
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 1 << 20
+_DECODER = json.JSONDecoder()
+_TEXT_SPACE = re.compile(r"\s*")
+_TEXT_MEMBER = re.compile(r'\s*(,?)\s*("(?:[^"\\]|\\.)*")\s*:\s*')
+_SPACE = re.compile(rb"\s*")
+_MEMBER = re.compile(rb'\s*(,?)\s*("[^"\\]*(?:\\.[^"\\]*)*")\s*:\s*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SKIP = re.compile(rb'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_LITERAL = re.compile(rb"[^,}\]\s]+")
+
+
+def _key(text):
+    """Decode the JSON string text of a member name."""
+    if "\\" in text:
+        return json.loads(text)
+    return text[1:-1]
+
+
+def _value_end(buf, pos):
+    """Return the offset in buf just past the JSON value starting at pos.
+
+    Returns None if buf ends before the value does.
+    """
+    if buf[pos:pos + 1] == b'"':
+        match = _STRING.match(buf, pos)
+        if match is None:
+            return None
+        return match.end()
+    if buf[pos:pos + 1] not in (b"{", b"["):
+        match = _LITERAL.match(buf, pos)
+        if match is None or match.end() == len(buf):
+            return None
+        return match.end()
+    depth = 0
+    end = len(buf)
+    while pos < end:
+        char = buf[pos]
+        if char == 0x7b or char == 0x5b:
+            depth += 1
+        elif char == 0x7d or char == 0x5d:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        else:
+            return None
+        pos = _SKIP.match(buf, pos + 1).end()
+    return None
+
+
+def iter_members(f, chunk_size=CHUNK_SIZE):
+    """Walk the JSON object in the binary file f without decoding values.
+
+    The file is read chunk_size bytes at a time, so memory use is bounded
+    by the size of the largest member, not of the file.
+
+    Args:
+        f (file): A file opened in binary mode, positioned at the start
+            of the JSON text.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Yields:
+        A (key, start, end) tuple for each member of the object, where
+        key is the decoded member name and start and end are the file
+        offsets of the raw JSON text of its value.
+
+    Raises:
+        ValueError: If the file does not hold a JSON object, or holds
+            more than whitespace after it.
+    """
+    base = f.tell()
+    buf = f.read(chunk_size)
+    eof = len(buf) < chunk_size
+    while not eof and _SPACE.match(buf).end() == len(buf):
+        chunk = f.read(chunk_size)
+        eof = len(chunk) < chunk_size
+        buf += chunk
+    pos = _SPACE.match(buf).end()
+    if buf[pos:pos + 1] != b"{":
+        raise ValueError("Expecting '{{' at offset {}".format(base + pos))
+    pos += 1
+    first = True
+    while True:
+        match = _MEMBER.match(buf, pos)
+        if match is not None and match.group(1) == (b"" if first else b","):
+            end = _value_end(buf, match.end())
+            if end is not None:
+                yield (_key(match.group(2).decode()), base + match.end(),
+                       base + end)
+                pos = end
+                first = False
+                continue
+        else:
+            close = _SPACE.match(buf, pos).end()
+            if buf[close:close + 1] == b"}":
+                break
+        if eof:
+            raise ValueError("Invalid JSON object member at offset "
+                             "{}".format(base + pos))
+        chunk = f.read(chunk_size)
+        eof = len(chunk) < chunk_size
+        buf = buf[pos:] + chunk
+        base += pos
+        pos = 0
+    pos = close + 1
+    while True:
+        end = _SPACE.match(buf, pos).end()
+        if end < len(buf):
+            raise ValueError("Extra data at offset {}".format(base + end))
+        if eof:
+            return
+        base += len(buf)
+        buf = f.read(chunk_size)
+        eof = len(buf) < chunk_size
+        pos = 0
+
+
+def iter_values(f, chunk_size=CHUNK_SIZE):
+    """Decode the JSON object in the binary file f one member at a time.
+
+    Only the current chunk and the member being decoded are held in
+    memory, so the caller can consume each value before the next one is
+    read.
+
+    Args:
+        f (file): A file opened in binary mode, positioned at the start
+            of UTF-8 encoded JSON text.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Yields:
+        A (key, value) tuple for each member of the object.
+
+    Raises:
+        ValueError: If the file does not hold a JSON object, or holds
+            more than whitespace after it.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    eof = False
+    while True:
+        pos = _TEXT_SPACE.match(buf).end()
+        if pos < len(buf) or eof:
+            break
+        chunk = f.read(chunk_size)
+        eof = len(chunk) < chunk_size
+        buf += decoder.decode(chunk, eof)
+    if buf[pos:pos + 1] != "{":
+        raise ValueError("Expecting '{'")
+    pos += 1
+    first = True
+    while True:
+        match = _TEXT_MEMBER.match(buf, pos)
+        if match is not None and match.group(1) == ("" if first else ","):
+            try:
+                value, end = _DECODER.raw_decode(buf, match.end())
+            except ValueError:
+                end = len(buf)
+            after = buf[end:end + 1]
+            if after.isspace():
+                end = _TEXT_SPACE.match(buf, end).end()
+                after = buf[end:end + 1]
+            if after in (",", "}"):
+                yield _key(match.group(2)), value
+                pos = end
+                first = False
+                continue
+        else:
+            close = _TEXT_SPACE.match(buf, pos).end()
+            if buf[close:close + 1] == "}":
+                break
+        if eof:
+            raise ValueError("Invalid JSON object member: "
+                             "{!r}".format(buf[pos:pos + 40]))
+        chunk = f.read(chunk_size)
+        eof = len(chunk) < chunk_size
+        buf = buf[pos:] + decoder.decode(chunk, eof)
+        pos = 0
+    pos = close + 1
+    while True:
+        end = _TEXT_SPACE.match(buf, pos).end()
+        if end < len(buf):
+            raise ValueError("Extra data: {!r}".format(buf[end:end + 40]))
+        if eof:
+            return
+        chunk = f.read(chunk_size)
+        eof = len(chunk) < chunk_size
+        buf = decoder.decode(chunk, eof)
+        pos = 0
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""Defines the Unloaded, LazyDict and BoundedLazyDict classes."""
+from collections import OrderedDict
+from collections.abc import ItemsView, ValuesView
+
+
+class Unloaded:
+    """Represent a stored object that has not been instantiated yet.
+
+    Attributes:
+        location (any): Where the serialized object can be read from.
+    """
+
+    __slots__ = ("location",)
+
+    def __init__(self, location):
+        """Initialize a new Unloaded placeholder.
+
+        Args:
+            location (any): Where the serialized object can be read from.
+        """
+        self.location = location
+
+
+class LazyDict(dict):
+    """Represent a dictionary whose values are loaded on first access.
+
+    Values stored as Unloaded placeholders are replaced by the result of
+    calling load(key, placeholder) the first time they are read through
+    indexing, get(), pop(), values() or items(). Key lookups, membership
+    tests and iteration over the keys never load anything.
+
+    Attributes:
+        load (callable): Called with a key and its Unloaded placeholder,
+            returns the loaded value.
+    """
+
+    def __init__(self, load, *args, **kwargs):
+        """Initialize a new LazyDict.
+
+        Args:
+            load (callable): The function loading Unloaded values.
+            *args, **kwargs: Initial items, as for dict.
+        """
+        super().__init__(*args, **kwargs)
+        self.load = load
+
+    def __getitem__(self, key):
+        """Return the value of key, loading it if needed."""
+        value = super().__getitem__(key)
+        if isinstance(value, Unloaded):
+            value = self.load(key, value)
+            super().__setitem__(key, value)
+        return value
+
+    def get(self, key, default=None):
+        """Return the value of key, loading it if needed, else default."""
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        """Remove key and return its value, loading it if needed."""
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *default)
+
+    def values(self):
+        """Return a view of the values, loaded as they are iterated."""
+        return ValuesView(self)
+
+    def items(self):
+        """Return a view of the items, loaded as they are iterated."""
+        return ItemsView(self)
+
+    def copy(self):
+        """Return a shallow copy that shares the load function."""
+        return LazyDict(self.load, dict.items(self))
+
+
+class BoundedLazyDict(LazyDict):
+    """Represent a LazyDict keeping at most capacity values loaded.
+
+    Reading or setting a loaded value through indexing makes it the most
+    recently used. Once more than capacity values are loaded, the least
+    recently used ones are replaced by the Unloaded placeholder returned
+    by unload(key, value).
+
+    Attributes:
+        unload (callable): Called with a key and its loaded value, returns
+            the placeholder to store instead.
+        capacity (int): The maximum number of loaded values.
+        recent (OrderedDict): The keys of the loaded values, least
+            recently used first.
+        hits (int): The number of reads of a loaded value.
+        misses (int): The number of reads that loaded a value.
+        evictions (int): The number of values unloaded.
+    """
+
+    def __init__(self, load, unload, capacity, *args, **kwargs):
+        """Initialize a new BoundedLazyDict.
+
+        Args:
+            load (callable): The function loading Unloaded values.
+            unload (callable): The function unloading values.
+            capacity (int): The maximum number of loaded values.
+            *args, **kwargs: Initial items, as for dict.
+        """
+        super().__init__(load, *args, **kwargs)
+        self.unload = unload
+        self.capacity = capacity
+        self.recent = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+        for key, value in dict.items(self):
+            if not isinstance(value, Unloaded):
+                self.recent[key] = None
+        self.__evict()
+
+    def __getitem__(self, key):
+        """Return the value of key, loading it if needed."""
+        value = dict.__getitem__(self, key)
+        if isinstance(value, Unloaded):
+            self.misses += 1
+            value = self.load(key, value)
+            dict.__setitem__(self, key, value)
+        else:
+            self.hits += 1
+        self.__use(key)
+        return value
+
+    def __setitem__(self, key, value):
+        """Set the value of key, as the most recently used if loaded."""
+        dict.__setitem__(self, key, value)
+        if isinstance(value, Unloaded):
+            self.recent.pop(key, None)
+        else:
+            self.__use(key)
+
+    def __delitem__(self, key):
+        """Remove key."""
+        dict.__delitem__(self, key)
+        self.recent.pop(key, None)
+
+    def __use(self, key):
+        """Make key the most recently used and unload beyond capacity."""
+        self.recent[key] = None
+        self.recent.move_to_end(key)
+        self.__evict()
+
+    def __evict(self):
+        """Unload the least recently used values beyond capacity."""
+        while len(self.recent) > self.capacity:
+            key = next(iter(self.recent))
+            del self.recent[key]
+            value = dict.__getitem__(self, key)
+            dict.__setitem__(self, key, self.unload(key, value))
+            self.evictions += 1
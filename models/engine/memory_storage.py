@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""Defines the MemoryStorage class."""
+from models.engine.file_storage import FileStorage
+
+
+class MemoryStorage(FileStorage):
+    """Represent a storage engine that never touches the disk.
+
+    Objects are kept, partitioned and indexed in memory exactly as
+    FileStorage does, but save() only forgets the changes and reload()
+    does nothing, so every object is lost when the process exits.
+    """
+
+    def __init__(self):
+        """Initialize a new MemoryStorage."""
+        super().__init__()
+
+    def save(self):
+        """Forget the changes made since the last save."""
+        self.pop_changes()
+
+    def reload(self):
+        """Do nothing, as nothing was ever saved."""
+
+    def compact(self):
+        """Do nothing, as nothing is stored on disk.
+
+        Returns:
+            A (seconds, bytes) tuple of zeros.
+        """
+        return 0.0, 0
@@ -0,0 +1,265 @@
+#!/usr/bin/python3
+"""Defines the Query class."""
+import copy
+import heapq
+import operator
+from itertools import chain, islice
+from models.base_model import classes
+from models.engine.index import is_number
+
+OPERATORS = {
+    "exact": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda value, values: value in values,
+    "contains": operator.contains,
+}
+
+BOUNDS = {"gt": ("low", False), "gte": ("low", True),
+          "lt": ("high", False), "lte": ("high", True)}
+
+
+def _bounds(filters, attr):
+    """Return the keyword arguments of storage.between() for the range
+    that the number conditions on attr in filters select."""
+    bounds = {}
+    for name, op, value in filters:
+        if name != attr or op not in BOUNDS or not is_number(value):
+            continue
+        side, include = BOUNDS[op]
+        current = bounds.get(side)
+        if (current is None or value == current and not include or
+                (value > current if side == "low" else value < current)):
+            bounds[side] = value
+            bounds["include_" + side] = include
+    return bounds
+
+
+def _kind(value):
+    """Return the name grouping value with the values it can be compared
+    to: "" for numbers and the name of its type otherwise."""
+    if type(value) in (bool, int, float):
+        return ""
+    return type(value).__name__
+
+
+def _ascending(attr):
+    """Return a sort key on attr placing objects without a value last and
+    values of different types apart."""
+    def key(obj):
+        value = getattr(obj, attr, None)
+        return value is None, _kind(value), value
+    return key
+
+
+def _descending(attr):
+    """Return a reverse sort key on attr placing objects without a value
+    last and values of different types apart."""
+    def key(obj):
+        value = getattr(obj, attr, None)
+        return value is not None, _kind(value), value
+    return key
+
+
+def _unranged(storage, cls, attr):
+    """Yield the objects of class cls whose attribute attr is not a number,
+    which its range index leaves out, reading storage only when the first
+    one is asked for."""
+    for obj in storage.all(cls).values():
+        if not is_number(getattr(obj, attr, None)):
+            yield obj
+
+
+class Query:
+    """Represent a query on the stored objects of one class.
+
+    where(), order_by(), limit() and only() each return a new Query, and
+    nothing is read from storage until the query is iterated. Results are
+    then produced one at a time, except that ordering needs every
+    matching object first.
+
+    Conditions are keyword arguments named after an attribute, optionally
+    followed by two underscores and one of the OPERATORS, as in
+    where(price_by_night__lt=100). Equality conditions are looked up with
+    storage.find(), which uses the hash indexes of the class. An object
+    matches a condition it cannot be compared with, such as None < 100,
+    only for the ne operator.
+
+    Without equality conditions, a query sorted by a single attribute
+    listed in the __ranges__ of the class, or else with a number range
+    condition on one, reads the objects from storage.between() in the
+    order of that attribute, which then is the order of the results
+    unless the query is sorted by another attribute.
+
+    Attributes:
+        storage (FileStorage): The storage engine queried.
+        cls (type or str): The class or the name of the class queried.
+        filters (tuple): The (attribute, operator, value) conditions the
+            objects must all match.
+        ordering (tuple): The attribute names to sort by, each prefixed
+            with "-" for descending order.
+        count_max (int): The maximum number of results, None for all.
+        fields (tuple): The attribute names results are restricted to;
+            if empty, results are the objects themselves.
+    """
+
+    def __init__(self, storage, cls):
+        """Initialize a new Query matching every object of class cls.
+
+        Args:
+            storage (FileStorage): The storage engine to query.
+            cls (type or str): The class or the name of the class.
+        """
+        self.storage = storage
+        self.cls = cls
+        self.filters = ()
+        self.ordering = ()
+        self.count_max = None
+        self.fields = ()
+
+    def __derive(self, **changes):
+        """Return a copy of the query with the given attributes changed."""
+        query = copy.copy(self)
+        query.__dict__.update(changes)
+        return query
+
+    def where(self, **conditions):
+        """Return the query restricted to objects matching conditions.
+
+        Raises:
+            ValueError: If a condition names an unknown operator.
+        """
+        filters = []
+        for lookup, value in conditions.items():
+            attr, sep, op = lookup.rpartition("__")
+            if not sep:
+                attr, op = lookup, "exact"
+            elif op not in OPERATORS:
+                raise ValueError("Unknown operator {!r}".format(op))
+            filters.append((attr, op, value))
+        return self.__derive(filters=self.filters + tuple(filters))
+
+    def order_by(self, *attrs):
+        """Return the query sorted by attrs, each prefixed with "-" for
+        descending order. Objects without a value come last."""
+        return self.__derive(ordering=attrs)
+
+    def limit(self, count):
+        """Return the query stopping after count results.
+
+        Raises:
+            ValueError: If count is negative.
+        """
+        if count < 0:
+            raise ValueError("limit must not be negative")
+        return self.__derive(count_max=count)
+
+    def only(self, *attrs):
+        """Return the query producing dictionaries of attrs only instead
+        of the objects."""
+        return self.__derive(fields=attrs)
+
+    def __iter__(self):
+        """Run the query and iterate over its results."""
+        equals = {attr: value for attr, op, value in self.filters
+                  if op == "exact"}
+        tests = [(attr, op, value) for attr, op, value in self.filters
+                 if op != "exact"]
+        ordered = False
+        if equals:
+            objects = self.storage.find(self.cls, **equals).values()
+        else:
+            objects, tests, ordered = self.__ranged(tests)
+        if tests:
+            tests = [(attr, OPERATORS[op], value)
+                     for attr, op, value in tests]
+            objects = (obj for obj in objects if self.__matches(obj, tests))
+        if self.ordering and not ordered:
+            objects = self.__sorted(objects)
+        if self.count_max is not None:
+            objects = islice(objects, self.count_max)
+        if self.fields:
+            objects = ({attr: getattr(obj, attr, None)
+                        for attr in self.fields} for obj in objects)
+        return iter(objects)
+
+    def __ranged(self, tests):
+        """Return the objects to test, read in order from the range index
+        of an attribute if the query can use one.
+
+        Args:
+            tests (list): The (attribute, operator, value) conditions
+                other than equality.
+
+        Returns:
+            An (objects, conditions left to test, True if the objects are
+            in the order of the query) tuple.
+        """
+        cls = classes[self.cls] if isinstance(self.cls, str) else self.cls
+        ranges = cls.__ranges__
+        attr = reverse = None
+        if len(self.ordering) == 1 and self.ordering[0].lstrip("-") in ranges:
+            attr = self.ordering[0].lstrip("-")
+            reverse = self.ordering[0].startswith("-")
+        else:
+            for name, op, value in tests:
+                if name in ranges and op in BOUNDS and is_number(value):
+                    attr = name
+                    break
+        if attr is None:
+            return self.storage.all(self.cls).values(), tests, False
+        bounds = _bounds(tests, attr)
+        tests = [(name, op, value) for name, op, value in tests
+                 if name != attr or op not in BOUNDS or not is_number(value)]
+        limit = self.count_max if not tests else None
+        objects = self.storage.between(self.cls, attr, reverse=bool(reverse),
+                                       limit=limit, **bounds)
+        if reverse is not None and not bounds:
+            objects = chain(objects, _unranged(self.storage, self.cls, attr))
+        return objects, tests, reverse is not None
+
+    @staticmethod
+    def __matches(obj, tests):
+        """Return True if obj passes every (attribute, function, value)
+        test."""
+        for attr, function, value in tests:
+            try:
+                if not function(getattr(obj, attr, None), value):
+                    return False
+            except TypeError:
+                if function is not operator.ne:
+                    return False
+        return True
+
+    def __sorted(self, objects):
+        """Return the objects in the order of the query.
+
+        With a limit and a single sort attribute only the first results
+        are kept while sorting.
+        """
+        keys = [(attr[1:], True) if attr.startswith("-") else (attr, False)
+                for attr in self.ordering]
+        if len(keys) == 1 and self.count_max is not None:
+            attr, reverse = keys[0]
+            if reverse:
+                return heapq.nlargest(self.count_max, objects,
+                                      _descending(attr))
+            return heapq.nsmallest(self.count_max, objects, _ascending(attr))
+        objects = list(objects)
+        for attr, reverse in reversed(keys):
+            if reverse:
+                objects.sort(key=_descending(attr), reverse=True)
+            else:
+                objects.sort(key=_ascending(attr))
+        return objects
+
+    def count(self):
+        """Return the number of results of the query."""
+        return sum(1 for result in self)
+
+    def first(self):
+        """Return the first result of the query, None if it has none."""
+        return next(iter(self.limit(1)), None)
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Defines the Place class."""
 from models.base_model import BaseModel
+from models.relationship import BelongsTo, HasMany, ListOf
 
 
 class Place(BaseModel):
@@ -18,8 +19,18 @@ class Place(BaseModel):
         latitude (float): The latitude of the place.
         longitude (float): The longitude of the place.
         amenity_ids (list): A list of Amenity ids.
+        city (City): The city of the place.
+        user (User): The user hosting the place.
+        reviews (list): The reviews of the place.
+        amenities (list): The amenities of amenity_ids.
     """
 
+    __indexes__ = ("city_id", "user_id")
+    __ranges__ = ("price_by_night", "max_guest", "number_rooms",
+                  "number_bathrooms")
+    __spatial__ = ("latitude", "longitude")
+    __text__ = ("name", "description")
+
     city_id = ""
     user_id = ""
     name = ""
@@ -31,3 +42,8 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    city = BelongsTo("City", "city_id")
+    user = BelongsTo("User", "user_id")
+    reviews = HasMany("Review", "place_id", cascade=True)
+    amenities = ListOf("Amenity", "amenity_ids")
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+"""Defines the relationships between model classes and join().
+
+A relationship is a read-only class attribute giving the objects related
+to an instance through the id attributes it is stored with. They are
+looked up in storage when the attribute is read: BelongsTo follows an
+id attribute of the instance, HasMany finds the objects of another class
+whose id attribute is the id of the instance, through the HashIndex
+storage keeps on it, and ListOf follows a list of ids of the instance.
+
+join() loads relationships for many objects at once, and dependents()
+lists the objects that deleting objects would leave orphaned.
+"""
+from abc import ABC, abstractmethod
+import models
+
+
+class Relationship(ABC):
+    """Represent a read-only attribute of a model class giving related
+    objects. Subclasses define how load() finds them.
+
+    Attributes:
+        cls_name (str): The name of the class of the related objects.
+        attr (str): The name of the id attribute relating the objects.
+        name (str): The name of the relationship attribute.
+    """
+
+    def __init__(self, cls_name, attr):
+        """Initialize a new Relationship.
+
+        Args:
+            cls_name (str): The name of the class of the related objects.
+            attr (str): The name of the id attribute relating the objects.
+        """
+        self.cls_name = cls_name
+        self.attr = attr
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        """Record the name of the attribute the relationship is bound to."""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Return the objects related to obj, or the relationship itself
+        when read on the class."""
+        if obj is None:
+            return self
+        return self.load([obj])[obj.id]
+
+    def __set__(self, obj, value):
+        """Refuse to set the relationship, which is computed from ids."""
+        raise AttributeError("{} is read-only".format(self.name))
+
+    @abstractmethod
+    def load(self, objects):
+        """Return the related objects of each of objects, reading storage
+        once for all of them.
+
+        Args:
+            objects (list): Instances of the class of the relationship.
+
+        Returns:
+            A dictionary of the id of each of objects mapped to its
+            related objects.
+        """
+
+
+class BelongsTo(Relationship):
+    """Represent the object whose id is the value of an id attribute, or
+    None if there is no such object, as in place.city."""
+
+    def load(self, objects):
+        """Return the object each of objects belongs to, by object id."""
+        storage = models.storage
+        return {obj.id: storage.get(self.cls_name,
+                                    getattr(obj, self.attr, None))
+                for obj in objects}
+
+
+class HasMany(Relationship):
+    """Represent the list of the objects of a class whose id attribute is
+    the id of an object, as in state.cities.
+
+    Attributes:
+        cascade (bool): True if the objects depend on the object, and are
+            deleted along with it by storage.delete(obj, cascade=True).
+    """
+
+    def __init__(self, cls_name, attr, cascade=False):
+        """Initialize a new HasMany.
+
+        Args:
+            cls_name (str): The name of the class of the related objects.
+            attr (str): The name of the id attribute relating the objects.
+            cascade (bool): True if the related objects depend on the
+                object.
+        """
+        super().__init__(cls_name, attr)
+        self.cascade = cascade
+
+    def load(self, objects):
+        """Return the objects of each of objects, by object id, looking up
+        all the ids in a single storage.group() call."""
+        return models.storage.group(self.cls_name, self.attr,
+                                    [obj.id for obj in objects])
+
+
+class ListOf(Relationship):
+    """Represent the list of the objects whose ids are listed in an
+    attribute, as in place.amenities. Ids of missing objects are left
+    out."""
+
+    def load(self, objects):
+        """Return the listed objects of each of objects, by object id."""
+        storage = models.storage
+        result = {}
+        for obj in objects:
+            ids = getattr(obj, self.attr, None)
+            if not isinstance(ids, (list, tuple)):
+                ids = ()
+            found = (storage.get(self.cls_name, i) for i in ids)
+            result[obj.id] = [item for item in found if item is not None]
+        return result
+
+
+def join(objects, *paths):
+    """Return objects with their related objects, loading each
+    relationship once for all the objects instead of once per object.
+
+    A path is the name of a relationship, or names separated by dots
+    following the relationships of the related objects, as in
+    "city.state". A path through a HasMany or ListOf relationship gives
+    a list of all the objects it reaches.
+
+    Args:
+        objects (iterable): Instances of one model class.
+        *paths (str): The paths of the related objects to load.
+
+    Returns:
+        A list of (object, dictionary of each path mapped to the related
+        objects) tuples, in the order of objects.
+
+    Raises:
+        AttributeError: If a name is not a relationship of the class it
+            is read on.
+    """
+    objects = list(objects)
+    loaded = [{} for obj in objects]
+    for path in paths:
+        for related, value in zip(loaded, _follow(objects, path.split("."))):
+            related[path] = value
+    return list(zip(objects, loaded))
+
+
+def dependents(objects):
+    """Return the objects depending on objects, directly or through other
+    dependents, following the HasMany relationships declared with
+    cascade=True.
+
+    The dependents are found level by level, loading each relationship
+    once per level for all the objects of the level, so the cost is
+    proportional to the number of dependents.
+
+    Args:
+        objects (iterable): Model instances.
+
+    Returns:
+        A list of the dependents, each once, the dependents of a level
+        before those of the next, and none of objects.
+    """
+    level = list(objects)
+    seen = {(type(obj), obj.id) for obj in level}
+    found = []
+    while level:
+        by_class = {}
+        for obj in level:
+            by_class.setdefault(type(obj), []).append(obj)
+        level = []
+        for cls, parents in by_class.items():
+            for relationship in _cascades(cls):
+                for children in relationship.load(parents).values():
+                    for child in children:
+                        if (type(child), child.id) not in seen:
+                            seen.add((type(child), child.id))
+                            level.append(child)
+        found.extend(level)
+    return found
+
+
+def _cascades(cls):
+    """Return the HasMany relationships of cls declared with cascade=True."""
+    cascades = []
+    for name in dir(cls):
+        value = getattr(cls, name, None)
+        if isinstance(value, HasMany) and value.cascade:
+            cascades.append(value)
+    return cascades
+
+
+def _follow(objects, names):
+    """Return the related objects at the path names of each of objects,
+    loading each relationship of the path once."""
+    if not objects:
+        return []
+    cls = type(objects[0])
+    relationship = getattr(cls, names[0], None)
+    if not isinstance(relationship, Relationship):
+        raise AttributeError("{} has no relationship {}".format(
+            cls.__name__, names[0]))
+    found = relationship.load(objects)
+    values = [found[obj.id] for obj in objects]
+    if len(names) == 1:
+        return values
+    many = not isinstance(relationship, BelongsTo)
+    reached = {}
+    for value in values:
+        for obj in value if many else [value]:
+            if obj is not None:
+                reached[obj.id] = obj
+    deeper = dict(zip(reached, _follow(list(reached.values()), names[1:])))
+    if not many:
+        return [None if value is None else deeper[value.id]
+                for value in values]
+    results = []
+    for value in values:
+        flat = []
+        for obj in value:
+            if isinstance(deeper[obj.id], list):
+                flat.extend(deeper[obj.id])
+            elif deeper[obj.id] is not None:
+                flat.append(deeper[obj.id])
+        results.append(flat)
+    return results
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Defines the Review class."""
 from models.base_model import BaseModel
+from models.relationship import BelongsTo
 
 
 class Review(BaseModel):
@@ -10,8 +11,16 @@ class Review(BaseModel):
         place_id (str): The Place id.
         user_id (str): The User id.
         text (str): The text of the review.
+        place (Place): The reviewed place.
+        user (User): The user who wrote the review.
     """
 
+    __indexes__ = ("place_id", "user_id")
+    __text__ = ("text",)
+
     place_id = ""
     user_id = ""
     text = ""
+
+    place = BelongsTo("Place", "place_id")
+    user = BelongsTo("User", "user_id")
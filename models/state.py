@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Defines the State class."""
 from models.base_model import BaseModel
+from models.relationship import HasMany
 
 
 class State(BaseModel):
@@ -8,6 +9,9 @@ class State(BaseModel):
 
     Attributes:
         name (str): The name of the state.
+        cities (list): The cities of the state.
     """
 
     name = ""
+
+    cities = HasMany("City", "state_id", cascade=True)
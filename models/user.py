@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Defines the User class."""
 from models.base_model import BaseModel
+from models.relationship import HasMany
 
 
 class User(BaseModel):
@@ -11,9 +12,14 @@ class User(BaseModel):
         password (str): The password of the user.
         first_name (str): The first name of the user.
         last_name (str): The last name of the user.
+        places (list): The places the user hosts.
+        reviews (list): The reviews the user wrote.
     """
 
     email = ""
     password = ""
     first_name = ""
     last_name = ""
+
+    places = HasMany("Place", "user_id", cascade=True)
+    reviews = HasMany("Review", "user_id", cascade=True)
@@ -4,17 +4,28 @@
 Unittest classes:
     TestHBNBCommand_prompting
     TestHBNBCommand_help
+    TestHBNBCommand_compact
+    TestHBNBCommand_query
+    TestHBNBCommand_near
+    TestHBNBCommand_search
+    TestHBNBCommand_stats
     TestHBNBCommand_exit
     TestHBNBCommand_create
     TestHBNBCommand_show
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_count
 """
 import os
 import sys
 import unittest
 from models import storage
+from models.base_model import BaseModel, classes
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
 from models.engine.file_storage import FileStorage
 from console import HBNBCommand
 from io import StringIO
@@ -64,24 +75,35 @@ class TestHBNBCommand_help(unittest.TestCase):
             self.assertEqual(h, output.getvalue().strip())
 
     def test_help_destroy(self):
-        h = ("Usage: destroy <class> <id> or <class>.destroy(<id>)\n        "
-             "Delete a class instance of a given id.")
+        h = ("Usage: destroy <class> <id> [--cascade] [--dry-run] or\n"
+             "       <class>.destroy(<id>[, --cascade][, --dry-run])\n"
+             "        Delete a class instance of a given id. With --cascade,"
+             " also\n        delete the instances depending on it, such as "
+             "the cities of a\n        state and their places and reviews. "
+             "With --dry-run, display the\n        instances that would be "
+             "deleted, one per line, instead.")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help destroy"))
             self.assertEqual(h, output.getvalue().strip())
 
     def test_help_all(self):
-        h = ("Usage: all or all <class> or <class>.all()\n        "
+        h = ("Usage: all or all <class> or <class>.all() or\n       "
+             "all [<class>] --limit <number> [--after <cursor>]\n        "
              "Display string representations of all instances of a given class"
              ".\n        If no class is specified, displays all instantiated "
-             "objects.")
+             "objects.\n        With --limit, displays one page of instances,"
+             " one per line, in\n        the order of their ids, followed by "
+             "the cursor to pass to --after\n        for the next page if "
+             "there is one.")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help all"))
             self.assertEqual(h, output.getvalue().strip())
 
     def test_help_count(self):
-        h = ("Usage: count <class> or <class>.count()\n        "
-             "Retrieve the number of instances of a given class.")
+        h = ("Usage: count <class> [<attribute>=<value> ...] or\n       "
+             "<class>.count(<arguments>)\n        Retrieve the number of "
+             "instances of a given class, optionally\n        with the "
+             "given attribute values.")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help count"))
             self.assertEqual(h, output.getvalue().strip())
@@ -99,12 +121,289 @@ class TestHBNBCommand_help(unittest.TestCase):
     def test_help(self):
         h = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  compact  create   help  nearest  quit    show   update\n"
+             "all  count    destroy  near  query    search  stats")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(h, output.getvalue().strip())
 
 
+class TestHBNBCommand_compact(unittest.TestCase):
+    """Unittests for testing compact from the HBNB command interpreter."""
+
+    def test_help_compact(self):
+        h = ("Usage: compact\n        "
+             "Write a fresh snapshot of storage and drop its journal.")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("help compact"))
+            self.assertEqual(h, output.getvalue().strip())
+
+    def test_compact(self):
+        with patch.object(storage, "compact", return_value=(0.0123, 456)):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("compact"))
+                self.assertEqual("Compacted in 0.012s, 456 bytes reclaimed",
+                                 output.getvalue().strip())
+
+
+class TestHBNBCommand_query(unittest.TestCase):
+    """Unittests for testing query from the HBNB command interpreter."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for name, price in (("a", 50), ("b", 120), ("c", 80)):
+            pl = Place()
+            pl.name = name
+            pl.price_by_night = price
+            self.places.append(pl)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def query(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+            return output.getvalue().strip()
+
+    def test_help_query(self):
+        self.assertTrue(self.query("help query").startswith(
+            "Usage: query <class> [<attribute>[__<operator>]=<value> ...]"))
+
+    def test_query_missing_class(self):
+        self.assertEqual("** class name missing **", self.query("query"))
+
+    def test_query_invalid_class(self):
+        self.assertEqual("** class doesn't exist **",
+                         self.query("query MyModel"))
+
+    def test_query_invalid_argument(self):
+        self.assertEqual("** invalid argument: name **",
+                         self.query("query Place name"))
+        self.assertEqual("** invalid argument: limit=x **",
+                         self.query("query Place limit=x"))
+        self.assertEqual("** invalid argument: name__near=a **",
+                         self.query("query Place name__near=a"))
+        self.assertEqual("** invalid argument: price_by_night__lt=x **",
+                         self.query("query Place price_by_night__lt=x"))
+
+    def test_query_objects(self):
+        self.assertEqual(str(self.places[2]),
+                         self.query("query Place price_by_night=80"))
+
+    def test_query_all_arguments(self):
+        line = ("query Place price_by_night__lt=100 order_by=-price_by_night"
+                " limit=1 only=name,price_by_night")
+        self.assertEqual("{'name': 'c', 'price_by_night': 80}",
+                         self.query(line))
+
+    def test_query_in(self):
+        self.assertEqual("{'name': 'a'}\n{'name': 'c'}",
+                         self.query("query Place price_by_night__in=50,80 "
+                                    "only=name"))
+
+    def test_query_dot_notation(self):
+        self.assertEqual("{'name': 'b'}", self.query(
+            "Place.query(price_by_night__gt=100, only=name)"))
+
+    def test_query_range_after_update(self):
+        self.query("query Place price_by_night__gt=0")
+        self.query('update Place {} price_by_night "95"'.format(
+            self.places[1].id))
+        self.query("Place.update({}, {{'price_by_night': 60.0}})".format(
+            self.places[2].id))
+        self.assertEqual(95, self.places[1].price_by_night)
+        self.assertEqual("{'name': 'c'}\n{'name': 'b'}", self.query(
+            "query Place price_by_night__gte=60 price_by_night__lt=100 "
+            "only=name"))
+
+    def test_query_undeclared_after_update(self):
+        self.query("update Place {} rooms 12".format(self.places[0].id))
+        self.query("update Place {} nick 007".format(self.places[1].id))
+        self.assertEqual("{'name': 'a'}", self.query(
+            "query Place rooms=12 only=name"))
+        self.assertEqual("{'name': 'b'}", self.query(
+            "query Place nick__in=007,8 only=name"))
+        self.assertEqual("", self.query("query Place nick=7"))
+
+    def test_query_order_by_mixed_types(self):
+        self.places[0].foo = 5
+        self.places[1].foo = "bar"
+        self.assertEqual("{'name': 'a'}\n{'name': 'b'}\n{'name': 'c'}",
+                         self.query("query Place order_by=foo only=name"))
+
+    def test_query_unorderable_values(self):
+        self.places[0].foo = {"a": 1}
+        self.places[1].foo = {"b": 2}
+        self.assertEqual("** values can't be ordered **",
+                         self.query("query Place order_by=foo"))
+
+
+class TestHBNBCommand_near(unittest.TestCase):
+    """Unittests for testing near and nearest from the HBNB command
+    interpreter."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for lat, lon in ((37.7749, -122.4194), (37.8044, -122.2712)):
+            pl = Place()
+            pl.latitude = lat
+            pl.longitude = lon
+            self.places.append(pl)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def run_command(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+            return output.getvalue().strip()
+
+    def test_help(self):
+        self.assertEqual(
+            "Usage: near <class> <latitude> <longitude> <radius_km>\n"
+            "        Display the instances of a class within a radius of a "
+            "point,\n        nearest first, each preceded by its distance.",
+            self.run_command("help near"))
+        self.assertTrue(self.run_command("help nearest").startswith(
+            "Usage: nearest <class> <latitude> <longitude> <count>"))
+
+    def test_near(self):
+        self.assertEqual(
+            "[0.000 km] {}\n[13.430 km] {}".format(*self.places),
+            self.run_command("near Place 37.7749 -122.4194 20"))
+        self.assertEqual("[0.000 km] {}".format(self.places[0]),
+                         self.run_command("near Place 37.7749 -122.4194 1"))
+
+    def test_nearest(self):
+        self.assertEqual("[0.000 km] {}".format(self.places[1]),
+                         self.run_command("nearest Place 37.8044 -122.2712 1"))
+        self.assertEqual(
+            "[0.000 km] {}\n[13.430 km] {}".format(*self.places),
+            self.run_command("Place.nearest(37.7749, -122.4194, 5)"))
+
+    def test_missing_arguments(self):
+        self.assertEqual("** class name missing **",
+                         self.run_command("near"))
+        self.assertEqual("** latitude missing **",
+                         self.run_command("near Place"))
+        self.assertEqual("** longitude missing **",
+                         self.run_command("nearest Place 1"))
+        self.assertEqual("** radius missing **",
+                         self.run_command("near Place 1 2"))
+        self.assertEqual("** count missing **",
+                         self.run_command("nearest Place 1 2"))
+
+    def test_invalid_arguments(self):
+        self.assertEqual("** class doesn't exist **",
+                         self.run_command("near MyModel 1 2 3"))
+        self.assertEqual("** class has no location **",
+                         self.run_command("near User 1 2 3"))
+        self.assertEqual("** invalid argument: x **",
+                         self.run_command("near Place x 2 3"))
+        self.assertEqual("** invalid argument: 1.5 **",
+                         self.run_command("nearest Place 1 2 1.5"))
+        self.assertEqual("** invalid location: 100 2 **",
+                         self.run_command("near Place 100 2 3"))
+
+
+class TestHBNBCommand_search(unittest.TestCase):
+    """Unittests for testing search from the HBNB command interpreter."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.reviews = []
+        for text in ("Great view of the ocean", "Cold ocean"):
+            rv = Review()
+            rv.text = text
+            self.reviews.append(rv)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def run_command(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+            return output.getvalue().strip()
+
+    def test_help(self):
+        self.assertTrue(self.run_command("help search").startswith(
+            'Usage: search <class> "<terms>"'))
+
+    def test_search(self):
+        lines = self.run_command('search Review "great ocean"').split("\n")
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].startswith("["))
+        self.assertTrue(lines[0].endswith("] " + str(self.reviews[0])))
+        self.assertTrue(lines[1].endswith("] " + str(self.reviews[1])))
+
+    def test_search_phrase(self):
+        self.assertTrue(self.run_command(
+            'search Review \'"cold ocean"\'').endswith(str(self.reviews[1])))
+
+    def test_search_dot_notation(self):
+        self.assertTrue(self.run_command(
+            'Review.search("view")').endswith(str(self.reviews[0])))
+
+    def test_no_match(self):
+        self.assertEqual("", self.run_command("search Review mountain"))
+
+    def test_invalid_arguments(self):
+        self.assertEqual("** class name missing **",
+                         self.run_command("search"))
+        self.assertEqual("** class doesn't exist **",
+                         self.run_command("search MyModel ocean"))
+        self.assertEqual("** class has no text **",
+                         self.run_command("search User Betty"))
+        self.assertEqual("** terms missing **",
+                         self.run_command("search Review"))
+
+
+class TestHBNBCommand_stats(unittest.TestCase):
+    """Unittests for testing stats from the HBNB command interpreter."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        for city_id in ("a", "b", "a"):
+            pl = Place()
+            pl.city_id = city_id
+        Review()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def stats(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+            return output.getvalue().strip()
+
+    def test_help_stats(self):
+        self.assertTrue(self.stats("help stats").startswith(
+            "Usage: stats [<class> <attribute>]"))
+
+    def test_stats_classes(self):
+        lines = self.stats("stats").splitlines()
+        self.assertEqual(sorted(classes), [line.split(":")[0]
+                                           for line in lines])
+        self.assertIn("Place: 3", lines)
+        self.assertIn("Review: 1", lines)
+        self.assertIn("User: 0", lines)
+
+    def test_stats_values(self):
+        self.assertEqual("a: 2\nb: 1", self.stats("stats Place city_id"))
+        self.assertEqual("a: 2\nb: 1", self.stats("Place.stats(city_id)"))
+        self.assertEqual("0: 3", self.stats("stats Place max_guest"))
+
+    def test_stats_invalid_class(self):
+        self.assertEqual("** class doesn't exist **",
+                         self.stats("stats MyModel city_id"))
+
+    def test_stats_missing_attribute(self):
+        self.assertEqual("** attribute name missing **",
+                         self.stats("stats Place"))
+
+
 class TestHBNBCommand_exit(unittest.TestCase):
     """Unittests for testing exiting from the HBNB command interpreter."""
 
@@ -116,6 +415,18 @@ class TestHBNBCommand_exit(unittest.TestCase):
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertTrue(HBNBCommand().onecmd("EOF"))
 
+    def test_quit_flushes_storage(self):
+        with patch.object(storage, "flush") as flush:
+            with patch("sys.stdout", new=StringIO()):
+                HBNBCommand().onecmd("quit")
+            flush.assert_called_once_with()
+
+    def test_EOF_flushes_storage(self):
+        with patch.object(storage, "flush") as flush:
+            with patch("sys.stdout", new=StringIO()):
+                HBNBCommand().onecmd("EOF")
+            flush.assert_called_once_with()
+
 
 class TestHBNBCommand_create(unittest.TestCase):
     """Unittests for testing create from the HBNB command interpreter."""
@@ -198,6 +509,17 @@ class TestHBNBCommand_create(unittest.TestCase):
             testKey = "Review.{}".format(output.getvalue().strip())
             self.assertIn(testKey, storage.all().keys())
 
+    def test_create_new_model_class(self):
+        class Pet(BaseModel):
+            pass
+        try:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("create Pet"))
+                testKey = "Pet.{}".format(output.getvalue().strip())
+            self.assertIs(Pet, type(storage.all()[testKey]))
+        finally:
+            del classes["Pet"]
+
 
 class TestHBNBCommand_show(unittest.TestCase):
     """Unittests for testing show from the HBNB command interpreter"""
@@ -705,6 +1027,43 @@ class TestHBNBCommand_destroy(unittest.TestCase):
             self.assertFalse(HBNBCommand().onecmd(command))
             self.assertNotIn(obj, storage.all())
 
+    def test_destroy_cascade(self):
+        st = State()
+        cy = City(state_id=st.id)
+        storage.new(cy)
+        pl = Place(city_id=cy.id)
+        storage.new(pl)
+        testCmd = "destroy State {} --cascade".format(st.id)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(testCmd))
+            self.assertEqual("", output.getvalue().strip())
+        for obj in (st, cy, pl):
+            self.assertNotIn(obj, storage.all().values())
+
+    def test_destroy_dry_run(self):
+        st = State()
+        cy = City(state_id=st.id)
+        storage.new(cy)
+        for testCmd, expected in (
+                ("destroy State {} --dry-run", [st]),
+                ("destroy State {} --cascade --dry-run", [st, cy]),
+                ("State.destroy({}, --dry-run, --cascade)", [st, cy])):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(testCmd.format(st.id)))
+                self.assertEqual([str(obj) for obj in expected],
+                                 output.getvalue().strip().splitlines())
+        self.assertIn(st, storage.all().values())
+        self.assertIn(cy, storage.all().values())
+
+    def test_destroy_invalid_flag(self):
+        st = State()
+        testCmd = "destroy State {} --cascade --all".format(st.id)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(testCmd))
+            self.assertEqual("** invalid argument: --all **",
+                             output.getvalue().strip())
+        self.assertIn(st, storage.all().values())
+
 
 class TestHBNBCommand_all(unittest.TestCase):
     """Unittests for testing all of the HBNB command interpreter."""
@@ -851,6 +1210,60 @@ class TestHBNBCommand_all(unittest.TestCase):
             self.assertIn("Review", output.getvalue().strip())
             self.assertNotIn("BaseModel", output.getvalue().strip())
 
+    def test_all_pages(self):
+        FileStorage._FileStorage__objects = {}
+        ids = []
+        with patch("sys.stdout", new=StringIO()) as output:
+            for i in range(5):
+                self.assertFalse(HBNBCommand().onecmd("create User"))
+            ids = sorted(output.getvalue().split())
+        self.assertFalse(HBNBCommand().onecmd("create State"))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all User --limit 2"))
+            lines = output.getvalue().strip().split("\n")
+        self.assertEqual(3, len(lines))
+        self.assertIn(ids[0], lines[0])
+        self.assertIn(ids[1], lines[1])
+        self.assertTrue(lines[2].startswith("** next page: --after "))
+        cursor = lines[2].split()[4]
+        with patch("sys.stdout", new=StringIO()) as output:
+            line = "all User --after {} --limit 3".format(cursor)
+            self.assertFalse(HBNBCommand().onecmd(line))
+            lines = output.getvalue().strip().split("\n")
+        self.assertEqual(3, len(lines))
+        for obj_id, line in zip(ids[2:], lines):
+            self.assertIn(obj_id, line)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all --limit 6"))
+            self.assertEqual(6, len(output.getvalue().strip().split("\n")))
+
+    def test_all_page_invalid_arguments(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all User --limit"))
+            self.assertEqual("** invalid argument: --limit **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all User 2"))
+            self.assertEqual("** invalid argument: 2 **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all --limit x"))
+            self.assertEqual("** invalid page: --limit x **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            line = "all User --limit 1 --after abc="
+            self.assertFalse(HBNBCommand().onecmd(line))
+            self.assertEqual("** invalid page: --limit 1 --after abc= **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all State --after !!!"))
+            self.assertEqual("** invalid page: --after !!! **",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all MyModel --limit 1"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
 
 class TestHBNBCommand_update(unittest.TestCase):
     """Unittests for testing update from the HBNB command interpreter."""
@@ -1470,6 +1883,21 @@ class TestHBNBCommand_update(unittest.TestCase):
         test_dict = storage.all()["Place.{}".format(testId)].__dict__
         self.assertEqual(98, test_dict["max_guest"])
 
+    def test_update_relationship_read_only(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            testId = output.getvalue().strip()
+        for testCmd in ("update Place {} city sf".format(testId),
+                        "Place.update({}, {{'name': 'a', 'reviews': []}})"
+                        .format(testId)):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(testCmd))
+                self.assertIn("** attribute is read-only: ",
+                              output.getvalue())
+        test_dict = storage.all()["Place.{}".format(testId)].__dict__
+        self.assertNotIn("city", test_dict)
+        self.assertNotIn("name", test_dict)
+
     def test_update_valid_dictionary_with_int_dot_notation(self):
         with patch("sys.stdout", new=StringIO()) as output:
             HBNBCommand().onecmd("create Place")
@@ -1500,6 +1928,21 @@ class TestHBNBCommand_update(unittest.TestCase):
         test_dict = storage.all()["Place.{}".format(testId)].__dict__
         self.assertEqual(9.8, test_dict["latitude"])
 
+    def test_update_keeps_indexes(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create City")
+            testId = output.getvalue().strip()
+        key = "City.{}".format(testId)
+        self.assertIn(key, storage.find("City", state_id=""))
+        testCmd = "update City {} state_id 'abc'".format(testId)
+        self.assertFalse(HBNBCommand().onecmd(testCmd))
+        self.assertNotIn(key, storage.find("City", state_id=""))
+        self.assertIn(key, storage.find("City", state_id="abc"))
+        testCmd = "City.update({}, {{'state_id': 'xyz'}})".format(testId)
+        self.assertFalse(HBNBCommand().onecmd(testCmd))
+        self.assertEqual({}, storage.find("City", state_id="abc"))
+        self.assertIn(key, storage.find("City", state_id="xyz"))
+
 
 class TestHBNBCommand_count(unittest.TestCase):
     """Unittests for testing count method of HBNB comand interpreter."""
@@ -1565,6 +2008,46 @@ class TestHBNBCommand_count(unittest.TestCase):
             self.assertFalse(HBNBCommand().onecmd("Review.count()"))
             self.assertEqual("1", output.getvalue().strip())
 
+    def test_count_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("count"))
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_count_attribute_values(self):
+        for city_id, guests in (("a", 2), ("b", 4), ("a", 4)):
+            pl = Place()
+            pl.city_id = city_id
+            pl.max_guest = guests
+        for line, count in (("count Place city_id=a", "2"),
+                            ("Place.count(city_id=b)", "1"),
+                            ("count Place max_guest=4", "2"),
+                            ("count Place city_id=a max_guest=4", "1"),
+                            ("count Place name=x", "0")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(count, output.getvalue().strip())
+
+    def test_count_undeclared_after_update(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create User"))
+            obj_id = output.getvalue().strip()
+        for line, count in (("update User {} age 12".format(obj_id), ""),
+                            ("update User {} nick 007".format(obj_id), ""),
+                            ("count User age=12", "1"),
+                            ("count User nick=007", "1"),
+                            ("count User nick=7", "0"),
+                            ("stats User nick", "007: 1")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(count, output.getvalue().strip())
+
+    def test_count_invalid_argument(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("count Place max_guest=x"))
+            self.assertEqual("** invalid argument: max_guest=x **",
+                             output.getvalue().strip())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -5,13 +5,14 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_registry
 """
 import os
 import models
 import unittest
 from datetime import datetime
 from time import sleep
-from models.base_model import BaseModel
+from models.base_model import BaseModel, classes
 
 
 class TestBaseModel_instantiation(unittest.TestCase):
@@ -73,6 +74,13 @@ class TestBaseModel_instantiation(unittest.TestCase):
         self.assertEqual(bm.created_at, dt)
         self.assertEqual(bm.updated_at, dt)
 
+    def test_instantiation_with_whole_seconds(self):
+        dt = datetime(2024, 5, 1, 12, 30)
+        bm = BaseModel(id="345", created_at=dt.isoformat(),
+                       updated_at=dt.isoformat())
+        self.assertEqual(bm.created_at, dt)
+        self.assertEqual(bm.updated_at, dt)
+
     def test_instantiation_with_None_kwargs(self):
         with self.assertRaises(TypeError):
             BaseModel(id=None, created_at=None, updated_at=None)
@@ -188,5 +196,27 @@ class TestBaseModel_to_dict(unittest.TestCase):
             bm.to_dict(None)
 
 
+class TestBaseModel_registry(unittest.TestCase):
+    """Unittests for testing the registry of model classes."""
+
+    def tearDown(self):
+        classes.pop("Pet", None)
+
+    def test_base_model_registered(self):
+        self.assertIs(BaseModel, classes["BaseModel"])
+
+    def test_models_registered(self):
+        names = {"BaseModel", "User", "State", "City", "Place", "Amenity",
+                 "Review"}
+        self.assertLessEqual(names, set(classes))
+        for name in names:
+            self.assertEqual(name, classes[name].__name__)
+
+    def test_subclass_registered(self):
+        class Pet(BaseModel):
+            pass
+        self.assertIs(Pet, classes["Pet"])
+
+
 if __name__ == "__main__":
     unittest.main()
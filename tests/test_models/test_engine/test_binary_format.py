@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/binary_format.py.
+
+Unittest classes:
+    TestBinaryFormat_records
+    TestBinaryFormat_conversion
+"""
+import io
+import json
+import os
+import unittest
+from datetime import datetime
+from models.engine.binary_format import (MAGIC, BinaryWriter, iter_records,
+                                         json_to_binary, binary_to_json)
+
+
+class TestBinaryFormat_records(unittest.TestCase):
+    """Unittests for testing BinaryWriter and iter_records."""
+
+    def roundtrip(self, objects):
+        f = io.BytesIO()
+        writer = BinaryWriter(f)
+        for cls_name, attrs in objects:
+            writer.write(cls_name, attrs)
+        f.seek(0)
+        return list(iter_records(f))
+
+    def test_starts_with_magic(self):
+        f = io.BytesIO()
+        BinaryWriter(f)
+        self.assertEqual(MAGIC, f.getvalue())
+
+    def test_empty(self):
+        self.assertEqual([], self.roundtrip([]))
+
+    def test_value_types(self):
+        attrs = {
+            "id": "1234",
+            "created_at": datetime(2017, 9, 28, 21, 3, 54, 52298),
+            "updated_at": datetime(1960, 1, 1),
+            "name": "Zoë",
+            "empty": "",
+            "none": None,
+            "no": False,
+            "yes": True,
+            "rooms": 3,
+            "negative": -(1 << 63),
+            "huge": 1 << 64,
+            "latitude": 37.77,
+            "amenity_ids": ["a", "b"],
+            "extra": {"a": [1, None]},
+        }
+        objects = self.roundtrip([("Place", attrs)])
+        self.assertEqual([("Place", attrs)], objects)
+        for name, value in objects[0][1].items():
+            self.assertIs(type(attrs[name]), type(value))
+
+    def test_attribute_order_kept(self):
+        attrs = {"id": "1", "b": 1, "a": 2}
+        self.assertEqual(["id", "b", "a"],
+                         list(self.roundtrip([("User", attrs)])[0][1]))
+
+    def test_names_written_once(self):
+        f = io.BytesIO()
+        writer = BinaryWriter(f)
+        writer.write("User", {"id": "1", "first_name": "a"})
+        size = len(f.getvalue())
+        writer.write("User", {"id": "2", "first_name": "b"})
+        self.assertEqual(1, f.getvalue().count(b"first_name"))
+        self.assertLess(len(f.getvalue()) - size, size - len(MAGIC))
+
+    def test_several_classes_and_attributes(self):
+        objects = [
+            ("User", {"id": "1", "email": "a@b.c"}),
+            ("State", {"id": "2", "name": "CA"}),
+            ("User", {"id": "3", "first_name": "Betty"}),
+            ("State", {"id": "4"}),
+        ]
+        self.assertEqual(objects, self.roundtrip(objects))
+
+    def test_not_binary_storage(self):
+        with self.assertRaises(ValueError):
+            list(iter_records(io.BytesIO(b"{}")))
+
+    def test_truncated(self):
+        f = io.BytesIO()
+        BinaryWriter(f).write("User", {"id": "1"})
+        with self.assertRaises(ValueError):
+            list(iter_records(io.BytesIO(f.getvalue()[:-1])))
+
+
+class TestBinaryFormat_conversion(unittest.TestCase):
+    """Unittests for testing json_to_binary and binary_to_json."""
+
+    objdict = {
+        "User.1": {"id": "1", "created_at": "2017-09-28T21:03:54.052298",
+                   "updated_at": "2017-09-28T21:05:54.119427",
+                   "first_name": "Betty", "__class__": "User"},
+        "Place.2": {"id": "2", "created_at": "2017-09-28T21:03:54.052298",
+                    "updated_at": "2017-09-28T21:05:54.119427",
+                    "max_guest": 4, "latitude": 1.5, "amenity_ids": ["a"],
+                    "__class__": "Place"},
+    }
+
+    def setUp(self):
+        with open("convert.json", "w") as f:
+            json.dump(self.objdict, f)
+
+    def tearDown(self):
+        for name in ("convert.json", "convert.bin", "converted.json"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+
+    def test_roundtrip_is_identical(self):
+        json_to_binary("convert.json", "convert.bin")
+        binary_to_json("convert.bin", "converted.json")
+        with open("convert.json") as f1, open("converted.json") as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_binary_timestamps(self):
+        json_to_binary("convert.json", "convert.bin")
+        with open("convert.bin", "rb") as f:
+            records = list(iter_records(f))
+        self.assertEqual(datetime(2017, 9, 28, 21, 3, 54, 52298),
+                         records[0][1]["created_at"])
+
+    def test_binary_is_smaller(self):
+        json_to_binary("convert.json", "convert.bin")
+        self.assertLess(os.path.getsize("convert.bin"),
+                        os.path.getsize("convert.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/db_storage.py.
+
+Unittest classes:
+    TestDBStorage_instantiation
+    TestDBStorage_methods
+"""
+import os
+import sqlite3
+import unittest
+import models
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.base_model import BaseModel, classes
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
+
+
+class TestDBStorage_instantiation(unittest.TestCase):
+    """Unittests for testing instantiation of the DBStorage class."""
+
+    def tearDown(self):
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+
+    def test_is_a_storage(self):
+        storage = DBStorage(path="test.db")
+        self.assertIsInstance(storage, FileStorage)
+        storage.close()
+
+    def test_instantiation_with_arg(self):
+        with self.assertRaises(TypeError):
+            DBStorage("test.db")
+
+    def test_creates_tables_and_indexes(self):
+        DBStorage(path="test.db").close()
+        db = sqlite3.connect("test.db")
+        tables = {row[0] for row in db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        db.close()
+        for cls in (BaseModel, User, State, City, Place, Amenity, Review):
+            self.assertIn(cls.__name__, tables)
+        self.assertLessEqual({"City_state_id", "Place_city_id",
+                              "Place_user_id", "Review_place_id",
+                              "Review_user_id"}, indexes)
+
+    def test_adds_missing_columns(self):
+        db = sqlite3.connect("test.db")
+        db.execute('CREATE TABLE "State" (id TEXT PRIMARY KEY, '
+                   'created_at TEXT, updated_at TEXT, extra TEXT)')
+        db.close()
+        DBStorage(path="test.db").close()
+        db = sqlite3.connect("test.db")
+        columns = [row[1] for row in db.execute('PRAGMA table_info("State")')]
+        db.close()
+        self.assertIn("name", columns)
+
+
+class TestDBStorage_methods(unittest.TestCase):
+    """Unittests for testing methods of the DBStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.saved = models.storage
+        models.storage = self.storage = DBStorage(path="test.db")
+
+    def tearDown(self):
+        self.storage.close()
+        models.storage = self.saved
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+
+    def rows(self, table):
+        db = sqlite3.connect("test.db")
+        rows = db.execute('SELECT * FROM "{}"'.format(table)).fetchall()
+        db.close()
+        return rows
+
+    def reload(self):
+        self.storage.close()
+        FileStorage._FileStorage__objects = {}
+        models.storage = self.storage = DBStorage(path="test.db")
+        self.storage.reload()
+        return self.storage.all()
+
+    def test_save_and_reload(self):
+        us = User()
+        us.email = "betty@holberton.io"
+        pl = Place()
+        pl.user_id = us.id
+        pl.max_guest = 4
+        pl.latitude = 37.7
+        pl.amenity_ids = ["a", "b"]
+        bm = BaseModel()
+        self.storage.save()
+        objs = self.reload()
+        self.assertEqual(3, len(objs))
+        for obj in (us, pl, bm):
+            key = "{}.{}".format(obj.__class__.__name__, obj.id)
+            self.assertEqual(type(obj), type(objs[key]))
+            self.assertEqual(obj.to_dict(), objs[key].to_dict())
+
+    def test_unset_attributes_stay_unset(self):
+        pl = Place()
+        self.storage.save()
+        pl2 = self.reload()["Place." + pl.id]
+        self.assertNotIn("max_guest", pl2.__dict__)
+        self.assertEqual(0, pl2.max_guest)
+
+    def test_extra_attributes(self):
+        st = State()
+        st.name = None
+        st.capital = "Sacramento"
+        st.population = 39
+        self.storage.save()
+        st2 = self.reload()["State." + st.id]
+        self.assertIsNone(st2.name)
+        self.assertEqual("Sacramento", st2.capital)
+        self.assertEqual(39, st2.population)
+
+    def test_save_writes_only_changes(self):
+        us = User()
+        self.storage.save()
+        db = sqlite3.connect("test.db")
+        db.execute('UPDATE "User" SET first_name = ?', ("Outside",))
+        db.commit()
+        db.close()
+        st = State()
+        self.storage.save()
+        self.assertEqual("Outside", self.rows("User")[0][6])
+        us.first_name = "Betty"
+        self.storage.save()
+        self.assertEqual("Betty", self.rows("User")[0][6])
+
+    def test_update(self):
+        us = User()
+        self.storage.save()
+        us.first_name = "Betty"
+        us.save()
+        self.assertEqual(1, len(self.rows("User")))
+        self.assertEqual("Betty", self.reload()["User." + us.id].first_name)
+
+    def test_delete(self):
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.storage.save()
+        self.assertEqual([], self.rows("User"))
+        self.assertEqual({}, self.reload())
+
+    def test_failed_save_keeps_changes(self):
+        us = User()
+        st = State()
+        st.capital = object()
+        with self.assertRaises(TypeError):
+            self.storage.save()
+        self.assertEqual([], self.rows("User"))
+        st.capital = "Sacramento"
+        self.storage.save()
+        self.assertEqual(1, len(self.rows("User")))
+        self.assertEqual(1, len(self.rows("State")))
+
+    def test_class_defined_after_storage(self):
+        class Pet(BaseModel):
+            name = ""
+        try:
+            pt = Pet()
+            pt.name = "Rex"
+            self.storage.save()
+            self.assertEqual(1, len(self.rows("Pet")))
+            pt = self.reload()["Pet." + pt.id]
+            self.assertEqual("Rex", pt.name)
+            self.storage.delete(pt)
+            self.storage.save()
+            self.assertEqual([], self.rows("Pet"))
+        finally:
+            del classes["Pet"]
+
+    def test_compact(self):
+        for i in range(200):
+            us = User()
+            us.first_name = "Betty" * 100
+        self.storage.save()
+        for obj in list(self.storage.all().values()):
+            self.storage.delete(obj)
+        self.storage.save()
+        seconds, reclaimed = self.storage.compact()
+        self.assertGreater(reclaimed, 0)
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_reloaded_objects_searchable(self):
+        cy = City()
+        cy.state_id = "abc"
+        self.storage.save()
+        self.reload()
+        self.assertEqual(["City." + cy.id],
+                         list(self.storage.find(City, state_id="abc")))
+        self.assertEqual(1, self.storage.count(City))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,41 @@
 Unittest classes:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_change_tracking
+    TestFileStorage_find
+    TestFileStorage_count
+    TestFileStorage_group
+    TestFileStorage_cascade
+    TestFileStorage_page
+    TestFileStorage_between
+    TestFileStorage_spatial
+    TestFileStorage_text
+    TestFileStorage_lazy
+    TestFileStorage_binary
+    TestFileStorage_sharded
+    TestFileStorage_atomic
+    TestFileStorage_write_behind
+    TestFileStorage_shared
+    TestFileStorage_bounded
 """
 import os
+import sys
+import glob
 import json
+import fcntl
+import shutil
+import subprocess
+import threading
+import time
 import models
 import unittest
 from datetime import datetime
-from models.base_model import BaseModel
+from unittest.mock import patch
+from models.base_model import BaseModel, classes
 from models.engine.file_storage import FileStorage
+from models.engine.fulltext import TextIndex, tokenize
+from models.engine.lazy import BoundedLazyDict, LazyDict, Unloaded
 from models.user import User
 from models.state import State
 from models.place import Place
@@ -65,9 +92,46 @@ class TestFileStorage_methods(unittest.TestCase):
     def test_all(self):
         self.assertEqual(dict, type(models.storage.all()))
 
-    def test_all_with_arg(self):
+    def test_all_with_args(self):
         with self.assertRaises(TypeError):
-            models.storage.all(None)
+            models.storage.all(None, None)
+
+    def test_all_with_cls(self):
+        FileStorage._FileStorage__objects = {}
+        us = User()
+        st = State()
+        self.assertEqual({"User." + us.id: us}, models.storage.all(User))
+        self.assertEqual({"State." + st.id: st}, models.storage.all("State"))
+        self.assertEqual({}, models.storage.all(City))
+
+    def test_all_with_cls_returns_copy(self):
+        us = User()
+        models.storage.all(User).clear()
+        self.assertIn("User." + us.id, models.storage.all(User))
+
+    def test_count(self):
+        FileStorage._FileStorage__objects = {}
+        User()
+        User()
+        State()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(0, models.storage.count("MyModel"))
+
+    def test_count_after_delete(self):
+        FileStorage._FileStorage__objects = {}
+        us = User()
+        models.storage.delete(us)
+        self.assertEqual(0, models.storage.count(User))
+        self.assertEqual({}, models.storage.all(User))
+
+    def test_partitions_follow_replaced_objects(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(User))
+        us = User()
+        self.assertEqual({"User." + us.id: us}, models.storage.all(User))
 
     def test_new(self):
         bm = BaseModel()
@@ -160,10 +224,1848 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Amenity." + am.id, objs)
         self.assertIn("Review." + rv.id, objs)
 
+    def test_reload_new_model_class(self):
+        class Pet(BaseModel):
+            pass
+        try:
+            pet = Pet()
+            models.storage.save()
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            objs = FileStorage._FileStorage__objects
+            self.assertIs(Pet, type(objs["Pet." + pet.id]))
+        finally:
+            del classes["Pet"]
+
+    def test_reload_hand_written_file(self):
+        us = User()
+        us.first_name = "Zoë"
+        objdict = {"User." + us.id: us.to_dict()}
+        with open("file.json", "w", encoding="utf-8") as f:
+            json.dump(objdict, f, indent=4, ensure_ascii=False)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = FileStorage._FileStorage__objects
+        self.assertEqual("Zoë", objs["User." + us.id].first_name)
+        self.assertEqual(us.created_at, objs["User." + us.id].created_at)
+
     def test_reload_with_arg(self):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
 
+class TestFileStorage_journal(unittest.TestCase):
+    """Unittests for testing the journal mode of the FileStorage class."""
+
+    def setUp(self):
+        for name in ("file.json", "file.json.journal"):
+            try:
+                os.rename(name, name + ".bak")
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(journal=True)
+
+    def tearDown(self):
+        for name in ("file.json", "file.json.journal"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename(name + ".bak", name)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def read_journal(self):
+        with open("file.json.journal", "r") as f:
+            return [json.loads(line) for line in f]
+
+    def test_save_appends_only_changes(self):
+        us = User()
+        st = State()
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertEqual(2, len(self.read_journal()))
+        self.storage.touch(us)
+        self.storage.save()
+        records = self.read_journal()
+        self.assertEqual(3, len(records))
+        self.assertEqual("User." + us.id, records[-1]["key"])
+
+    def test_save_without_changes_appends_nothing(self):
+        User()
+        self.storage.save()
+        self.storage.save()
+        self.assertEqual(1, len(self.read_journal()))
+
+    def test_delete_appends_tombstone(self):
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.assertNotIn("User." + us.id, self.storage.all())
+        self.storage.save()
+        self.assertEqual({"key": "User." + us.id, "value": None},
+                         self.read_journal()[-1])
+
+    def test_delete_none(self):
+        self.storage.delete(None)
+        self.storage.delete()
+
+    def test_compact(self):
+        us = User()
+        cy = City()
+        self.storage.save()
+        for i in range(10):
+            us.first_name = "Betty {}".format(i)
+            self.storage.save()
+        self.storage.delete(cy)
+        self.storage.save()
+        journal = os.path.getsize("file.json.journal")
+        seconds, reclaimed = self.storage.compact()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json") as f:
+            self.assertEqual({"User." + us.id: us.to_dict()}, json.load(f))
+        self.assertEqual(journal - os.path.getsize("file.json"), reclaimed)
+        self.assertGreater(reclaimed, 0)
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_compact_includes_unsaved_changes(self):
+        us = User()
+        self.storage.compact()
+        self.assertEqual({}, FileStorage._FileStorage__changes)
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("User." + us.id, self.storage.all())
+
+    def test_compact_ratio(self):
+        storage = FileStorage(journal=True, compact_ratio=2)
+        us = User()
+        with patch.object(FileStorage, "_FileStorage__compact_min_size", 0):
+            storage.save()
+            compactor = storage._FileStorage__compactor
+            compactor.join()
+            self.assertFalse(os.path.exists("file.json.journal"))
+            us.first_name = "Betty"
+            storage.save()
+            self.assertIs(compactor, storage._FileStorage__compactor)
+            for i in range(2):
+                us.first_name = "Betty {}".format(i)
+                storage.save()
+                if compactor is not storage._FileStorage__compactor:
+                    break
+            self.assertIsNot(compactor, storage._FileStorage__compactor)
+            storage._FileStorage__compactor.join()
+            self.assertFalse(os.path.exists("file.json.journal"))
+
+    def test_compact_ratio_minimum_size(self):
+        storage = FileStorage(journal=True, compact_ratio=2)
+        User()
+        storage.save()
+        self.assertIsNone(storage._FileStorage__compactor)
+
+    def test_reads_during_compact(self):
+        pl = Place()
+        pl.city_id = "sf"
+        pl.max_guest = 4
+        pl.latitude = 37.7
+        pl.longitude = -122.4
+        pl.name = "Loft"
+        started = threading.Event()
+        release = threading.Event()
+
+        def write(*args):
+            started.set()
+            release.wait(10)
+
+        def read():
+            found.append(self.storage.group(Place, "city_id", ["sf"]))
+            found.append(self.storage.page(Place))
+            found.append(self.storage.between(Place, "max_guest", 4))
+            found.append(self.storage.near(Place, 37.7, -122.4, 1))
+            found.append(self.storage.search(Place, "loft"))
+
+        found = []
+        with patch.object(FileStorage, "_FileStorage__write_json",
+                          side_effect=write):
+            compactor = threading.Thread(target=self.storage.compact)
+            compactor.start()
+            started.wait(10)
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(10)
+            blocked = reader.is_alive()
+            release.set()
+            compactor.join()
+            reader.join()
+        self.assertFalse(blocked)
+        self.assertEqual(5, len(found))
+
+    def test_reload_replays_snapshot_and_journal(self):
+        us = User()
+        st = State()
+        FileStorage().save()
+        cy = City()
+        self.storage.delete(us)
+        st.name = "California"
+        self.storage.touch(st)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertNotIn("User." + us.id, objs)
+        self.assertIn("City." + cy.id, objs)
+        self.assertEqual("California", objs["State." + st.id].name)
+
+    def test_reload_ignores_truncated_record(self):
+        us = User()
+        self.storage.save()
+        with open("file.json.journal", "a") as f:
+            f.write('{"key": "User.1", "val')
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(["User." + us.id], list(self.storage.all()))
+
+    def test_failed_save_keeps_changes(self):
+        us = User()
+        with patch("builtins.open", side_effect=OSError(28, "No space")):
+            with self.assertRaises(OSError):
+                self.storage.save()
+        self.assertIn("User." + us.id, FileStorage._FileStorage__changes)
+        self.storage.save()
+        self.assertEqual(["User." + us.id],
+                         [record["key"] for record in self.read_journal()])
+
+    def test_save_after_truncated_record(self):
+        us = User()
+        self.storage.save()
+        with open("file.json.journal", "a") as f:
+            f.write('{"key": "User.1", "val')
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        st = State()
+        self.storage.save()
+        cy = City()
+        self.storage.save()
+        self.assertEqual(3, len(self.read_journal()))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual({"User." + us.id, "State." + st.id, "City." + cy.id},
+                         set(self.storage.all()))
+
+    def test_full_save_removes_journal(self):
+        us = User()
+        self.storage.save()
+        FileStorage().save()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("User." + us.id, self.storage.all())
+
+
+class TestFileStorage_change_tracking(unittest.TestCase):
+    """Unittests for testing change tracking and the encoding cache."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes.clear()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_new_marks_changed(self):
+        us = User()
+        self.assertIn("User." + us.id, FileStorage._FileStorage__changes)
+
+    def test_attribute_write_marks_changed(self):
+        us = User()
+        models.storage.save()
+        self.assertEqual({}, FileStorage._FileStorage__changes)
+        us.first_name = "Betty"
+        self.assertIn("User." + us.id, FileStorage._FileStorage__changes)
+
+    def test_model_save_marks_changed(self):
+        us = User()
+        models.storage.save()
+        with patch.object(FileStorage, "save"):
+            us.save()
+        self.assertIn("User." + us.id, FileStorage._FileStorage__changes)
+
+    def test_touch_calls(self):
+        with patch.object(FileStorage, "touch") as touch:
+            us = User()
+            self.assertEqual(0, touch.call_count)
+            with patch.object(FileStorage, "save"):
+                us.save()
+            self.assertEqual(1, touch.call_count)
+            models.storage.save()
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            self.assertIn("User." + us.id, models.storage.all())
+            self.assertEqual(1, touch.call_count)
+
+    def test_unregistered_object_not_tracked(self):
+        us = User(id="1234", created_at=datetime.today().isoformat(),
+                  updated_at=datetime.today().isoformat())
+        us.first_name = "Betty"
+        self.assertNotIn("User.1234", FileStorage._FileStorage__changes)
+
+    def test_save_encodes_only_changed_objects(self):
+        us = User()
+        State()
+        City()
+        models.storage.save()
+        us.first_name = "Betty"
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            models.storage.save()
+        to_dict.assert_called_once_with(us)
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual("Betty", objs["User." + us.id]["first_name"])
+
+    def test_save_output_matches_json_dump(self):
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        pl.amenity_ids = ["a", "b"]
+        models.storage.save()
+        odict = models.storage.all()
+        expected = json.dumps({k: v.to_dict() for k, v in odict.items()})
+        with open("file.json", "r") as f:
+            self.assertEqual(expected, f.read())
+
+    def test_save_without_cache(self):
+        FileStorage._FileStorage__encoded = {}
+        us = User()
+        us.first_name = "Betty"
+        FileStorage(cache=False).save()
+        self.assertEqual({}, FileStorage._FileStorage__encoded)
+        odict = models.storage.all()
+        expected = json.dumps({k: v.to_dict() for k, v in odict.items()})
+        with open("file.json", "r") as f:
+            self.assertEqual(expected, f.read())
+
+    def test_save_drops_deleted_objects(self):
+        us = User()
+        st = State()
+        models.storage.save()
+        models.storage.delete(us)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual(["State." + st.id], list(objs))
+
+
+class TestFileStorage_find(unittest.TestCase):
+    """Unittests for testing the find method of the FileStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_find_by_indexed_attribute(self):
+        cy1 = City()
+        cy1.state_id = "a"
+        cy2 = City()
+        cy2.state_id = "b"
+        self.assertEqual({"City." + cy1.id: cy1},
+                         models.storage.find(City, state_id="a"))
+        self.assertEqual({"City." + cy2.id: cy2},
+                         models.storage.find("City", state_id="b"))
+        self.assertEqual({}, models.storage.find(City, state_id="c"))
+
+    def test_find_by_unindexed_attribute(self):
+        cy = City()
+        cy.name = "San Francisco"
+        City()
+        self.assertEqual({"City." + cy.id: cy},
+                         models.storage.find(City, name="San Francisco"))
+
+    def test_find_by_several_attributes(self):
+        pl1 = Place()
+        pl1.city_id = "a"
+        pl1.user_id = "u"
+        pl2 = Place()
+        pl2.city_id = "a"
+        pl2.user_id = "v"
+        self.assertEqual({"Place." + pl2.id: pl2},
+                         models.storage.find(Place, city_id="a", user_id="v"))
+
+    def test_builds_only_the_indexes_used(self):
+        Place()
+        built = FileStorage._FileStorage__indexes
+        models.storage.find(Place, city_id="a")
+        self.assertEqual(["city_id"], list(built["Place"]))
+        models.storage.count(Place, user_id="u")
+        self.assertEqual(["city_id", "user_id"], list(built["Place"]))
+        models.storage.between(Place, "max_guest", 1)
+        models.storage.near(Place, 0, 0, 1)
+        models.storage.search(Place, "loft")
+        self.assertEqual(["city_id", "user_id", ("__ranges__", "max_guest"),
+                          ("latitude", "longitude"), ("name", "description")],
+                         list(built["Place"]))
+
+    def test_find_class_default(self):
+        cy = City()
+        self.assertEqual({"City." + cy.id: cy},
+                         models.storage.find(City, state_id=""))
+
+    def test_find_follows_updates(self):
+        rv = Review()
+        rv.place_id = "a"
+        self.assertIn("Review." + rv.id,
+                      models.storage.find(Review, place_id="a"))
+        rv.place_id = "b"
+        self.assertEqual({}, models.storage.find(Review, place_id="a"))
+        self.assertIn("Review." + rv.id,
+                      models.storage.find(Review, place_id="b"))
+
+    def test_find_follows_dict_writes_with_touch(self):
+        rv = Review()
+        models.storage.find(Review, place_id="a")
+        rv.__dict__["place_id"] = "a"
+        models.storage.touch(rv)
+        self.assertIn("Review." + rv.id,
+                      models.storage.find(Review, place_id="a"))
+
+    def test_find_follows_new_and_delete(self):
+        models.storage.find(City, state_id="a")
+        cy = City()
+        cy.state_id = "a"
+        self.assertIn("City." + cy.id, models.storage.find(City, state_id="a"))
+        models.storage.delete(cy)
+        self.assertEqual({}, models.storage.find(City, state_id="a"))
+
+    def test_find_unhashable_value(self):
+        pl = Place()
+        pl.city_id = ["a"]
+        self.assertEqual({"Place." + pl.id: pl},
+                         models.storage.find(Place, city_id=["a"]))
+
+    def test_find_after_objects_replaced(self):
+        cy = City()
+        cy.state_id = "a"
+        models.storage.find(City, state_id="a")
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({}, models.storage.find(City, state_id="a"))
+
+
+class TestFileStorage_count(unittest.TestCase):
+    """Unittests for testing the count and counts methods of the
+    FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for city_id, name in (("a", "x"), ("b", "y"), ("a", "y")):
+            pl = Place()
+            pl.city_id = city_id
+            pl.name = name
+            self.places.append(pl)
+        City()
+
+    def tearDown(self):
+        for path in ("file.json", "file.json.Place.text"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_count_classes(self):
+        self.assertEqual(4, models.storage.count())
+        self.assertEqual(3, models.storage.count(Place))
+        self.assertEqual(1, models.storage.count("City"))
+        self.assertEqual(0, models.storage.count(User))
+
+    def test_count_follows_new_delete_and_reload(self):
+        Place()
+        self.assertEqual(4, models.storage.count(Place))
+        models.storage.delete(self.places[0])
+        self.assertEqual(3, models.storage.count(Place))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(Place))
+        models.storage.reload()
+        self.assertEqual(3, models.storage.count(Place))
+
+    def test_count_indexed_value(self):
+        storage = models.storage
+        with patch.object(storage, "find", wraps=storage.find) as find:
+            self.assertEqual(2, storage.count(Place, city_id="a"))
+            self.assertEqual(0, storage.count("Place", city_id="c"))
+            find.assert_not_called()
+        self.places[1].city_id = "a"
+        self.assertEqual(3, storage.count(Place, city_id="a"))
+        self.assertEqual(0, storage.count(Place, city_id=["a"]))
+
+    def test_count_unindexed_values(self):
+        self.assertEqual(2, models.storage.count(Place, name="y"))
+        self.assertEqual(1, models.storage.count(Place, city_id="a",
+                                                 name="y"))
+
+    def test_counts_classes(self):
+        counts = models.storage.counts()
+        self.assertEqual(sorted(classes), list(counts))
+        self.assertEqual(3, counts["Place"])
+        self.assertEqual(1, counts["City"])
+        self.assertEqual(0, counts["User"])
+
+    def test_counts_values(self):
+        self.assertEqual({"a": 2, "b": 1},
+                         models.storage.counts(Place, "city_id"))
+        self.assertEqual({"x": 1, "y": 2},
+                         models.storage.counts("Place", "name"))
+        self.places[0].name = ["x"]
+        self.assertEqual({"y": 2}, models.storage.counts(Place, "name"))
+
+
+class TestFileStorage_group(unittest.TestCase):
+    """Unittests for testing the get and group methods of the FileStorage
+    class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.cities = []
+        for state_id, name in (("a", "x"), ("b", "y"), ("a", "y")):
+            cy = City()
+            cy.state_id = state_id
+            cy.name = name
+            self.cities.append(cy)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_get(self):
+        cy = self.cities[0]
+        self.assertIs(cy, models.storage.get(City, cy.id))
+        self.assertIs(cy, models.storage.get("City", cy.id))
+        self.assertIsNone(models.storage.get(Place, cy.id))
+        self.assertIsNone(models.storage.get(City, "nothing"))
+
+    def test_group_indexed(self):
+        c1, c2, c3 = self.cities
+        self.assertEqual({"a": [c1, c3], "c": []},
+                         models.storage.group(City, "state_id", ["a", "c"]))
+        c2.state_id = "a"
+        self.assertEqual({"a": [c1, c3, c2]},
+                         models.storage.group("City", "state_id", ["a"]))
+
+    def test_group_unindexed(self):
+        c1, c2, c3 = self.cities
+        c1.name = ["x"]
+        self.assertEqual({"y": [c2, c3], "x": []},
+                         models.storage.group(City, "name", ("y", "x")))
+
+    def test_group_unhashable(self):
+        with self.assertRaises(TypeError):
+            models.storage.group(City, "name", [["x"]])
+
+
+class TestFileStorage_cascade(unittest.TestCase):
+    """Unittests for testing the delete method of the FileStorage class
+    with cascade."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.st = State()
+        self.cy = City()
+        self.cy.state_id = self.st.id
+        self.us = User()
+        self.places = []
+        for i in range(100):
+            pl = Place()
+            pl.city_id = self.cy.id
+            pl.user_id = self.us.id if i % 2 else ""
+            pl.price_by_night = i
+            self.places.append(pl)
+        self.rv = Review()
+        self.rv.place_id = self.places[0].id
+        self.other = Place()
+        self.other.price_by_night = 50
+
+    def tearDown(self):
+        for path in ("file.json", "file.json.Place.text",
+                     "file.json.Review.text"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_delete_without_cascade(self):
+        self.assertEqual([self.st], models.storage.delete(self.st))
+        self.assertEqual(1, models.storage.count(City))
+
+    def test_delete_cascade(self):
+        deleted = models.storage.delete(self.st, cascade=True)
+        self.assertEqual([self.st, self.cy] + self.places + [self.rv],
+                         deleted)
+        self.assertEqual(0, models.storage.count(State))
+        self.assertEqual(0, models.storage.count(City))
+        self.assertEqual(0, models.storage.count(Review))
+        self.assertEqual([self.other], list(models.storage.all(Place)
+                                            .values()))
+        self.assertEqual(1, models.storage.count(User))
+
+    def test_delete_cascade_user(self):
+        self.rv.user_id = self.us.id
+        deleted = models.storage.delete(self.us, cascade=True)
+        self.assertEqual(1 + 50 + 1, len(deleted))
+        self.assertEqual(51, models.storage.count(Place))
+        self.assertEqual(0, models.storage.count(Review))
+
+    def test_delete_cascade_keeps_indexes(self):
+        self.assertEqual(101, len(models.storage.between(
+            Place, "price_by_night")))
+        self.assertEqual(100, models.storage.count(Place,
+                                                   city_id=self.cy.id))
+        models.storage.delete(self.cy, cascade=True)
+        self.assertEqual([self.other], models.storage.between(
+            Place, "price_by_night"))
+        self.assertEqual(0, models.storage.count(Place,
+                                                 city_id=self.cy.id))
+        self.assertEqual([], self.st.cities)
+
+    def test_delete_cascade_single_save(self):
+        models.storage.save()
+        models.storage.delete(self.st, cascade=True)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual({"User." + self.us.id, "Place." + self.other.id},
+                         set(models.storage.all()))
+
+    def test_delete_cascade_not_stored(self):
+        st = State(**self.st.to_dict())
+        self.assertEqual([], models.storage.delete(st, cascade=True))
+        self.assertEqual(1, models.storage.count(City))
+        self.assertEqual([], models.storage.delete(None, cascade=True))
+
+
+class TestFileStorage_page(unittest.TestCase):
+    """Unittests for testing the page method of the FileStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.users = sorted((User() for i in range(5)), key=lambda u: u.id)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_pages_in_key_order(self):
+        State()
+        objects, cursor = models.storage.page(User, limit=2)
+        self.assertEqual(["User." + us.id for us in self.users[:2]],
+                         list(objects))
+        self.assertEqual(self.users[:2], list(objects.values()))
+        objects, cursor = models.storage.page("User", 2, cursor)
+        self.assertEqual(self.users[2:4], list(objects.values()))
+        objects, cursor = models.storage.page(User, 2, cursor)
+        self.assertEqual(self.users[4:], list(objects.values()))
+        self.assertIsNone(cursor)
+
+    def test_page_of_every_class(self):
+        st = State()
+        objects, cursor = models.storage.page(limit=6)
+        self.assertEqual([st] + self.users, list(objects.values()))
+        self.assertIsNone(cursor)
+        objects, cursor = models.storage.page(limit=5)
+        self.assertEqual([st] + self.users[:4], list(objects.values()))
+        self.assertIsNotNone(cursor)
+
+    def test_cursor_is_opaque_string(self):
+        cursor = models.storage.page(User, limit=1)[1]
+        self.assertIsInstance(cursor, str)
+        self.assertNotIn(self.users[0].id, cursor)
+
+    def test_pages_stable_across_changes(self):
+        objects, cursor = models.storage.page(User, limit=2)
+        models.storage.delete(self.users[1])
+        models.storage.delete(self.users[2])
+        objects, cursor = models.storage.page(User, limit=2, after=cursor)
+        self.assertEqual(self.users[3:], list(objects.values()))
+
+    def test_empty(self):
+        self.assertEqual(({}, None), models.storage.page(City))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            models.storage.page(User, limit=0)
+        with self.assertRaises(ValueError):
+            models.storage.page(User, after="abc=")
+
+    def test_garbled_cursor(self):
+        cursor = models.storage.page(User, limit=1)[1]
+        for garbled in ("!!!", "VXNlci4x!", cursor + "!", cursor + "\n",
+                        cursor.rstrip("=") + "A=", "é"):
+            with self.assertRaises(ValueError):
+                models.storage.page(User, after=garbled)
+
+    def test_lazy_loads_page_only(self):
+        models.storage.save()
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        objects, cursor = storage.page(User, limit=2)
+        self.assertEqual([us.id for us in self.users[:2]],
+                         [us.id for us in objects.values()])
+        loaded = [key for key, obj in
+                  dict.items(FileStorage._FileStorage__objects)
+                  if not isinstance(obj, Unloaded)]
+        self.assertEqual(sorted(objects), sorted(loaded))
+        os.remove("file.json")
+
+
+class TestFileStorage_between(unittest.TestCase):
+    """Unittests for testing the between method of the FileStorage
+    class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for i, price in enumerate((120, 50, 80, None)):
+            pl = Place(id=str(i))
+            models.storage.new(pl)
+            pl.price_by_night = price
+            self.places.append(pl)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_between(self):
+        p0, p1, p2, p3 = self.places
+        self.assertEqual([p1, p2, p0],
+                         models.storage.between(Place, "price_by_night"))
+        self.assertEqual([p2, p0], models.storage.between(
+            "Place", "price_by_night", 60, 120))
+        self.assertEqual([p2], models.storage.between(
+            Place, "price_by_night", 60, 120, include_high=False))
+        self.assertEqual([p0, p2], models.storage.between(
+            Place, "price_by_night", low=50, include_low=False,
+            reverse=True))
+        self.assertEqual([p1], models.storage.between(
+            Place, "price_by_night", limit=1))
+
+    def test_class_default_value(self):
+        pl = Place()
+        self.assertIn(pl, models.storage.between(Place, "max_guest",
+                                                 high=0))
+
+    def test_follows_new_update_and_delete(self):
+        p0, p1, p2, p3 = self.places
+        models.storage.between(Place, "price_by_night")
+        pl = Place(id="4")
+        models.storage.new(pl)
+        p3.price_by_night = 60
+        pl.price_by_night = 10
+        self.assertEqual([pl, p1, p3, p2, p0], models.storage.between(
+            Place, "price_by_night"))
+        p3.__dict__["price_by_night"] = 300
+        models.storage.touch(p3)
+        models.storage.delete(pl)
+        self.assertEqual([p1, p2, p0, p3], models.storage.between(
+            Place, "price_by_night"))
+
+    def test_not_ranged(self):
+        with self.assertRaises(ValueError):
+            models.storage.between(Place, "name")
+        with self.assertRaises(ValueError):
+            models.storage.between("City", "price_by_night")
+
+    def test_invalid_bound(self):
+        with self.assertRaises(TypeError):
+            models.storage.between(Place, "price_by_night", "50")
+
+
+class TestFileStorage_spatial(unittest.TestCase):
+    """Unittests for testing the near and nearest methods of the
+    FileStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = {}
+        for name, lat, lon in (("sf", 37.7749, -122.4194),
+                               ("oak", 37.8044, -122.2712),
+                               ("la", 34.0522, -118.2437)):
+            pl = Place()
+            pl.latitude = lat
+            pl.longitude = lon
+            self.places[name] = pl
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_near(self):
+        found = models.storage.near(Place, 37.7749, -122.4194, 20)
+        self.assertEqual([self.places["sf"], self.places["oak"]],
+                         [obj for obj, km in found])
+        self.assertAlmostEqual(13.43, found[1][1], 1)
+        self.assertEqual(found, models.storage.near("Place", 37.7749,
+                                                    -122.4194, 20))
+
+    def test_nearest(self):
+        found = models.storage.nearest(Place, 35, -119, 2)
+        self.assertEqual([self.places["la"], self.places["oak"]],
+                         [obj for obj, km in found])
+
+    def test_follows_new_update_and_delete(self):
+        models.storage.near(Place, 0, 0, 10)
+        pl = Place()
+        pl.latitude = 0.01
+        pl.longitude = 0.01
+        self.assertEqual([pl], [obj for obj, km in
+                                models.storage.near(Place, 0, 0, 10)])
+        pl.latitude = 10.0
+        self.assertEqual([], models.storage.near(Place, 0, 0, 10))
+        pl.__dict__["latitude"] = 0.0
+        models.storage.touch(pl)
+        self.assertEqual([pl], [obj for obj, km in
+                                models.storage.near(Place, 0, 0, 10)])
+        models.storage.delete(pl)
+        self.assertEqual([], models.storage.near(Place, 0, 0, 10))
+
+    def test_class_default_location(self):
+        pl = Place()
+        self.assertEqual([], models.storage.near(Place, 0, 0, 1))
+        pl.latitude = 0.0
+        self.assertEqual([], models.storage.near(Place, 0, 0, 1))
+        pl.longitude = 0.0
+        self.assertEqual([(pl, 0.0)], models.storage.near(Place, 0, 0, 1))
+
+    def test_class_without_location(self):
+        with self.assertRaises(ValueError):
+            models.storage.near(City, 0, 0, 10)
+        with self.assertRaises(ValueError):
+            models.storage.nearest("User", 0, 0, 1)
+
+    def test_invalid_point(self):
+        with self.assertRaises(ValueError):
+            models.storage.near(Place, 0, 200, 10)
+
+    def test_lazy(self):
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        found = storage.nearest(Place, 37.8, -122.3, 1)
+        self.assertEqual(self.places["oak"].id, found[0][0].id)
+        os.remove("file.json")
+
+
+class TestFileStorage_text(unittest.TestCase):
+    """Unittests for testing the search method of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "file.json.bak")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.reviews = []
+        for text in ("Great view of the ocean", "The ocean was cold",
+                     "Nothing to say"):
+            rv = Review()
+            rv.text = text
+            self.reviews.append(rv)
+
+    def tearDown(self):
+        for path in ("file.json", "file.json.Review.text",
+                     "file.json.Place.text"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("file.json.bak", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_search(self):
+        found = models.storage.search(Review, "ocean view")
+        self.assertEqual(self.reviews[:2], [obj for obj, score in found])
+        self.assertGreater(found[0][1], found[1][1])
+        self.assertEqual(found, models.storage.search("Review",
+                                                      "ocean view"))
+        self.assertEqual(found[:1],
+                         models.storage.search(Review, "ocean view", 1))
+
+    def test_search_phrase(self):
+        self.assertEqual([self.reviews[1]], [obj for obj, score in
+                                             models.storage.search(
+                                                 Review, '"ocean was"')])
+
+    def test_search_place(self):
+        pl = Place()
+        pl.name = "Loft"
+        pl.description = "By the ocean"
+        self.assertEqual([pl], [obj for obj, score in
+                                models.storage.search(Place, "ocean")])
+
+    def test_follows_new_update_and_delete(self):
+        models.storage.search(Review, "ocean")
+        rv = Review()
+        rv.text = "Ocean breeze"
+        self.assertIn(rv, [obj for obj, score in
+                           models.storage.search(Review, "breeze")])
+        rv.text = "Mountain air"
+        self.assertEqual([], models.storage.search(Review, "breeze"))
+        rv.__dict__["text"] = "Sea breeze"
+        models.storage.touch(rv)
+        self.assertIn(rv, [obj for obj, score in
+                           models.storage.search(Review, "breeze")])
+        models.storage.delete(rv)
+        self.assertEqual([], models.storage.search(Review, "breeze"))
+
+    def test_class_without_text(self):
+        with self.assertRaises(ValueError):
+            models.storage.search(User, "Betty")
+
+    def test_save_leaves_index(self):
+        models.storage.search(Review, "ocean")
+        models.storage.save()
+        self.assertFalse(os.path.exists("file.json.Review.text"))
+
+    def test_compact_writes_index(self):
+        models.storage.compact()
+        self.assertFalse(os.path.exists("file.json.Review.text"))
+        models.storage.search(Review, "ocean")
+        models.storage.compact()
+        with open("file.json.Review.text") as f:
+            state = json.load(f)
+        self.assertEqual(["text"], state["attrs"])
+        self.assertIn("Review." + self.reviews[0].id,
+                      json.loads(state["postings"]["ocean"]))
+        mtime = os.stat("file.json.Review.text").st_mtime_ns
+        self.reviews[2].text = "Nothing to say"
+        models.storage.compact()
+        self.assertEqual(mtime, os.stat("file.json.Review.text").st_mtime_ns)
+        self.assertFalse(os.path.exists("file.json.Review.text.tmp"))
+
+    def test_compact_while_building_index(self):
+        pl = Place()
+        pl.name = "Loft"
+        models.storage.search(Place, "loft")
+        pl.name = "Ocean loft"
+        to_dict = TextIndex.to_dict
+
+        def build(index):
+            models.storage.find(Place, city_id="sf")
+            models.storage.find(Review, place_id=pl.id)
+            return to_dict(index)
+
+        with patch.object(TextIndex, "to_dict", autospec=True,
+                          side_effect=build):
+            models.storage.compact()
+        with open("file.json.Place.text") as f:
+            self.assertIn("ocean", json.load(f)["postings"])
+
+    def test_exit_writes_index(self):
+        FileStorage._FileStorage__text_at_exit = False
+        with patch("atexit.register") as register:
+            models.storage.search(Review, "ocean")
+            models.storage.search(Place, "ocean")
+        register.assert_called_once()
+        register.call_args[0][0]()
+        self.assertTrue(os.path.exists("file.json.Review.text"))
+        self.assertFalse(os.path.exists("file.json.Place.text"))
+        os.remove("file.json.Review.text")
+        self.reviews[2].text = "Ocean view"
+        FileStorage._FileStorage__objects = {}
+        register.call_args[0][0]()
+        self.assertFalse(os.path.exists("file.json.Review.text"))
+
+    def test_reload_reads_saved_index(self):
+        models.storage.search(Review, "ocean")
+        models.storage.compact()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch("models.engine.fulltext.tokenize",
+                   wraps=tokenize) as mock:
+            found = models.storage.search(Review, "ocean")
+            mock.assert_called_once_with("ocean")
+        self.assertEqual({"Review." + rv.id for rv in self.reviews[:2]},
+                         {"Review." + obj.id for obj, score in found})
+
+    def test_saved_index_brought_up_to_date(self):
+        models.storage.search(Review, "ocean")
+        models.storage.compact()
+        FileStorage._FileStorage__indexes = {}
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        objs["Review." + self.reviews[1].id].text = "Cold water"
+        models.storage.delete(objs["Review." + self.reviews[0].id])
+        rv = Review()
+        rv.text = "Ocean sunset"
+        found = models.storage.search(Review, "ocean")
+        self.assertEqual([rv.id], [obj.id for obj, score in found])
+
+    def test_saved_index_of_other_attributes_ignored(self):
+        with open("file.json.Review.text", "w") as f:
+            json.dump({"attrs": ["title"], "postings": {"ocean": {
+                "Review.1": [0]}}, "lengths": {"Review.1": 1},
+                "values": {"Review.1": ["ocean"]}}, f)
+        found = models.storage.search(Review, "ocean")
+        self.assertEqual([self.reviews[1], self.reviews[0]],
+                         [obj for obj, score in found])
+
+    def test_corrupt_saved_index_ignored(self):
+        with open("file.json.Review.text", "w") as f:
+            f.write("{")
+        found = models.storage.search(Review, "ocean")
+        self.assertEqual([self.reviews[1], self.reviews[0]],
+                         [obj for obj, score in found])
+
+
+class TestFileStorage_lazy(unittest.TestCase):
+    """Unittests for testing the lazy reload mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.us = User()
+        self.us.first_name = "Betty"
+        self.st = State()
+        self.cy = City()
+        self.cy.state_id = self.st.id
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.saved = f.read()
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(lazy=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        for name in ("file.json", "file.json.offsets"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def unloaded(self):
+        odict = FileStorage._FileStorage__objects
+        return [k for k, v in dict.items(odict) if isinstance(v, Unloaded)]
+
+    def test_reload_instantiates_nothing(self):
+        odict = self.storage.all()
+        self.assertIsInstance(odict, LazyDict)
+        self.assertEqual(3, len(odict))
+        self.assertEqual(3, len(self.unloaded()))
+        self.assertIn("User." + self.us.id, odict)
+        self.assertEqual(1, self.storage.count(User))
+
+    def test_access_instantiates_one_object(self):
+        us = self.storage.all()["User." + self.us.id]
+        self.assertEqual(User, type(us))
+        self.assertEqual("Betty", us.first_name)
+        self.assertEqual(self.us.created_at, us.created_at)
+        self.assertIs(us, self.storage.all()["User." + self.us.id])
+        self.assertIs(us, self.storage.all(User)["User." + self.us.id])
+        self.assertEqual(2, len(self.unloaded()))
+
+    def test_all_cls_shares_instances(self):
+        us = self.storage.all(User)["User." + self.us.id]
+        self.assertIs(us, self.storage.all()["User." + self.us.id])
+
+    def test_iteration_instantiates(self):
+        objs = list(self.storage.all().values())
+        self.assertEqual({User, State, City}, {type(o) for o in objs})
+        self.assertEqual([], self.unloaded())
+
+    def test_find(self):
+        cities = self.storage.find(City, state_id=self.st.id)
+        self.assertEqual(["City." + self.cy.id], list(cities))
+
+    def test_save_copies_unloaded_objects(self):
+        self.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(self.saved, f.read())
+        self.assertEqual(3, len(self.unloaded()))
+        self.assertFalse(os.path.exists("file.json.tmp"))
+
+    def test_save_after_update(self):
+        us = self.storage.all()["User." + self.us.id]
+        us.first_name = "Holberton"
+        self.storage.save()
+        self.assertEqual(2, len(self.unloaded()))
+        st = self.storage.all()["State." + self.st.id]
+        self.assertEqual(self.st.created_at, st.created_at)
+        with open("file.json", "r") as f:
+            objs = json.load(f)
+        self.assertEqual("Holberton", objs["User." + self.us.id]["first_name"])
+        self.assertEqual(3, len(objs))
+
+    def test_delete(self):
+        self.storage.delete(self.storage.all()["City." + self.cy.id])
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertNotIn("City." + self.cy.id, self.storage.all())
+        self.assertEqual(2, len(self.storage.all()))
+
+    def test_reload_reads_saved_offsets(self):
+        self.storage.all()["User." + self.us.id].first_name = "Holberton"
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.json.offsets"))
+        FileStorage._FileStorage__objects = {}
+        with patch("models.engine.file_storage.iter_members") as members:
+            self.storage.reload()
+            members.assert_not_called()
+        self.assertEqual(3, len(self.unloaded()))
+        objs = self.storage.all()
+        self.assertEqual("Holberton", objs["User." + self.us.id].first_name)
+        self.assertEqual(self.cy.state_id,
+                         objs["City." + self.cy.id].state_id)
+
+    def test_stale_offsets_ignored(self):
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage().reload()
+        User()
+        FileStorage().save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(4, len(self.storage.all()))
+        self.assertEqual("Betty",
+                         self.storage.all()["User." + self.us.id].first_name)
+
+
+class TestFileStorage_binary(unittest.TestCase):
+    """Unittests for testing the binary format of the FileStorage class."""
+
+    def setUp(self):
+        for name in ("file.json", "file.bin"):
+            try:
+                os.rename(name, name + ".bak")
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage(binary=True)
+
+    def tearDown(self):
+        for name in ("file.json", "file.bin"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename(name + ".bak", name)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_lazy_binary(self):
+        with self.assertRaises(ValueError):
+            FileStorage(lazy=True, binary=True)
+
+    def test_save_writes_binary_file(self):
+        User()
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.bin"))
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        pl.amenity_ids = ["a", "b"]
+        pl.max_guest = 4
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertEqual(2, len(objs))
+        us2 = objs["User." + us.id]
+        self.assertEqual(User, type(us2))
+        self.assertEqual(us.to_dict(), us2.to_dict())
+        self.assertEqual(pl.to_dict(), objs["Place." + pl.id].to_dict())
+        self.assertEqual({}, FileStorage._FileStorage__changes)
+
+    def test_reloaded_objects_are_tracked(self):
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        us2 = self.storage.all()["User." + us.id]
+        us2.first_name = "Betty"
+        self.assertIn("User." + us.id, FileStorage._FileStorage__changes)
+
+    def test_reload_without_file(self):
+        self.storage.reload()
+        self.assertEqual({}, self.storage.all())
+
+
+class TestFileStorage_sharded(unittest.TestCase):
+    """Unittests for testing the sharded mode of the FileStorage class."""
+
+    def setUp(self):
+        for name in ("file.json", "file.json.d"):
+            try:
+                os.rename(name, name + ".bak")
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+        self.storage = FileStorage(sharded=True)
+
+    def tearDown(self):
+        shutil.rmtree("file.json.d", ignore_errors=True)
+        for name in ("file.json", "file.json.d"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename(name + ".bak", name)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def shard(self, name):
+        with open(os.path.join("file.json.d", name + ".json")) as f:
+            return json.load(f)
+
+    def test_sharded_binary(self):
+        with self.assertRaises(ValueError):
+            FileStorage(sharded=True, binary=True)
+
+    def test_sharded_lazy(self):
+        with self.assertRaises(ValueError):
+            FileStorage(sharded=True, lazy=True)
+
+    def test_save_writes_one_file_per_class(self):
+        us = User()
+        cy1 = City()
+        cy2 = City()
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertEqual(["City.json", "User.json"],
+                         sorted(os.listdir("file.json.d")))
+        self.assertEqual({"User." + us.id: us.to_dict()}, self.shard("User"))
+        self.assertEqual({"City." + cy1.id: cy1.to_dict(),
+                          "City." + cy2.id: cy2.to_dict()},
+                         self.shard("City"))
+
+    def test_save_rewrites_changed_shards_only(self):
+        us = User()
+        cy = City()
+        self.storage.save()
+        with open(os.path.join("file.json.d", "User.json"), "w") as f:
+            f.write("{}")
+        cy.name = "Oakland"
+        self.storage.save()
+        self.assertEqual({}, self.shard("User"))
+        city = self.shard("City")["City." + cy.id]
+        self.assertEqual("Oakland", city["name"])
+
+    def test_save_writes_missing_shards(self):
+        us = User()
+        self.storage.save()
+        os.remove(os.path.join("file.json.d", "User.json"))
+        self.storage.save()
+        self.assertIn("User." + us.id, self.shard("User"))
+
+    def test_compact_rewrites_every_shard(self):
+        storage = FileStorage(sharded=True, journal=True)
+        us = User()
+        cy = City()
+        self.storage.save()
+        us.first_name = "Betty"
+        storage.save()
+        self.assertNotIn("first_name", self.shard("User")["User." + us.id])
+        storage.compact()
+        self.assertEqual("Betty",
+                         self.shard("User")["User." + us.id]["first_name"])
+        self.assertIn("City." + cy.id, self.shard("City"))
+
+    def test_save_removes_empty_shards(self):
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.storage.save()
+        self.assertEqual([], os.listdir("file.json.d"))
+
+    def test_reload(self):
+        us = User()
+        us.first_name = "Betty"
+        pl = Place()
+        pl.amenity_ids = ["a", "b"]
+        st = State()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertEqual(3, len(objs))
+        for obj in (us, pl, st):
+            key = "{}.{}".format(obj.__class__.__name__, obj.id)
+            self.assertEqual(type(obj), type(objs[key]))
+            self.assertEqual(obj.to_dict(), objs[key].to_dict())
+        self.assertEqual({}, FileStorage._FileStorage__changes)
+
+    def test_reload_single_shard(self):
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(["User." + us.id], list(self.storage.all()))
+
+    def test_reload_from_file_json(self):
+        us = User()
+        FileStorage().save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("User." + us.id, self.storage.all())
+        self.storage.save()
+        self.assertIn("User." + us.id, self.shard("User"))
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_compact_counts_removed_file_json(self):
+        us = User()
+        FileStorage().save()
+        size = os.path.getsize("file.json")
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        seconds, reclaimed = self.storage.compact()
+        self.assertEqual(size - os.path.getsize(os.path.join(
+            "file.json.d", "User.json")), reclaimed)
+
+    def test_reload_without_files(self):
+        self.storage.reload()
+        self.assertEqual({}, self.storage.all())
+
+
+class TestFileStorage_atomic(unittest.TestCase):
+    """Unittests for testing atomic saves and group commits."""
+
+    def setUp(self):
+        for name in ("file.json", "file.bin"):
+            try:
+                os.rename(name, name + ".bak")
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for name in ("file.json", "file.bin"):
+            for path in (name, name + ".tmp"):
+                try:
+                    os.remove(path)
+                except IOError:
+                    pass
+            try:
+                os.rename(name + ".bak", name)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def saved_keys(self):
+        with open("file.json") as f:
+            return set(json.load(f))
+
+    def test_failed_save_keeps_file(self):
+        storage = FileStorage()
+        us = User()
+        storage.save()
+        bm = BaseModel()
+        with patch.object(BaseModel, "to_dict", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                storage.save()
+        self.assertEqual({"User." + us.id}, self.saved_keys())
+
+    def test_save_leaves_no_temporary_file(self):
+        User()
+        FileStorage().save()
+        FileStorage(binary=True).save()
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        self.assertFalse(os.path.exists("file.bin.tmp"))
+        self.assertTrue(os.path.exists("file.bin"))
+
+    def test_fsync(self):
+        User()
+        with patch("os.fsync") as fsync:
+            FileStorage().save()
+            fsync.assert_not_called()
+            FileStorage(fsync=True).save()
+            self.assertEqual(2, fsync.call_count)
+
+    def test_group_commit_delays_saves(self):
+        storage = FileStorage(group_commit=10000)
+        us = User()
+        storage.save()
+        self.assertEqual({"User." + us.id}, self.saved_keys())
+        pl = Place()
+        storage.save()
+        st = State()
+        storage.save()
+        self.assertEqual({"User." + us.id}, self.saved_keys())
+        storage.flush()
+        self.assertEqual({"User." + us.id, "Place." + pl.id,
+                          "State." + st.id}, self.saved_keys())
+
+    def test_group_commit_timer(self):
+        storage = FileStorage(group_commit=20)
+        us = User()
+        storage.save()
+        pl = Place()
+        storage.save()
+        timer = storage._FileStorage__timer
+        self.assertIsNotNone(timer)
+        timer.join()
+        self.assertEqual({"User." + us.id, "Place." + pl.id},
+                         self.saved_keys())
+        self.assertIsNone(storage._FileStorage__timer)
+
+    def test_flush_without_delayed_save(self):
+        storage = FileStorage(group_commit=10000)
+        storage.flush()
+        self.assertFalse(os.path.exists("file.json"))
+
+
+class TestFileStorage_write_behind(unittest.TestCase):
+    """Unittests for testing the write-behind mode of FileStorage."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "file.json.bak")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("file.json.bak", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def saved_keys(self):
+        with open("file.json") as f:
+            return set(json.load(f))
+
+    def test_save_returns_before_writing(self):
+        storage = FileStorage(write_behind=60)
+        us = User()
+        with patch("atexit.register") as register:
+            storage.save()
+            register.assert_called_once_with(storage.flush)
+        self.assertFalse(os.path.exists("file.json"))
+        storage.flush()
+        self.assertEqual({"User." + us.id}, self.saved_keys())
+
+    def test_changes_during_flush(self):
+        storage = FileStorage(write_behind=60)
+        us = User()
+        with patch("atexit.register"):
+            storage.save()
+        started = threading.Event()
+        release = threading.Event()
+
+        def write(*args):
+            started.set()
+            release.wait(10)
+
+        def change():
+            changed.append(User())
+            us.first_name = "Betty"
+
+        changed = []
+        with patch.object(FileStorage, "_FileStorage__write_json",
+                          side_effect=write):
+            flusher = threading.Thread(target=storage.flush)
+            flusher.start()
+            started.wait(10)
+            changer = threading.Thread(target=change)
+            changer.start()
+            changer.join(10)
+            blocked = changer.is_alive()
+            release.set()
+            flusher.join()
+            changer.join()
+        self.assertFalse(blocked)
+        storage.save()
+        storage.flush()
+        self.assertEqual({"User." + us.id, "User." + changed[0].id},
+                         self.saved_keys())
+        with open("file.json") as f:
+            self.assertEqual("Betty", json.load(f)["User." + us.id][
+                "first_name"])
+
+    def test_flush_without_pending_save(self):
+        storage = FileStorage(write_behind=60)
+        User()
+        storage.flush()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_interval(self):
+        storage = FileStorage(write_behind=0.01)
+        us = User()
+        with patch("atexit.register"):
+            storage.save()
+        for i in range(500):
+            if os.path.exists("file.json"):
+                break
+            time.sleep(0.01)
+        with FileStorage._FileStorage__lock:
+            self.assertEqual({"User." + us.id}, self.saved_keys())
+
+    def test_threshold(self):
+        storage = FileStorage(write_behind=60, flush_threshold=2)
+        User()
+        with patch("atexit.register"):
+            storage.save()
+            self.assertFalse(storage._FileStorage__wake.is_set())
+            Place()
+            storage.save()
+        for i in range(500):
+            if os.path.exists("file.json"):
+                break
+            time.sleep(0.01)
+        with FileStorage._FileStorage__lock:
+            self.assertEqual(2, len(self.saved_keys()))
+
+
+class TestFileStorage_shared(unittest.TestCase):
+    """Unittests for testing the shared mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "file.json.bak")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+        self.storage = FileStorage(shared=True)
+
+    def tearDown(self):
+        for name in ("file.json", "file.json.lock"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("file.json.bak", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def saved(self):
+        with open("file.json") as f:
+            return json.load(f)
+
+    def write_elsewhere(self, objs):
+        """Save objs to file.json as another process would."""
+        time.sleep(0.01)
+        with open("file.json", "w") as f:
+            json.dump(objs, f)
+
+    def test_shared_modes(self):
+        for mode in ("journal", "lazy", "binary", "sharded"):
+            with self.assertRaises(ValueError):
+                FileStorage(shared=True, **{mode: True})
+
+    def test_save_locks(self):
+        User()
+        with patch("fcntl.flock") as flock:
+            self.storage.save()
+            flock.assert_called_once()
+            self.assertEqual(fcntl.LOCK_EX, flock.call_args[0][1])
+        self.assertTrue(os.path.exists("file.json.lock"))
+
+    def test_save_merges_new_objects(self):
+        us = User()
+        self.storage.save()
+        saved = self.saved()
+        other = {"__class__": "State", "id": "other", "name": "Nevada",
+                 "created_at": "2024-05-01T12:30:00.000001",
+                 "updated_at": "2024-05-01T12:30:00.000001"}
+        saved["State.other"] = other
+        self.write_elsewhere(saved)
+        pl = Place()
+        self.storage.save()
+        self.assertEqual({"User." + us.id, "Place." + pl.id, "State.other"},
+                         set(self.saved()))
+        st = self.storage.all()["State.other"]
+        self.assertEqual("Nevada", st.name)
+        self.assertEqual(datetime(2024, 5, 1, 12, 30, 0, 1), st.created_at)
+
+    def test_save_merges_updates_and_deletes(self):
+        us = User()
+        cy = City()
+        self.storage.save()
+        saved = self.saved()
+        saved["User." + us.id]["first_name"] = "Betty"
+        del saved["City." + cy.id]
+        self.write_elsewhere(saved)
+        self.storage.save()
+        us2 = self.storage.all()["User." + us.id]
+        self.assertEqual("Betty", us2.first_name)
+        self.assertNotIn("City." + cy.id, self.storage.all())
+        self.assertEqual({"User." + us.id}, set(self.saved()))
+
+    def test_local_changes_win(self):
+        us = User()
+        cy = City()
+        self.storage.save()
+        saved = self.saved()
+        saved["User." + us.id]["first_name"] = "Betty"
+        saved["City." + cy.id]["name"] = "Reno"
+        self.write_elsewhere(saved)
+        us.first_name = "Holberton"
+        self.storage.delete(cy)
+        self.storage.save()
+        saved = self.saved()
+        self.assertEqual("Holberton", saved["User." + us.id]["first_name"])
+        self.assertNotIn("City." + cy.id, saved)
+
+    def test_unchanged_file_is_not_read(self):
+        User()
+        self.storage.save()
+        Place()
+        with patch("models.engine.file_storage.iter_values") as iter_values:
+            self.storage.save()
+            iter_values.assert_not_called()
+
+    def test_reload(self):
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        with patch("fcntl.flock") as flock:
+            self.storage.reload()
+            self.assertEqual(fcntl.LOCK_SH, flock.call_args[0][1])
+        self.assertEqual(us.to_dict(),
+                         self.storage.all()["User." + us.id].to_dict())
+
+    def test_concurrent_processes(self):
+        script = ("import sys; sys.path.insert(0, {!r})\n"
+                  "from models.engine.file_storage import FileStorage\n"
+                  "import models\n"
+                  "models.storage = FileStorage(shared=True)\n"
+                  "models.storage.reload()\n"
+                  "from models.user import User\n"
+                  "for i in range(20):\n"
+                  "    User().save()\n").format(os.getcwd())
+        processes = [subprocess.Popen([sys.executable, "-c", script])
+                     for i in range(3)]
+        for process in processes:
+            self.assertEqual(0, process.wait())
+        self.assertEqual(60, len(self.saved()))
+
+
+class TestFileStorage_bounded(unittest.TestCase):
+    """Unittests for testing the bounded mode of the FileStorage class."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "file.json.bak")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+        self.storage = FileStorage(max_objects=2)
+        self.saved = models.storage
+        models.storage = self.storage
+
+    def tearDown(self):
+        models.storage = self.saved
+        self.storage._FileStorage__close_spill()
+        for name in ("file.json", "file.json.offsets"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("file.json.bak", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def resident(self):
+        odict = FileStorage._FileStorage__objects
+        return [k for k, v in dict.items(odict)
+                if not isinstance(v, Unloaded)]
+
+    def test_bounded_binary(self):
+        with self.assertRaises(ValueError):
+            FileStorage(max_objects=2, binary=True)
+
+    def test_new_evicts(self):
+        us = User()
+        st = State()
+        cy = City()
+        self.assertIsInstance(self.storage.all(), BoundedLazyDict)
+        self.assertEqual(["State." + st.id, "City." + cy.id],
+                         self.resident())
+        self.assertEqual(3, self.storage.count())
+        self.assertEqual({"hits": 0, "misses": 0, "evictions": 1,
+                          "resident": 2}, self.storage.cache_stats())
+
+    def test_evicted_object_reloads(self):
+        us = User()
+        us.first_name = "Betty"
+        self.storage.save()
+        key = "User." + us.id
+        us_dict = us.to_dict()
+        del us
+        State()
+        City()
+        self.assertNotIn(key, self.resident())
+        us2 = self.storage.all()[key]
+        self.assertEqual(us_dict, us2.to_dict())
+        self.assertEqual(User, type(us2))
+        self.assertEqual(1, self.storage.cache_stats()["misses"])
+
+    def test_referenced_object_keeps_identity(self):
+        us = User()
+        State()
+        City()
+        self.assertNotIn("User." + us.id, self.resident())
+        us.first_name = "Betty"
+        self.assertIs(us, self.storage.all()["User." + us.id])
+        self.storage.save()
+        with open("file.json") as f:
+            self.assertEqual("Betty", json.load(f)["User." + us.id][
+                "first_name"])
+
+    def test_save_writes_evicted_objects(self):
+        objs = [User() for i in range(5)]
+        self.storage.save()
+        with open("file.json") as f:
+            saved = json.load(f)
+        self.assertEqual({"User." + obj.id: obj.to_dict() for obj in objs},
+                         saved)
+        self.assertEqual(2, len(self.resident()))
+
+    def test_all_with_class_is_bounded(self):
+        for i in range(5):
+            User()
+        self.assertEqual(5, len(list(self.storage.all(User).values())))
+        self.assertEqual(2, len(self.resident()))
+
+    def test_find(self):
+        cy = City()
+        cy.state_id = "abc"
+        for i in range(3):
+            City()
+        self.assertEqual(["City." + cy.id],
+                         list(self.storage.find(City, state_id="abc")))
+
+    def test_reload(self):
+        objs = [User() for i in range(5)]
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual([], self.resident())
+        self.assertEqual(5, len(list(self.storage.all().values())))
+        self.assertEqual(2, len(self.resident()))
+
+    def test_unchanged_objects_are_not_spilled(self):
+        objs = [User() for i in range(5)]
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(max_objects=2)
+        storage.reload()
+        for obj in storage.all().values():
+            pass
+        self.assertEqual(3, storage.cache_stats()["evictions"])
+        self.assertIsNone(storage._FileStorage__spill)
+
+    def test_changed_objects_are_spilled(self):
+        objs = [User() for i in range(3)]
+        self.storage.save()
+        key = "User." + objs[0].id
+        del objs
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.storage.all()[key].first_name = "Betty"
+        for obj in self.storage.all().values():
+            pass
+        self.assertNotIn(key, self.resident())
+        self.assertIn(key.encode(), self.storage._FileStorage__spill.keys())
+        self.assertEqual("Betty", self.storage.all()[key].first_name)
+
+    def test_spill_removed_on_reload(self):
+        objs = [User() for i in range(3)]
+        for obj in objs:
+            obj.first_name = "Betty"
+        for obj in self.storage.all().values():
+            pass
+        self.assertTrue(glob.glob("file.json.spill*"))
+        self.storage.save()
+        del objs, obj
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIsNone(self.storage._FileStorage__spill)
+        self.assertEqual([], glob.glob("file.json.spill*"))
+        self.assertEqual(3, len(list(self.storage.all().values())))
+
+    def test_journal_changes_are_spilled(self):
+        storage = FileStorage(max_objects=2, journal=True)
+        objs = [User() for i in range(3)]
+        FileStorage().save()
+        key = "User." + objs[0].id
+        del objs
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        storage.all()[key].first_name = "Betty"
+        storage.save()
+        for obj in storage.all().values():
+            pass
+        self.assertNotIn(key, self.resident())
+        self.assertEqual("Betty", storage.all()[key].first_name)
+        storage._FileStorage__close_spill()
+        os.remove("file.json.journal")
+
+    def test_cache_stats_unbounded(self):
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({"hits": 0, "misses": 0, "evictions": 0,
+                          "resident": 0}, FileStorage().cache_stats())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/fulltext.py.
+
+Unittest classes:
+    TestTokenize
+    TestTextIndex
+"""
+import json
+import unittest
+from models.engine.fulltext import TextIndex, tokenize
+
+
+class Record:
+    """A plain object to index."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class TestTokenize(unittest.TestCase):
+    """Unittests for testing the tokenize function."""
+
+    def test_words(self):
+        self.assertEqual(["great", "view", "of", "the", "ocean"],
+                         tokenize("Great view of the OCEAN!"))
+
+    def test_unicode(self):
+        self.assertEqual(["café", "zoë", "42"], tokenize("Café, Zoë: 42"))
+
+    def test_empty(self):
+        self.assertEqual([], tokenize(" ,.! "))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Unittests for testing the TextIndex class."""
+
+    def setUp(self):
+        self.index = TextIndex(("name", "description"))
+        self.index.add("Place.1", Record(name="Ocean view",
+                                         description="Loft by the sea"))
+        self.index.add("Place.2", Record(name="Loft",
+                                         description="View of the ocean"))
+        self.index.add("Place.3", Record(name="Cabin",
+                                         description="Forest, no view"))
+
+    def keys(self, found):
+        return [key for key, score in found]
+
+    def test_attributes(self):
+        self.assertEqual(("name", "description"), self.index.attrs)
+        self.assertEqual({"Place.1": [0], "Place.2": [5]},
+                         self.index.postings["ocean"])
+        self.assertEqual({"Place.1": 6, "Place.2": 5, "Place.3": 4},
+                         self.index.lengths)
+        self.assertEqual(["Cabin", "Forest, no view"],
+                         self.index.values["Place.3"])
+        self.assertEqual(15, self.index.total)
+        self.assertTrue(self.index.changed)
+
+    def test_non_string_attributes_not_indexed(self):
+        index = TextIndex(("name",))
+        index.add("Place.1", Record(name=42))
+        index.add("Place.2", Record())
+        self.assertEqual({}, index.postings)
+        self.assertEqual({"Place.1": 0, "Place.2": 0}, index.lengths)
+
+    def test_search_any_word(self):
+        self.assertEqual({"Place.1", "Place.2", "Place.3"},
+                         set(self.keys(self.index.search("view"))))
+        self.assertEqual({"Place.1", "Place.2"},
+                         set(self.keys(self.index.search("OCEAN loft"))))
+        self.assertEqual([], self.index.search("mountain"))
+        self.assertEqual([], self.index.search(""))
+
+    def test_search_ranks_with_bm25(self):
+        found = self.index.search("forest view")
+        self.assertEqual("Place.3", found[0][0])
+        self.assertEqual(sorted((score for key, score in found),
+                                reverse=True),
+                         [score for key, score in found])
+        self.assertGreater(found[0][1], 0)
+
+    def test_rarer_word_ranks_higher(self):
+        index = TextIndex(("text",))
+        index.add("Review.1", Record(text="good good good"))
+        index.add("Review.2", Record(text="good rare"))
+        index.add("Review.3", Record(text="good"))
+        self.assertEqual("Review.2", index.search("good rare")[0][0])
+
+    def test_search_phrase(self):
+        self.assertEqual(["Place.1"],
+                         self.keys(self.index.search('"ocean view"')))
+        self.assertEqual(["Place.2"],
+                         self.keys(self.index.search('"of the ocean"')))
+        self.assertEqual([], self.index.search('"view ocean"'))
+        self.assertEqual(["Place.2"], self.keys(
+            self.index.search('"view of" "the ocean" forest')))
+
+    def test_phrase_does_not_span_attributes(self):
+        self.assertEqual([], self.index.search('"view loft"'))
+
+    def test_search_limit(self):
+        self.assertEqual(2, len(self.index.search("view", limit=2)))
+
+    def test_remove(self):
+        self.index.remove("Place.1")
+        self.index.remove("Place.4")
+        self.assertEqual({"Place.2": [5]}, self.index.postings["ocean"])
+        self.assertNotIn("sea", self.index.postings)
+        self.assertEqual(9, self.index.total)
+        self.assertNotIn("Place.1", self.index.values)
+
+    def test_update(self):
+        rec = Record(name="Cabin", description="Forest, no view")
+        self.index.changed = False
+        self.index.update("Place.3", rec)
+        self.assertFalse(self.index.changed)
+        rec.description = "By the ocean"
+        self.index.update("Place.3", rec)
+        self.assertTrue(self.index.changed)
+        self.assertIn("Place.3", self.index.postings["ocean"])
+        self.assertNotIn("forest", self.index.postings)
+
+    def test_to_dict_and_from_dict(self):
+        state = json.loads(json.dumps(self.index.to_dict()))
+        self.assertFalse(self.index.changed)
+        index = TextIndex.from_dict(state)
+        self.assertEqual(self.index.attrs, index.attrs)
+        self.assertEqual(self.index.total, index.total)
+        self.assertFalse(index.changed)
+        self.assertEqual(self.index.search('"ocean view" loft'),
+                         index.search('"ocean view" loft'))
+        index.update("Place.3", Record(name="Cabin",
+                                       description="Forest, no view"))
+        self.assertFalse(index.changed)
+
+    def test_from_dict_invalid(self):
+        with self.assertRaises(ValueError):
+            TextIndex.from_dict({"attrs": ["text"]})
+        with self.assertRaises(ValueError):
+            TextIndex.from_dict([])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,328 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/index.py.
+
+Unittest classes:
+    TestHashIndex
+    TestRangeIndex
+    TestDistance
+    TestGridIndex
+"""
+import random
+import unittest
+from models.engine.index import GridIndex, HashIndex, RangeIndex, distance
+
+
+class Record:
+    """A plain object to index."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class TestHashIndex(unittest.TestCase):
+    """Unittests for testing the HashIndex class."""
+
+    def setUp(self):
+        self.index = HashIndex("state_id")
+
+    def test_attr(self):
+        self.assertEqual("state_id", self.index.attr)
+
+    def test_add_and_get(self):
+        self.index.add("City.1", Record(state_id="a"))
+        self.index.add("City.2", Record(state_id="a"))
+        self.index.add("City.3", Record(state_id="b"))
+        self.assertEqual(["City.1", "City.2"], list(self.index.get("a")))
+        self.assertEqual(["City.3"], list(self.index.get("b")))
+        self.assertEqual([], list(self.index.get("c")))
+
+    def test_missing_attribute_indexed_as_none(self):
+        self.index.add("City.1", Record())
+        self.assertEqual(["City.1"], list(self.index.get(None)))
+
+    def test_unhashable_value_not_indexed(self):
+        self.index.add("City.1", Record(state_id=["a"]))
+        self.assertEqual({}, self.index.buckets)
+        self.index.remove("City.1")
+
+    def test_get_unhashable(self):
+        with self.assertRaises(TypeError):
+            self.index.get(["a"])
+
+    def test_remove(self):
+        self.index.add("City.1", Record(state_id="a"))
+        self.index.add("City.2", Record(state_id="a"))
+        self.index.remove("City.1")
+        self.assertEqual(["City.2"], list(self.index.get("a")))
+        self.index.remove("City.2")
+        self.assertEqual({}, self.index.buckets)
+        self.index.remove("City.3")
+
+    def test_update(self):
+        rec = Record(state_id="a")
+        self.index.add("City.1", rec)
+        rec.state_id = "b"
+        self.index.update("City.1", rec)
+        self.assertEqual([], list(self.index.get("a")))
+        self.assertEqual(["City.1"], list(self.index.get("b")))
+
+    def test_update_unindexed_key(self):
+        self.index.update("City.1", Record(state_id="a"))
+        self.assertEqual(["City.1"], list(self.index.get("a")))
+
+
+class TestRangeIndex(unittest.TestCase):
+    """Unittests for testing the RangeIndex class."""
+
+    def setUp(self):
+        self.index = RangeIndex("price_by_night")
+        for key, price in (("Place.3", 80), ("Place.1", 50),
+                           ("Place.5", 200), ("Place.2", 80),
+                           ("Place.4", 120.5)):
+            self.index.add(key, Record(price_by_night=price))
+
+    def test_sorted(self):
+        self.assertEqual("price_by_night", self.index.attr)
+        self.assertEqual([50, 80, 80, 120.5, 200], self.index.sorted_values)
+        self.assertEqual(["Place.1", "Place.2", "Place.3", "Place.4",
+                          "Place.5"], self.index.sorted_keys)
+        self.assertEqual(80, self.index.values["Place.3"])
+
+    def test_non_numbers_not_indexed(self):
+        index = RangeIndex("price_by_night")
+        for i, price in enumerate(("80", None, True, float("nan"), [1])):
+            index.add("Place.{}".format(i), Record(price_by_night=price))
+        index.add("Place.9", Record())
+        self.assertEqual([], index.sorted_values)
+        self.assertEqual({}, index.values)
+
+    def test_range(self):
+        self.assertEqual(["Place.1", "Place.2", "Place.3", "Place.4",
+                          "Place.5"], self.index.range())
+        self.assertEqual(["Place.2", "Place.3", "Place.4"],
+                         self.index.range(80, 120.5))
+        self.assertEqual(["Place.4"], self.index.range(
+            80, 120.5, include_low=False))
+        self.assertEqual(["Place.2", "Place.3"], self.index.range(
+            80, 120.5, include_high=False))
+        self.assertEqual(["Place.4", "Place.5"], self.index.range(low=100))
+        self.assertEqual(["Place.1"], self.index.range(high=79.9))
+        self.assertEqual([], self.index.range(100, 90))
+        self.assertEqual([], self.index.range(300))
+
+    def test_range_reverse(self):
+        self.assertEqual(["Place.5", "Place.4", "Place.2", "Place.3",
+                          "Place.1"], self.index.range(reverse=True))
+        self.assertEqual(["Place.2", "Place.3", "Place.1"],
+                         self.index.range(high=80, reverse=True))
+
+    def test_range_limit(self):
+        self.assertEqual(["Place.1", "Place.2"], self.index.range(limit=2))
+        self.assertEqual(["Place.5", "Place.4", "Place.2"],
+                         self.index.range(reverse=True, limit=3))
+        self.assertEqual([], self.index.range(limit=0))
+
+    def test_range_invalid_bound(self):
+        with self.assertRaises(TypeError):
+            self.index.range("80")
+
+    def test_remove(self):
+        self.index.remove("Place.3")
+        self.index.remove("Place.9")
+        self.assertEqual([50, 80, 120.5, 200], self.index.sorted_values)
+        self.assertEqual(["Place.1", "Place.2", "Place.4", "Place.5"],
+                         self.index.sorted_keys)
+        self.assertNotIn("Place.3", self.index.values)
+
+    def test_remove_all(self):
+        self.index.remove_all(["Place.3", "Place.5", "Place.9"])
+        self.assertEqual([50, 80, 120.5], self.index.sorted_values)
+        self.assertEqual(["Place.1", "Place.2", "Place.4"],
+                         self.index.sorted_keys)
+
+    def test_remove_all_many(self):
+        index = RangeIndex("price_by_night")
+        index.add_all(("Place.{}".format(i), Record(price_by_night=i % 7))
+                      for i in range(300))
+        index.remove_all("Place.{}".format(i) for i in range(0, 300, 2))
+        self.assertEqual(150, len(index.values))
+        self.assertEqual(sorted(index.values.values()), index.sorted_values)
+        self.assertEqual(["Place.105", "Place.119"],
+                         index.range(0, 0, limit=2))
+
+    def test_update(self):
+        rec = Record(price_by_night=80)
+        self.index.update("Place.3", rec)
+        self.assertEqual(["Place.2", "Place.3"], self.index.range(80, 80))
+        rec.price_by_night = 10
+        self.index.update("Place.3", rec)
+        self.assertEqual(["Place.3", "Place.1", "Place.2"],
+                         self.index.range(high=80))
+        rec.price_by_night = "10"
+        self.index.update("Place.3", rec)
+        self.assertNotIn("Place.3", self.index.sorted_keys)
+        rec.price_by_night = 10.0
+        self.index.update("Place.6", rec)
+        self.assertEqual(["Place.6"], self.index.range(high=10))
+
+    def test_add_all(self):
+        index = RangeIndex("price_by_night")
+        index.add("Place.1", Record(price_by_night=3))
+        index.add_all([("Place.{}".format(i), Record(price_by_night=v))
+                       for i, v in ((2, 1), (3, None), (4, 3), (5, 2))])
+        self.assertEqual([1, 2, 3, 3], index.sorted_values)
+        self.assertEqual(["Place.2", "Place.5", "Place.1", "Place.4"],
+                         index.sorted_keys)
+
+    def test_matches_sorted(self):
+        rng = random.Random(0)
+        index = RangeIndex("price_by_night")
+        prices = {}
+        for i in range(500):
+            key = "Place.{}".format(rng.randrange(100))
+            prices[key] = rng.randrange(50)
+            index.update(key, Record(price_by_night=prices[key]))
+            if rng.random() < 0.2:
+                index.remove(key)
+                del prices[key]
+        expected = sorted(key for key, price in prices.items()
+                          if 10 <= price < 30)
+        expected.sort(key=prices.get)
+        self.assertEqual(expected, index.range(10, 30, include_high=False))
+
+
+class TestDistance(unittest.TestCase):
+    """Unittests for testing the distance function."""
+
+    def test_same_point(self):
+        self.assertEqual(0, distance(37.77, -122.42, 37.77, -122.42))
+
+    def test_known_distance(self):
+        self.assertAlmostEqual(559.1, distance(37.7749, -122.4194,
+                                               34.0522, -118.2437), 0)
+
+    def test_across_antimeridian(self):
+        self.assertAlmostEqual(22.24, distance(0, 179.9, 0, -179.9), 1)
+
+    def test_antipodes(self):
+        self.assertAlmostEqual(20015.1, distance(0, 0, 0, 180), 0)
+
+
+class TestGridIndex(unittest.TestCase):
+    """Unittests for testing the GridIndex class."""
+
+    def setUp(self):
+        self.index = GridIndex("latitude", "longitude")
+        self.points = {
+            "Place.sf": (37.7749, -122.4194),
+            "Place.oak": (37.8044, -122.2712),
+            "Place.la": (34.0522, -118.2437),
+            "Place.east": (-17.7, 179.95),
+            "Place.west": (-17.7, -179.95),
+            "Place.pole": (90, 0),
+        }
+        for key, (lat, lon) in self.points.items():
+            self.index.add(key, Record(latitude=lat, longitude=lon))
+
+    def keys(self, found):
+        return [key for key, km in found]
+
+    def test_attributes(self):
+        self.assertEqual("latitude", self.index.lat_attr)
+        self.assertEqual("longitude", self.index.lon_attr)
+        self.assertEqual(0.1, self.index.cell_size)
+        self.assertEqual(self.points, self.index.values)
+
+    def test_invalid_points_not_indexed(self):
+        index = GridIndex("latitude", "longitude")
+        index.add("Place.1", Record())
+        index.add("Place.2", Record(latitude="1", longitude=2))
+        index.add("Place.3", Record(latitude=91.0, longitude=2.0))
+        index.add("Place.4", Record(latitude=1.0, longitude=-181.0))
+        index.add("Place.5", Record(latitude=None, longitude=2.0))
+        self.assertEqual({}, index.values)
+        self.assertEqual({}, index.cells)
+
+    def test_class_defaults_not_indexed(self):
+        class Located(Record):
+            latitude = 0.0
+            longitude = 0.0
+        index = GridIndex("latitude", "longitude")
+        index.add("Place.1", Located())
+        index.add("Place.2", Located(latitude=1.0))
+        index.add("Place.3", Located(latitude=1.0, longitude=2.0))
+        self.assertEqual({"Place.3": (1.0, 2.0)}, index.values)
+
+    def test_near(self):
+        found = self.index.near(37.7749, -122.4194, 20)
+        self.assertEqual(["Place.sf", "Place.oak"], self.keys(found))
+        self.assertEqual(0, found[0][1])
+        self.assertAlmostEqual(13.43, found[1][1], 1)
+        self.assertEqual(["Place.sf", "Place.oak", "Place.la"],
+                         self.keys(self.index.near(37.78, -122.42, 600)))
+        self.assertEqual([], self.index.near(0, 0, 100))
+
+    def test_near_across_antimeridian(self):
+        self.assertEqual(["Place.east", "Place.west"],
+                         self.keys(self.index.near(-17.7, 179.99, 20)))
+        self.assertEqual(["Place.west", "Place.east"],
+                         self.keys(self.index.near(-17.7, -179.99, 20)))
+
+    def test_near_pole(self):
+        self.assertEqual(["Place.pole"],
+                         self.keys(self.index.near(89.9, 120, 20)))
+
+    def test_near_invalid_point(self):
+        with self.assertRaises(ValueError):
+            self.index.near(91, 0, 10)
+        with self.assertRaises(ValueError):
+            self.index.near(0, 181, 10)
+
+    def test_near_matches_linear_scan(self):
+        rng = random.Random(7)
+        index = GridIndex("latitude", "longitude", cell_size=1.0)
+        points = {}
+        for i in range(2000):
+            points[i] = (rng.uniform(-90, 90), rng.uniform(-180, 180))
+            index.add(i, Record(latitude=points[i][0],
+                                longitude=points[i][1]))
+        for i in range(50):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            radius = rng.choice((10, 200, 1500, 8000))
+            expected = sorted(key for key, point in points.items()
+                              if distance(lat, lon, *point) <= radius)
+            self.assertEqual(expected,
+                             sorted(self.keys(index.near(lat, lon, radius))))
+
+    def test_nearest(self):
+        self.assertEqual(["Place.oak", "Place.sf"],
+                         self.keys(self.index.nearest(37.8, -122.3, 2)))
+        found = self.index.nearest(0, 0, 10)
+        self.assertEqual(set(self.points), set(self.keys(found)))
+        self.assertEqual(sorted(km for key, km in found),
+                         [km for key, km in found])
+        self.assertEqual([], self.index.nearest(0, 0, 0))
+
+    def test_remove(self):
+        self.index.remove("Place.sf")
+        self.index.remove("Place.none")
+        self.assertEqual(["Place.oak"],
+                         self.keys(self.index.near(37.7749, -122.4194, 20)))
+        for key in list(self.points):
+            self.index.remove(key)
+        self.assertEqual({}, self.index.cells)
+
+    def test_update(self):
+        rec = Record(latitude=34.05, longitude=-118.24)
+        self.index.update("Place.sf", rec)
+        self.assertEqual(["Place.oak"],
+                         self.keys(self.index.near(37.7749, -122.4194, 20)))
+        self.assertEqual(["Place.sf", "Place.la"],
+                         self.keys(self.index.near(34.05, -118.24, 5)))
+        rec.latitude = None
+        self.index.update("Place.sf", rec)
+        self.assertNotIn("Place.sf", self.index.values)
+
+
+if __name__ == "__main__":
+    unittest.main()
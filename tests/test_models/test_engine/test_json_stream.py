@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/json_stream.py.
+
+Unittest classes:
+    TestIterMembers
+    TestIterValues
+"""
+import io
+import json
+import unittest
+from models.engine.json_stream import iter_members, iter_values
+
+
+class TestIterMembers(unittest.TestCase):
+    """Unittests for testing the iter_members function."""
+
+    objdict = {
+        "User.1": {"id": "1", "name": "a \"quoted\" {brace}"},
+        "Place.2": {"id": "2", "amenity_ids": ["x", "y"], "n": 3},
+        "odd \"key\"": [1, {"a": [2, "]"]}],
+        "num": -1.5e3,
+        "flag": True,
+        "nothing": None,
+        "text": "café , }",
+    }
+
+    def members(self, data, chunk_size):
+        f = io.BytesIO(data)
+        return {k: json.loads(data[s:e])
+                for k, s, e in iter_members(f, chunk_size)}
+
+    def test_offsets_match_values(self):
+        data = json.dumps(self.objdict).encode()
+        self.assertEqual(self.objdict, self.members(data, 1 << 20))
+
+    def test_small_chunks(self):
+        data = json.dumps(self.objdict).encode()
+        for chunk_size in (1, 2, 3, 5, 8, 13):
+            self.assertEqual(self.objdict, self.members(data, chunk_size))
+
+    def test_indented_and_unicode(self):
+        data = json.dumps(self.objdict, indent=4,
+                          ensure_ascii=False).encode()
+        self.assertEqual(self.objdict, self.members(data, 7))
+
+    def test_empty_object(self):
+        self.assertEqual({}, self.members(b" { } ", 1))
+
+    def test_offsets_relative_to_file_start(self):
+        data = b'xx{"a": 1}'
+        f = io.BytesIO(data)
+        f.seek(2)
+        self.assertEqual([("a", 8, 9)], list(iter_members(f)))
+
+    def test_invalid_json(self):
+        for data in (b"", b"[1]", b'{"a": 1', b'{"a" 1}', b'{"a": 1,}',
+                     b'{"a": 1 "b": 2}', b'{"a": 1} x', b'{}}',
+                     b'{"a": 1}  \n  ,'):
+            with self.assertRaises(ValueError):
+                list(iter_members(io.BytesIO(data), 2))
+
+
+class TestIterValues(unittest.TestCase):
+    """Unittests for testing the iter_values function."""
+
+    objdict = TestIterMembers.objdict
+
+    def values(self, data, chunk_size):
+        return list(iter_values(io.BytesIO(data), chunk_size))
+
+    def test_values_in_order(self):
+        data = json.dumps(self.objdict).encode()
+        self.assertEqual(list(self.objdict.items()),
+                         self.values(data, 1 << 20))
+
+    def test_small_chunks(self):
+        data = json.dumps(self.objdict).encode()
+        for chunk_size in (1, 2, 3, 5, 8, 13):
+            self.assertEqual(self.objdict,
+                             dict(self.values(data, chunk_size)))
+
+    def test_numbers_split_across_chunks(self):
+        objdict = {"a": 0.123456789, "b": -12e-30, "c": 100}
+        data = json.dumps(objdict).encode()
+        for chunk_size in range(1, len(data)):
+            self.assertEqual(objdict, dict(self.values(data, chunk_size)))
+
+    def test_indented_and_unicode(self):
+        data = json.dumps(self.objdict, indent=4,
+                          ensure_ascii=False).encode()
+        for chunk_size in (1, 7):
+            self.assertEqual(self.objdict,
+                             dict(self.values(data, chunk_size)))
+
+    def test_empty_object(self):
+        self.assertEqual([], self.values(b" { } ", 1))
+
+    def test_consumed_one_value_at_a_time(self):
+        data = json.dumps({"a": "x" * 100, "b": "y" * 100}).encode()
+        f = io.BytesIO(data)
+        values = iter_values(f, 16)
+        next(values)
+        self.assertLess(f.tell(), len(data))
+
+    def test_invalid_json(self):
+        for data in (b"", b" ", b"[1]", b'{"a": 1', b'{"a" 1}',
+                     b'{"a": 1,}', b'{"a": tru}', b'{"a": 1 "b": 2}',
+                     b'{"a": 1} x', b'{}}', b'{"a": 1}  \n  ,'):
+            with self.assertRaises(ValueError):
+                self.values(data, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
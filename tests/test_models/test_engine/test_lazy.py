@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/lazy.py.
+
+Unittest classes:
+    TestLazyDict
+    TestBoundedLazyDict
+"""
+import unittest
+from models.engine.lazy import BoundedLazyDict, LazyDict, Unloaded
+
+
+class TestLazyDict(unittest.TestCase):
+    """Unittests for testing the LazyDict class."""
+
+    def setUp(self):
+        self.loaded = []
+        self.lazy = LazyDict(self.load, a=Unloaded(1), b=2)
+
+    def load(self, key, unloaded):
+        self.loaded.append(key)
+        return unloaded.location * 10
+
+    def test_is_dict(self):
+        self.assertIsInstance(self.lazy, dict)
+
+    def test_keys_do_not_load(self):
+        self.assertIn("a", self.lazy)
+        self.assertEqual(["a", "b"], list(self.lazy))
+        self.assertEqual(2, len(self.lazy))
+        self.assertEqual([], self.loaded)
+
+    def test_getitem_loads_once(self):
+        self.assertEqual(10, self.lazy["a"])
+        self.assertEqual(10, self.lazy["a"])
+        self.assertEqual(["a"], self.loaded)
+        self.assertEqual(10, dict.__getitem__(self.lazy, "a"))
+
+    def test_get(self):
+        self.assertEqual(10, self.lazy.get("a"))
+        self.assertEqual(2, self.lazy.get("b"))
+        self.assertIsNone(self.lazy.get("c"))
+        self.assertEqual(3, self.lazy.get("c", 3))
+
+    def test_pop(self):
+        self.assertEqual(10, self.lazy.pop("a"))
+        self.assertNotIn("a", self.lazy)
+        self.assertEqual(3, self.lazy.pop("c", 3))
+        with self.assertRaises(KeyError):
+            self.lazy.pop("c")
+
+    def test_values_and_items(self):
+        self.assertEqual([10, 2], list(self.lazy.values()))
+        self.assertEqual([("a", 10), ("b", 2)], list(self.lazy.items()))
+        self.assertIn(10, self.lazy.values())
+
+    def test_copy(self):
+        copy = self.lazy.copy()
+        self.assertIsInstance(copy, LazyDict)
+        self.assertEqual([], self.loaded)
+        self.assertEqual(10, copy["a"])
+
+
+class TestBoundedLazyDict(unittest.TestCase):
+    """Unittests for testing the BoundedLazyDict class."""
+
+    def setUp(self):
+        self.unloaded = []
+        self.lazy = BoundedLazyDict(self.load, self.unload, 2,
+                                    a=Unloaded(1), b=2, c=3)
+
+    def load(self, key, unloaded):
+        return unloaded.location
+
+    def unload(self, key, value):
+        self.unloaded.append(key)
+        return Unloaded(value)
+
+    def test_is_lazy_dict(self):
+        self.assertIsInstance(self.lazy, LazyDict)
+
+    def test_initial_items_bounded(self):
+        self.assertEqual(["b", "c"], list(self.lazy.recent))
+        lazy = BoundedLazyDict(self.load, self.unload, 1, b=2, c=3)
+        self.assertEqual(["b"], self.unloaded)
+        self.assertEqual(["c"], list(lazy.recent))
+        self.assertEqual(1, lazy.evictions)
+
+    def test_getitem_evicts_least_recently_used(self):
+        self.assertEqual(1, self.lazy["a"])
+        self.assertEqual(3, self.lazy["c"])
+        self.lazy["d"] = 4
+        self.assertEqual(["b", "a"], self.unloaded)
+        self.assertEqual(["c", "d"], list(self.lazy.recent))
+        self.assertIsInstance(dict.__getitem__(self.lazy, "a"), Unloaded)
+
+    def test_counters(self):
+        self.lazy["a"]
+        self.lazy["a"]
+        self.lazy["b"]
+        self.assertEqual(1, self.lazy.hits)
+        self.assertEqual(2, self.lazy.misses)
+        self.assertEqual(2, self.lazy.evictions)
+
+    def test_set_unloaded(self):
+        self.lazy["c"] = Unloaded(3)
+        self.assertEqual(["b"], list(self.lazy.recent))
+
+    def test_delete(self):
+        del self.lazy["c"]
+        self.assertEqual(["b"], list(self.lazy.recent))
+        self.assertEqual(1, self.lazy.pop("a"))
+        self.assertEqual(["b"], list(self.lazy.recent))
+        self.assertEqual(["b"], list(self.lazy))
+
+    def test_values_stay_bounded(self):
+        self.lazy["d"] = 4
+        self.assertEqual([1, 2, 3, 4], list(self.lazy.values()))
+        self.assertEqual(["c", "d"], list(self.lazy.recent))
+
+
+if __name__ == "__main__":
+    unittest.main()
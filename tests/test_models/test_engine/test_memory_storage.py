@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/memory_storage.py.
+
+Unittest classes:
+    TestMemoryStorage
+"""
+import os
+import unittest
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.memory_storage import MemoryStorage
+from models.city import City
+
+
+class TestMemoryStorage(unittest.TestCase):
+    """Unittests for testing the MemoryStorage class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.saved = models.storage
+        models.storage = self.storage = MemoryStorage()
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+
+    def tearDown(self):
+        models.storage = self.saved
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_instantiation_with_arg(self):
+        with self.assertRaises(TypeError):
+            MemoryStorage(None)
+
+    def test_save_writes_nothing(self):
+        cy = City()
+        cy.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertEqual({}, self.storage.pop_changes())
+        self.assertIn("City." + cy.id, self.storage.all())
+
+    def test_reload_keeps_objects(self):
+        cy = City()
+        self.storage.reload()
+        self.assertEqual({"City." + cy.id: cy}, self.storage.all())
+
+    def test_compact(self):
+        City()
+        self.assertEqual((0.0, 0), self.storage.compact())
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_find(self):
+        cy = City()
+        cy.state_id = "abc"
+        self.assertEqual({"City." + cy.id: cy},
+                         self.storage.find(City, state_id="abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
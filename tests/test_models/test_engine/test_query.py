@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+"""Defines unittests for models/engine/query.py.
+
+Unittest classes:
+    TestQuery
+"""
+import models
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+from models.city import City
+
+
+class TestQuery(unittest.TestCase):
+    """Unittests for testing the Query class."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.places = []
+        for i, (name, price, guests) in enumerate([
+                ("a", 50, 2), ("b", 120, 4), ("c", 80, 6), ("d", 80, 1),
+                ("e", 200, 8)]):
+            pl = Place(id=str(i))
+            models.storage.new(pl)
+            pl.name = name
+            pl.price_by_night = price
+            pl.max_guest = guests
+            pl.city_id = "x" if i % 2 else "y"
+            self.places.append(pl)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def names(self, query):
+        return [pl.name for pl in query]
+
+    def test_storage_query(self):
+        query = models.storage.query(Place)
+        self.assertIsInstance(query, Query)
+        self.assertIs(models.storage, query.storage)
+        self.assertEqual(5, query.count())
+
+    def test_only_class_objects(self):
+        City()
+        self.assertEqual(5, models.storage.query("Place").count())
+
+    def test_where_operators(self):
+        query = models.storage.query(Place)
+        self.assertEqual(["c", "d"],
+                         self.names(query.where(price_by_night=80)))
+        self.assertEqual(["c", "d"],
+                         self.names(query.where(price_by_night__exact=80)))
+        self.assertEqual(["a", "b", "e"],
+                         self.names(query.where(price_by_night__ne=80)))
+        self.assertEqual(["a"],
+                         self.names(query.where(price_by_night__lt=80)))
+        self.assertEqual(["a", "c", "d"],
+                         self.names(query.where(price_by_night__lte=80)))
+        self.assertEqual(["b", "e"],
+                         self.names(query.where(price_by_night__gt=80)))
+        self.assertEqual(["c", "d", "b", "e"],
+                         self.names(query.where(price_by_night__gte=80)))
+        self.assertEqual(["a", "e"],
+                         self.names(query.where(name__in=("a", "e"))))
+        self.places[0].amenity_ids = ["wifi"]
+        self.assertEqual(["a"],
+                         self.names(query.where(amenity_ids__contains="wifi")))
+
+    def test_where_conditions_combine(self):
+        query = models.storage.query(Place).where(price_by_night__lt=100)
+        query = query.where(max_guest__gte=2)
+        self.assertEqual(["a", "c"], self.names(query))
+
+    def test_where_unknown_operator(self):
+        with self.assertRaises(ValueError):
+            models.storage.query(Place).where(price_by_night__near=1)
+
+    def test_where_incomparable_values(self):
+        self.places[0].price_by_night = None
+        query = models.storage.query(Place)
+        self.assertNotIn("a", self.names(query.where(price_by_night__lt=100)))
+        self.assertIn("a", self.names(query.where(price_by_night__ne=80)))
+
+    def test_equality_uses_find(self):
+        storage = models.storage
+        with patch.object(storage, "find", wraps=storage.find) as find:
+            query = storage.query(Place).where(city_id="x",
+                                               price_by_night__gt=100)
+            find.assert_not_called()
+            self.assertEqual(["b"], self.names(query))
+            find.assert_called_once_with(Place, city_id="x")
+
+    def test_range_uses_between(self):
+        storage = models.storage
+        with patch.object(storage, "between",
+                          wraps=storage.between) as between:
+            query = storage.query(Place).where(price_by_night__gt=50,
+                                               price_by_night__lte=120,
+                                               max_guest__gte=2)
+            self.assertEqual(["c", "b"], self.names(query))
+            between.assert_called_once_with(
+                Place, "price_by_night", reverse=False, limit=None, low=50,
+                include_low=False, high=120, include_high=True)
+
+    def test_range_tightest_bounds(self):
+        query = models.storage.query(Place).where(price_by_night__gte=50)
+        query = query.where(price_by_night__gt=80, price_by_night__lt=300)
+        query = query.where(price_by_night__lte=200)
+        self.assertEqual(["b", "e"], self.names(query))
+        query = query.where(price_by_night__lt=200)
+        self.assertEqual(["b"], self.names(query))
+
+    def test_range_non_number_value(self):
+        query = models.storage.query(Place).where(max_guest__gt=1,
+                                                  name__gte="c")
+        self.assertEqual(["c", "e"], self.names(query))
+        self.assertEqual([], self.names(models.storage.query(Place).where(
+            price_by_night__lt="100")))
+
+    def test_order_by_range_index(self):
+        storage = models.storage
+        with patch.object(storage, "between",
+                          wraps=storage.between) as between:
+            query = storage.query(Place).order_by("-max_guest").limit(2)
+            self.assertEqual(["e", "c"], self.names(query))
+            between.assert_called_once_with(
+                Place, "max_guest", reverse=True, limit=2)
+        self.places[1].price_by_night = None
+        query = storage.query(Place).order_by("-price_by_night")
+        self.assertEqual(["e", "c", "d", "a", "b"], self.names(query))
+        query = query.where(price_by_night__lt=100, max_guest__gt=1)
+        self.assertEqual(["c", "a"], self.names(query))
+
+    def test_order_by(self):
+        query = models.storage.query(Place)
+        self.assertEqual(["a", "c", "d", "b", "e"],
+                         self.names(query.order_by("price_by_night")))
+        self.assertEqual(["e", "b", "c", "d", "a"],
+                         self.names(query.order_by("-price_by_night")))
+        self.assertEqual(["a", "d", "c", "b", "e"],
+                         self.names(query.order_by("price_by_night",
+                                                   "max_guest")))
+        self.assertEqual(["e", "b", "c", "d", "a"],
+                         self.names(query.order_by("-price_by_night",
+                                                   "-max_guest")))
+
+    def test_order_by_missing_values_last(self):
+        self.places[2].name = None
+        query = models.storage.query(Place)
+        self.assertEqual(["a", "b", "d", "e", None],
+                         self.names(query.order_by("name")))
+        self.assertEqual(["e", "d", "b", "a", None],
+                         self.names(query.order_by("-name")))
+        self.assertEqual(["e", "d"],
+                         self.names(query.order_by("-name").limit(2)))
+
+    def test_order_by_mixed_types(self):
+        self.places[0].name = 5
+        self.places[1].name = 2.5
+        self.places[2].name = True
+        query = models.storage.query(Place)
+        self.assertEqual([True, 2.5, 5, "d", "e"],
+                         self.names(query.order_by("name")))
+        self.assertEqual(["e", "d", 5, 2.5, True],
+                         self.names(query.order_by("-name")))
+        self.assertEqual([True, 2.5],
+                         self.names(query.order_by("name").limit(2)))
+
+    def test_limit(self):
+        query = models.storage.query(Place)
+        self.assertEqual(["a", "b"], self.names(query.limit(2)))
+        self.assertEqual(["e", "b"], self.names(
+            query.order_by("-price_by_night").limit(2)))
+        self.assertEqual(["a", "d"], self.names(
+            query.order_by("price_by_night", "max_guest").limit(2)))
+        self.assertEqual([], self.names(query.limit(0)))
+        with self.assertRaises(ValueError):
+            query.limit(-1)
+
+    def test_only(self):
+        query = models.storage.query(Place).where(name="a")
+        self.assertEqual([{"name": "a", "price_by_night": 50}],
+                         list(query.only("name", "price_by_night")))
+        self.assertEqual([{"nothing": None}], list(query.only("nothing")))
+
+    def test_builder_returns_new_queries(self):
+        query = models.storage.query(Place)
+        query.where(name="a").order_by("name").limit(1).only("name")
+        self.assertEqual((), query.filters)
+        self.assertEqual((), query.ordering)
+        self.assertIsNone(query.count_max)
+        self.assertEqual((), query.fields)
+
+    def test_lazy_evaluation(self):
+        query = models.storage.query(Place).where(max_guest__gt=4)
+        pl = Place()
+        pl.name = "f"
+        pl.max_guest = 5
+        self.assertEqual(["f", "c", "e"], self.names(query))
+
+    def test_first(self):
+        query = models.storage.query(Place)
+        self.assertEqual("e", query.order_by("-max_guest").first().name)
+        self.assertIsNone(query.where(name="z").first())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""Defines unittests for models/__init__.py.
+
+Unittest classes:
+    TestModels_config
+    TestModels_create_storage
+"""
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+import models
+from models.engine.file_storage import FileStorage
+from models.engine.memory_storage import MemoryStorage
+
+
+class TestModels_config(unittest.TestCase):
+    """Unittests for testing read_config of the models package."""
+
+    def tearDown(self):
+        try:
+            os.remove("test.cfg")
+        except IOError:
+            pass
+
+    def test_missing_file(self):
+        self.assertEqual({}, models.read_config("test.cfg"))
+
+    def test_missing_section(self):
+        with open("test.cfg", "w") as f:
+            f.write("[other]\ntype = db\n")
+        self.assertEqual({}, models.read_config("test.cfg"))
+
+    def test_options(self):
+        with open("test.cfg", "w") as f:
+            f.write("[storage]\ntype = file\njournal = yes\nlazy = off\n")
+        self.assertEqual({"type": "file", "journal": True, "lazy": False},
+                         models.read_config("test.cfg"))
+
+    def test_numbers(self):
+        with open("test.cfg", "w") as f:
+            f.write("[storage]\nwrite_behind = 0.5\nflush_threshold = 100\n")
+        self.assertEqual({"write_behind": 0.5, "flush_threshold": 100},
+                         models.read_config("test.cfg"))
+
+    def test_path_from_environment(self):
+        with open("test.cfg", "w") as f:
+            f.write("[storage]\ntype = memory\n")
+        with mock.patch.dict(os.environ, {"HBNB_CONFIG": "test.cfg"}):
+            self.assertEqual({"type": "memory"}, models.read_config())
+
+
+class TestModels_create_storage(unittest.TestCase):
+    """Unittests for testing the storage engine of the models package."""
+
+    def setUp(self):
+        self.environ = mock.patch.dict(os.environ, {"HBNB_CONFIG": "test.cfg"})
+        self.environ.start()
+        os.environ.pop("HBNB_TYPE_STORAGE", None)
+
+    def tearDown(self):
+        self.environ.stop()
+        models.BACKENDS.pop("test", None)
+        try:
+            os.remove("test.cfg")
+        except IOError:
+            pass
+
+    def test_storage(self):
+        self.assertIsInstance(models.storage, FileStorage)
+
+    def test_default(self):
+        self.assertIs(type(models.create_storage()), FileStorage)
+
+    def test_by_name(self):
+        self.assertIs(type(models.create_storage("memory")), MemoryStorage)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            models.create_storage("nothing")
+
+    def test_environment(self):
+        os.environ["HBNB_TYPE_STORAGE"] = "memory"
+        self.assertIs(type(models.create_storage()), MemoryStorage)
+
+    def test_config_file(self):
+        with open("test.cfg", "w") as f:
+            f.write("[storage]\ntype = memory\n")
+        self.assertIs(type(models.create_storage()), MemoryStorage)
+
+    def test_config_options(self):
+        with open("test.cfg", "w") as f:
+            f.write("[storage]\ntype = file\nlazy = true\n")
+        storage = models.create_storage()
+        self.assertTrue(storage._FileStorage__lazy)
+
+    def test_environment_overrides_config_file(self):
+        with open("test.cfg", "w") as f:
+            f.write("[storage]\ntype = file\nlazy = true\n")
+        os.environ["HBNB_TYPE_STORAGE"] = "memory"
+        self.assertIs(type(models.create_storage()), MemoryStorage)
+
+    def test_register(self):
+        engine = mock.Mock()
+        models.register("test", lambda **options: engine)
+        self.assertIs(engine, models.create_storage("test"))
+        engine.reload.assert_not_called()
+
+    def test_register_dotted_path(self):
+        models.register("test", "models.engine.memory_storage.MemoryStorage")
+        self.assertIs(type(models.create_storage("test")), MemoryStorage)
+
+    def test_storage_reloads_existing_file(self):
+        with open("test.json", "w") as f:
+            f.write('{"User.1": {"__class__": "User", "id": "1", '
+                    '"created_at": "2024-05-01T12:30:00.000001", '
+                    '"updated_at": "2024-05-01T12:30:00.000001"}}')
+        script = ("import sys; sys.path.insert(0, {!r})\n"
+                  "from models.engine.file_storage import FileStorage\n"
+                  "FileStorage._FileStorage__file_path = 'test.json'\n"
+                  "from models import storage\n"
+                  "print(list(storage.all()))\n").format(os.getcwd())
+        try:
+            output = subprocess.check_output([sys.executable, "-c", script])
+        finally:
+            os.remove("test.json")
+        self.assertEqual("['User.1']", output.decode().strip())
+
+    def test_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            models.nothing
+
+
+if __name__ == "__main__":
+    unittest.main()
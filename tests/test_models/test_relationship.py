@@ -0,0 +1,228 @@
+#!/usr/bin/python3
+"""Defines unittests for models/relationship.py.
+
+Unittest classes:
+    TestRelationship
+    TestBelongsTo
+    TestHasMany
+    TestListOf
+    TestJoin
+    TestDependents
+"""
+import models
+import unittest
+from unittest.mock import patch
+from models.amenity import Amenity
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.relationship import (BelongsTo, HasMany, ListOf, Relationship,
+                                 dependents, join)
+from models.review import Review
+from models.state import State
+from models.user import User
+
+
+class Graph(unittest.TestCase):
+    """Stores two states, three cities, a user, three places, two
+    amenities and three reviews related to each other."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.ca = State(id="ca")
+        self.ny = State(id="ny")
+        self.sf = City(id="sf", state_id="ca")
+        self.la = City(id="la", state_id="ca")
+        self.nyc = City(id="nyc", state_id="ny")
+        self.host = User(id="host")
+        self.wifi = Amenity(id="wifi")
+        self.pool = Amenity(id="pool")
+        self.loft = Place(id="loft", city_id="sf", user_id="host",
+                          amenity_ids=["pool", "gone", "wifi"])
+        self.cabin = Place(id="cabin", city_id="la", user_id="host")
+        self.flat = Place(id="flat", city_id="nyc", user_id="nobody")
+        self.r1 = Review(id="r1", place_id="loft", user_id="host")
+        self.r2 = Review(id="r2", place_id="loft", user_id="nobody")
+        self.r3 = Review(id="r3", place_id="flat", user_id="host")
+        for obj in (self.ca, self.ny, self.sf, self.la, self.nyc, self.host,
+                    self.wifi, self.pool, self.loft, self.cabin, self.flat,
+                    self.r1, self.r2, self.r3):
+            models.storage.new(obj)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+
+class TestRelationship(unittest.TestCase):
+    """Unittests for testing the Relationship base class."""
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            Relationship("City", "state_id")
+
+
+class TestBelongsTo(Graph):
+    """Unittests for testing the BelongsTo relationship."""
+
+    def test_class_attribute(self):
+        self.assertIsInstance(Place.city, BelongsTo)
+        self.assertEqual("city", Place.city.name)
+        self.assertEqual("City", Place.city.cls_name)
+        self.assertEqual("city_id", Place.city.attr)
+
+    def test_get(self):
+        self.assertIs(self.sf, self.loft.city)
+        self.assertIs(self.host, self.loft.user)
+        self.assertIs(self.ca, self.sf.state)
+        self.assertIs(self.loft, self.r1.place)
+
+    def test_missing_object(self):
+        self.assertIsNone(self.flat.user)
+        self.assertIsNone(Place().city)
+
+    def test_follows_id_changes(self):
+        self.loft.city_id = "nyc"
+        self.assertIs(self.nyc, self.loft.city)
+        models.storage.delete(self.nyc)
+        self.assertIsNone(self.loft.city)
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.loft.city = self.la
+        self.assertNotIn("city", self.loft.to_dict())
+
+
+class TestHasMany(Graph):
+    """Unittests for testing the HasMany relationship."""
+
+    def test_class_attribute(self):
+        self.assertIsInstance(State.cities, HasMany)
+        self.assertEqual("City", State.cities.cls_name)
+        self.assertEqual("state_id", State.cities.attr)
+
+    def test_get(self):
+        self.assertEqual([self.sf, self.la], self.ca.cities)
+        self.assertEqual([self.loft, self.cabin], self.host.places)
+        self.assertEqual([self.r1, self.r3], self.host.reviews)
+        self.assertEqual([self.r1, self.r2], self.loft.reviews)
+        self.assertEqual([], self.cabin.reviews)
+
+    def test_follows_new_update_and_delete(self):
+        self.assertEqual([self.nyc], self.ny.cities)
+        city = City()
+        city.state_id = "ny"
+        self.sf.state_id = "ny"
+        self.assertEqual([self.nyc, city, self.sf], self.ny.cities)
+        models.storage.delete(self.nyc)
+        self.assertEqual([city, self.sf], self.ny.cities)
+        self.assertEqual([self.la], self.ca.cities)
+
+    def test_uses_group(self):
+        storage = models.storage
+        with patch.object(storage, "group", wraps=storage.group) as group:
+            self.assertEqual([self.sf, self.la], self.ca.cities)
+            group.assert_called_once_with("City", "state_id", ["ca"])
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.ca.cities = []
+
+
+class TestListOf(Graph):
+    """Unittests for testing the ListOf relationship."""
+
+    def test_class_attribute(self):
+        self.assertIsInstance(Place.amenities, ListOf)
+        self.assertEqual("Amenity", Place.amenities.cls_name)
+        self.assertEqual("amenity_ids", Place.amenities.attr)
+
+    def test_get(self):
+        self.assertEqual([self.pool, self.wifi], self.loft.amenities)
+        self.assertEqual([], self.cabin.amenities)
+
+    def test_not_a_list(self):
+        self.loft.amenity_ids = "wifi"
+        self.assertEqual([], self.loft.amenities)
+
+
+class TestJoin(Graph):
+    """Unittests for testing the join function."""
+
+    def test_join(self):
+        places = [self.loft, self.cabin, self.flat]
+        joined = join(places, "city", "reviews", "amenities")
+        self.assertEqual(places, [pl for pl, related in joined])
+        loft = joined[0][1]
+        self.assertIs(self.sf, loft["city"])
+        self.assertEqual([self.r1, self.r2], loft["reviews"])
+        self.assertEqual([self.pool, self.wifi], loft["amenities"])
+        self.assertEqual({"city": self.la, "reviews": [], "amenities": []},
+                         joined[1][1])
+
+    def test_join_loads_each_relationship_once(self):
+        storage = models.storage
+        with patch.object(storage, "group", wraps=storage.group) as group:
+            joined = join([self.loft, self.cabin, self.flat], "reviews")
+            group.assert_called_once_with("Review", "place_id",
+                                          ["loft", "cabin", "flat"])
+        self.assertEqual([self.r3], joined[2][1]["reviews"])
+
+    def test_join_paths(self):
+        joined = dict(join([self.loft, self.flat], "city.state",
+                           "reviews.user", "city.state.cities"))
+        self.assertIs(self.ca, joined[self.loft]["city.state"])
+        self.assertIs(self.ny, joined[self.flat]["city.state"])
+        self.assertEqual([self.host], joined[self.loft]["reviews.user"])
+        self.assertEqual([self.host], joined[self.flat]["reviews.user"])
+        self.assertEqual([self.sf, self.la],
+                         joined[self.loft]["city.state.cities"])
+        joined = dict(join([self.ca, self.ny], "cities.places"))
+        self.assertEqual([self.loft, self.cabin], joined[self.ca][
+            "cities.places"])
+
+    def test_join_path_through_missing_object(self):
+        self.flat.city_id = "gone"
+        joined = join([self.flat], "city.state")
+        self.assertEqual([(self.flat, {"city.state": None})], joined)
+
+    def test_join_nothing(self):
+        self.assertEqual([], join([], "city"))
+        self.assertEqual([(self.loft, {})], join([self.loft]))
+
+    def test_join_unknown_relationship(self):
+        with self.assertRaises(AttributeError):
+            join([self.loft], "city_id")
+        with self.assertRaises(AttributeError):
+            join([self.loft], "city.nothing")
+
+
+class TestDependents(Graph):
+    """Unittests for testing the dependents function."""
+
+    def test_cascades(self):
+        self.assertTrue(State.cities.cascade)
+        self.assertTrue(User.reviews.cascade)
+        self.assertFalse(HasMany("City", "state_id").cascade)
+
+    def test_dependents(self):
+        self.assertEqual([self.sf, self.la, self.loft, self.cabin, self.r1,
+                          self.r2], dependents([self.ca]))
+        self.assertEqual([self.r1, self.r2], dependents([self.loft]))
+        self.assertEqual([], dependents([self.r1]))
+        self.assertEqual([], dependents([self.wifi]))
+
+    def test_dependents_each_once(self):
+        self.assertEqual([self.loft, self.cabin, self.r1, self.r3,
+                          self.r2], dependents([self.host]))
+        self.assertEqual([self.nyc, self.flat],
+                         dependents([self.ny, self.r3]))
+
+    def test_dependents_loads_once_per_level(self):
+        storage = models.storage
+        with patch.object(storage, "group", wraps=storage.group) as group:
+            dependents([self.ca, self.ny])
+            self.assertEqual(3, group.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()